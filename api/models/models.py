@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, DateTime, Float, LargeBinary, Enum
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, DateTime, Float, LargeBinary, Enum, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -62,6 +62,12 @@ class ReviewStatus(str, enum.Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+class ReviewTier(str, enum.Enum):
+    PRELIMINARY = "preliminary"
+    FULL = "full"
+    REDUCED = "reduced"
+    RULE_BASED = "rule_based"
+
 class Review(Base):
     __tablename__ = "reviews"
 
@@ -78,6 +84,15 @@ class Review(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     score = Column(Float, nullable=True) 
+    score_rules_version = Column(String, nullable=True)
+    # Feature counts behind the score, keyed by scoring feature name, and the
+    # features_version of the rules that counted them.
+    score_features = Column(JSON, nullable=True)
+    score_features_version = Column(String, nullable=True)
+    tier = Column(String, nullable=True)
+    # How the text was extracted, and whether extraction stopped at a limit.
+    extraction_mode = Column(String, nullable=True)
+    extraction_truncated = Column(Boolean, nullable=True)
 
     user = relationship("User", back_populates="reviews")
     notifications = relationship("Notification", back_populates="review")
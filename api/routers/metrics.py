@@ -0,0 +1,47 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+
+from api.core.rbac import admin_only
+from api.models.models import User
+from api.services.ai_service import generation_stats, llm_latency, llm_limiter
+from api.services.llm_providers import GeminiProvider, get_llm_provider
+from api.utils.extraction_cache import extraction_cache
+from api.utils.extraction_pool import get_extraction_pool
+from api.utils.text_normalizer import normalization_stats
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    responses={401: {"description": "Unauthorized"}, 403: {"description": "Forbidden"}},
+)
+
+@router.get("/llm")
+async def get_llm_metrics(current_user: User = Depends(admin_only)) -> Any:
+    """
+    Report provider usage: per-key budgets and outcomes of generation calls
+    """
+    provider = get_llm_provider()
+    return {
+        "provider": provider.name if provider else None,
+        "keys": provider.key_pool.usage() if isinstance(provider, GeminiProvider) else [],
+        "generation": dict(generation_stats),
+        "latency_p95_seconds": llm_latency.quantile(0.95),
+        "concurrency": llm_limiter.snapshot(),
+    }
+
+@router.get("/extraction")
+async def get_extraction_metrics(current_user: User = Depends(admin_only)) -> Any:
+    """
+    Report document extraction load and how often the text cache is hit
+    """
+    pool = get_extraction_pool()
+    return {
+        "pool": {"workers": pool.workers, "pending": pool.pending, "capacity": pool.capacity, "crashes": pool.crashes},
+        "cache": extraction_cache.stats(),
+        "normalization": {
+            "raw_chars": normalization_stats["raw_chars"],
+            "chars": normalization_stats["chars"],
+            "reduction": round(1 - normalization_stats["chars"] / normalization_stats["raw_chars"], 4)
+            if normalization_stats["raw_chars"] else None,
+        },
+    }
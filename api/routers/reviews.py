@@ -1,18 +1,37 @@
-from typing import Any
+from typing import Any, Optional
+import asyncio
 import io
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, or_, update
 
 from api.core.auth import get_current_active_user, validate_resource_ownership
+from api.core.rbac import admin_only
 from api.core.database import get_db, get_session_factory
-from api.models.models import User, Review, CreditBalance, Notification, CreditTransaction, ReviewStatus
-from api.schemas.schemas import ReviewList, Review as ReviewSchema
-from api.services.ai_service import generate_review
+from api.models.models import User, Review, CreditBalance, Notification, CreditTransaction, ReviewStatus, ReviewTier
+from api.schemas.schemas import ReviewList, Review as ReviewSchema, ScoreBreakdown
+from api.services.ai_service import generate_tiered_review, select_review_tier
+from api.services.rule_engine import generate_preliminary_review
+from api.services.scoring import (
+    features_matrix,
+    get_scoring_rules,
+    score_breakdown,
+    score_cv_features,
+    score_cvs,
+    score_features,
+    scoring_version,
+)
 from api.core.config import settings
-from api.utils.document_converter import convert_to_text
+from api.utils.document_converter import ExtractionLimits, UnsafeDocumentError, UnsupportedDocumentError
+from api.utils.extraction_pool import (
+    ExtractionCrashedError,
+    ExtractionOverloadedError,
+    ExtractionTimeoutError,
+    get_extraction_pool,
+)
+from api.utils.text_normalizer import normalization_stats
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +60,41 @@ async def upload_cv_for_review(
 
     file_content = await file.read()
     content_type = file.content_type or 'text/plain'
-    text_content = convert_to_text(file_content, content_type)
+    try:
+        extraction = await get_extraction_pool().extract(
+            file_content, content_type, settings.EXTRACTION_MODE, ExtractionLimits.from_settings()
+        )
+    except ExtractionOverloadedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many documents are being processed right now. Please try again shortly.",
+            headers={"Retry-After": "5"},
+        )
+    except ExtractionTimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The document took too long to read. Please upload a simpler or smaller file.",
+        )
+    except ExtractionCrashedError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The document needed too much memory or processing to read. Please upload a simpler or smaller file.",
+        )
+    except UnsupportedDocumentError as e:
+        logger.info(f"Rejected upload {file.filename}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Unsupported or unreadable file. Please upload your CV as PDF, DOCX, ODT, RTF, HTML or plain text.",
+        )
+    except UnsafeDocumentError as e:
+        logger.warning(f"Rejected unsafe upload {file.filename}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The document is too large to process once decompressed. Please upload a smaller file.",
+        )
+    text_content = extraction.text
+    normalization_stats["raw_chars"] += extraction.raw_chars
+    normalization_stats["chars"] += len(text_content or "")
     
     if not text_content or not text_content.strip():
         raise HTTPException(
@@ -49,6 +102,7 @@ async def upload_cv_for_review(
             detail="Could not extract text from the uploaded document. Please upload a valid CV document."
         )
     
+    score, features = score_cv_features(text_content)
     new_review = Review(
         user_id=current_user.id,
         filename=file.filename,
@@ -56,7 +110,17 @@ async def upload_cv_for_review(
         content=text_content,
         content_type=file.content_type,
         file_size=len(file_content),
-        status=ReviewStatus.PENDING
+        status=ReviewStatus.PENDING,
+        # Rule-based feedback so the review page has content straight away;
+        # process_review replaces it with the generated review.
+        review_result=generate_preliminary_review(text_content),
+        score=score,
+        score_rules_version=scoring_version(),
+        score_features=features,
+        score_features_version=get_scoring_rules().features_version,
+        tier=ReviewTier.PRELIMINARY,
+        extraction_mode=extraction.mode,
+        extraction_truncated=extraction.truncated,
     )
     db.add(new_review)
 
@@ -81,21 +145,58 @@ async def upload_cv_for_review(
     notification.review_id = new_review.id
     await db.commit()
 
-    # Vercel functions cannot safely rely on an in-memory worker after the response.
-    # Process the review in the request so success and failure are durably recorded.
-    await process_review(new_review.id)
+    # Return with the preliminary review; the client then calls
+    # POST /reviews/{id}/process. Vercel functions cannot safely rely on an
+    # in-memory worker after the response, so generation runs in that request.
     await db.refresh(new_review)
     return new_review
 
+@router.post("/{review_id}/process", response_model=ReviewSchema)
+async def process_uploaded_review(
+    review_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    result = await db.execute(select(Review).where(Review.id == review_id))
+    review = result.scalars().first()
+
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    await validate_resource_ownership(current_user.id, review.user_id)
+
+    if review.status == ReviewStatus.PENDING:
+        await process_review(review.id)
+        await db.refresh(review)
+    return review
+
+def refresh_score_features(review: Review) -> None:
+    """Recompute stored score features only if the rules now count something else."""
+    rules = get_scoring_rules()
+    if review.score_features is None or review.score_features_version != rules.features_version:
+        _, review.score_features = score_cv_features(review.content or "", rules)
+        review.score_features_version = rules.features_version
+    review.score_rules_version = scoring_version(rules)
+
 async def process_review(review_id: int):
+    """Generate the full review for a pending upload.
+
+    The review is claimed by moving it from pending to processing in one
+    UPDATE, so a repeated or concurrent call for the same review does nothing.
+    """
     async with get_session_factory()() as session:
+        claimed = await session.execute(
+            update(Review)
+            .where(Review.id == review_id, Review.status == ReviewStatus.PENDING)
+            .values(status=ReviewStatus.PROCESSING)
+        )
+        if claimed.rowcount == 0:
+            await session.rollback()
+            return
         result = await session.execute(select(Review).where(Review.id == review_id))
         review = result.scalars().first()
-        if not review:
-            return
 
         try:
-            review.status = ReviewStatus.PROCESSING
             session.add(Notification(
                 user_id=review.user_id,
                 review_id=review.id,
@@ -104,11 +205,13 @@ async def process_review(review_id: int):
             ))
             await session.commit()
 
-            review_result, score = await generate_review(review.content)
+            review_result, score, tier = await generate_tiered_review(review.content)
 
             review.status = ReviewStatus.COMPLETED
             review.review_result = review_result
             review.score = score
+            refresh_score_features(review)
+            review.tier = tier
             session.add(Notification(
                 user_id=review.user_id,
                 review_id=review.id,
@@ -128,6 +231,116 @@ async def process_review(review_id: int):
             ))
             await session.commit()
 
+async def upgrade_degraded_reviews(limit: int = 10) -> int:
+    """Regenerate reduced and rule-based reviews at full tier while capacity allows.
+
+    Stops as soon as the load policy no longer grants a full review, so it is
+    safe to call whenever the upstream looks healthy again.
+    """
+    upgraded = 0
+    async with get_session_factory()() as session:
+        result = await session.execute(
+            select(Review)
+            .where(
+                Review.status == ReviewStatus.COMPLETED,
+                Review.tier.in_([ReviewTier.REDUCED, ReviewTier.RULE_BASED]),
+            )
+            .order_by(Review.created_at)
+            .limit(limit)
+        )
+        for review in result.scalars().all():
+            if select_review_tier() != ReviewTier.FULL:
+                break
+            review_result, score, tier = await generate_tiered_review(review.content, ReviewTier.FULL)
+            if tier != ReviewTier.FULL:
+                break
+            review.review_result = review_result
+            review.score = score
+            refresh_score_features(review)
+            review.tier = tier
+            session.add(Notification(
+                user_id=review.user_id,
+                review_id=review.id,
+                message=f"Your CV review for '{review.filename}' has been upgraded to a full review",
+                is_read=False
+            ))
+            await session.commit()
+            upgraded += 1
+    return upgraded
+
+@router.post("/upgrade-degraded")
+async def upgrade_degraded(
+    limit: int = 10,
+    current_user: User = Depends(admin_only),
+) -> Any:
+    return {"upgraded": await upgrade_degraded_reviews(limit)}
+
+async def rescore_stale_reviews(batch_size: int = 500, limit: Optional[int] = None) -> int:
+    """Re-score reviews whose score came from other scoring rules or another model.
+
+    Stored feature counts are reused when the current rules count the same
+    things, so changing only thresholds or weights never re-reads CV text.
+    Text that must be re-read is scored in a worker thread. Stops after
+    ``limit`` reviews if one is given.
+    """
+    rules = get_scoring_rules()
+    version = scoring_version(rules)
+    rescored = 0
+    async with get_session_factory()() as session:
+        while limit is None or rescored < limit:
+            result = await session.execute(
+                select(Review.id, Review.score_features, Review.score_features_version)
+                .where(
+                    Review.score.is_not(None),
+                    or_(Review.score_rules_version.is_(None), Review.score_rules_version != version),
+                )
+                .order_by(Review.id)
+                .limit(batch_size if limit is None else min(batch_size, limit - rescored))
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            reusable = [(review_id, features) for review_id, features, features_version in rows
+                        if features is not None and features_version == rules.features_version]
+            updates = []
+            if reusable:
+                scores = score_features(features_matrix([features for _, features in reusable], rules), rules)
+                updates.extend(
+                    {"id": review_id, "score": float(score), "score_features": features}
+                    for (review_id, features), score in zip(reusable, scores)
+                )
+            reused_ids = {review_id for review_id, _ in reusable}
+            stale_ids = [review_id for review_id, _, _ in rows if review_id not in reused_ids]
+            if stale_ids:
+                result = await session.execute(
+                    select(Review.id, Review.content).where(Review.id.in_(stale_ids)).order_by(Review.id)
+                )
+                texts = result.all()
+                scores, matrix = await asyncio.to_thread(score_cvs, [content or "" for _, content in texts], rules)
+                updates.extend(
+                    {"id": review_id, "score": float(score), "score_features": dict(zip(rules.feature_names, row.tolist()))}
+                    for (review_id, _), score, row in zip(texts, scores, matrix)
+                )
+
+            for values in updates:
+                values["score_rules_version"] = version
+                values["score_features_version"] = rules.features_version
+            await session.execute(update(Review), updates)
+            await session.commit()
+            rescored += len(updates)
+    return rescored
+
+@router.post("/rescore")
+async def rescore(
+    batch_size: int = 500,
+    limit: int = 5000,
+    current_user: User = Depends(admin_only),
+) -> Any:
+    """Re-score up to ``limit`` stale reviews; call again while ``more`` is true."""
+    rescored = await rescore_stale_reviews(batch_size, limit)
+    return {"rescored": rescored, "more": rescored >= limit, "rules_version": scoring_version()}
+
 @router.get("/file/{review_id}")
 async def get_review_file(
     review_id: int,
@@ -164,6 +377,26 @@ async def get_user_reviews(
     )
     return {"reviews": result.scalars().all()}
 
+@router.get("/{review_id}/score", response_model=ScoreBreakdown)
+async def get_review_score(
+    review_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    result = await db.execute(select(Review).where(Review.id == review_id))
+    review = result.scalars().first()
+
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    await validate_resource_ownership(current_user.id, review.user_id)
+
+    rules = get_scoring_rules()
+    features = review.score_features
+    if features is None or review.score_features_version != rules.features_version:
+        _, features = score_cv_features(review.content or "", rules)
+    return {"review_id": review.id, **score_breakdown(features, rules)}
+
 @router.get("/{review_id}", response_model=ReviewSchema)
 async def get_review(
     review_id: int,
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from enum import Enum
 from pydantic import BaseModel, EmailStr, Field
 
@@ -19,6 +19,12 @@ class ReviewStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+class ReviewTier(str, Enum):
+    PRELIMINARY = "preliminary"
+    FULL = "full"
+    REDUCED = "reduced"
+    RULE_BASED = "rule_based"
+
 class UserBase(BaseModel):
     email: Optional[EmailStr] = None
     full_name: Optional[str] = None
@@ -105,10 +111,27 @@ class Review(ReviewBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     score: Optional[float] = None
+    score_rules_version: Optional[str] = None
+    score_features: Optional[Dict[str, int]] = None
+    tier: Optional[ReviewTier] = None
+    extraction_mode: Optional[str] = None
+    extraction_truncated: Optional[bool] = None
 
     class Config:
         from_attributes = True
 
+class ScoreComponent(BaseModel):
+    name: str
+    value: int
+    points: float
+
+class ScoreBreakdown(BaseModel):
+    review_id: int
+    rules_version: str
+    base_score: float
+    components: List[ScoreComponent]
+    score: float
+
 class ReviewList(BaseModel):
     reviews: List[Review]
 
@@ -1,76 +1,22 @@
 import logging
 import random
 import asyncio
-import re
-from typing import Any, Tuple
-import google.generativeai as genai
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from api.core.config import settings
+from api.models.models import ReviewTier
+from api.services.circuit_breaker import CircuitBreaker
+from api.services.concurrency import AdaptiveConcurrencyLimiter
+from api.services.llm_providers import LLMProvider, get_llm_provider, is_rate_limit_error
+from api.services.rule_engine import generate_rule_review, split_cv_sections
+from api.services.scoring import score_cv
 
 logger = logging.getLogger(__name__)
 
-def score_cv(cv_content: str) -> float:
-    score = 5.0
-    cv_lower = cv_content.lower()
-    
-    word_count = len(cv_content.split())
-    if word_count < 100:
-        score -= 1.0 
-    elif 300 <= word_count <= 700:
-        score += 1.0
-    elif word_count > 1000:
-        score -= 0.5
-    
-    if re.search(r'education|degree|university|college', cv_lower):
-        score += 0.5
-    if re.search(r'experience|work|employment|job', cv_lower):
-        score += 0.5
-    if re.search(r'skills|abilities|proficiency|competencies', cv_lower):
-        score += 0.5
-    if re.search(r'projects|portfolio|achievements', cv_lower):
-        score += 0.5
-    if re.search(r'email|phone|contact|linkedin|github', cv_lower):
-        score += 0.5
-    
-    achievement_count = len(re.findall(r'increased|decreased|improved|achieved|won|created|developed|led|managed|reduced', cv_lower))
-    if achievement_count >= 5:
-        score += 1.0
-    elif achievement_count >= 3:
-        score += 0.5
-
-    metrics_count = len(re.findall(r'\d+%|\$\d+|\d+ years|\d+ months|\d+ people|\d+ team', cv_lower))
-    if metrics_count >= 3:
-        score += 1.0
-    elif metrics_count >= 1:
-        score += 0.5
-
-    action_verbs = ['implemented', 'developed', 'created', 'designed', 'managed', 'led', 'coordinated', 'achieved', 'improved']
-    action_verb_count = sum(1 for verb in action_verbs if f" {verb} " in cv_lower or f"\n{verb} " in cv_lower)
-    if action_verb_count >= 5:
-        score += 1.0
-    elif action_verb_count >= 3:
-        score += 0.5
-    
-    score = max(1.0, min(score, 10.0))
-    return round(score, 1)
-
-async def generate_review(cv_content: str) -> Tuple[str, float]:
-    score = score_cv(cv_content)
-    
-    try:
-        logger.info(f"Settings GEMINI_API_KEY present: {settings.GEMINI_API_KEY is not None}")
-        api_key = settings.GEMINI_API_KEY
-        
-        if not api_key:
-            logger.warning("No Gemini API key found in settings. Using mock review data.")
-            return generate_mock_review(cv_content), score
-        
-        genai.configure(api_key=api_key)
-        model_name = "gemini-1.5-flash"
-        logger.info(f"Using Gemini model: {model_name}")
-        model = genai.GenerativeModel(model_name)
-        
-        prompt = f"""
+def build_review_prompt(cv_content: str) -> str:
+    return f"""
         Please review the following CV and provide professional feedback on how to improve it:
         
         {cv_content}
@@ -86,76 +32,297 @@ async def generate_review(cv_content: str) -> Tuple[str, float]:
         Format your response with markdown headings and bullet points.
         """
 
-        max_retries = 3
-        retry_count = 0
+# Feedback areas of a sectioned review, in output order, with the CV sections
+# each one needs. ``None`` means the whole CV.
+REVIEW_SECTIONS: List[Tuple[str, Optional[Tuple[str, ...]]]] = [
+    ("Overall Structure and Formatting", ()),
+    ("Content and Relevance", ("header", "summary", "projects")),
+    ("Skills and Qualifications", ("skills",)),
+    ("Experience Description", ("experience",)),
+    ("Education Section", ("education",)),
+    ("Specific Improvements", None),
+]
+
+def build_section_prompt(heading: str, cv_content: str, sections: Dict[str, str], wanted: Optional[Tuple[str, ...]]) -> str:
+    if wanted is None:
+        excerpt = cv_content
+    elif not wanted:
+        # Structure only needs the outline, not the full wording.
+        excerpt = "\n".join(f"- {name}: {len(text.split())} words" for name, text in sections.items())
+    else:
+        excerpt = "\n\n".join(sections[name] for name in wanted if sections.get(name))
+    if not excerpt:
+        excerpt = "(The CV has no dedicated section for this area.)"
+    return f"""
+        You are reviewing one part of a CV. Give professional feedback on: {heading}.
+        
+        Relevant CV content:
         
-        while retry_count < max_retries:
-            try:
-                logger.info(f"Sending request to Gemini API (attempt {retry_count + 1})...")
-                response = await model.generate_content_async(prompt)
+        {excerpt}
+        
+        Respond with markdown bullet points only. Do not add headings.
+        """
+
+def _strip_leading_heading(text: str) -> str:
+    lines = text.strip().splitlines()
+    while lines and lines[0].lstrip().startswith("#"):
+        lines.pop(0)
+    return "\n".join(lines).strip()
+
+async def generate_sectioned_review(provider: LLMProvider, cv_content: str) -> Tuple[str, int]:
+    """Request every feedback area concurrently and assemble them in a fixed order.
+
+    Areas that fail or run out of time fall back to the mock review's text for
+    that area, so one slow section never discards the others. Returns the
+    review and how many areas the provider actually wrote. Nothing is recorded
+    on the circuit breaker; the caller records one outcome for the review.
+    """
+    sections = split_cv_sections(cv_content)
+    deadline = time.monotonic() + settings.LLM_TOTAL_DEADLINE_SECONDS
+    results = await asyncio.gather(
+        *(
+            _generate_with_retries(provider, build_section_prompt(heading, cv_content, sections, wanted), deadline, None)
+            for heading, wanted in REVIEW_SECTIONS
+        ),
+        return_exceptions=True,
+    )
+
+    fallback = _mock_section_feedback(cv_content)
+    parts = ["# CV Review Summary"]
+    generated = 0
+    for (heading, _), result in zip(REVIEW_SECTIONS, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Section '{heading}' failed: {result}")
+            result = None
+        parts.append(f"## {heading}")
+        if result:
+            generated += 1
+            parts.append(_strip_leading_heading(result))
+        else:
+            parts.append(fallback[heading])
+    return "\n\n".join(parts), generated
+
+class LatencyTracker:
+    """Rolling window of successful call latencies used to pick the hedge delay."""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        if len(self.samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+llm_latency = LatencyTracker()
+# Counts of how generation calls ended: which path won a hedged call, and how
+# often attempts or whole reviews ran out of time.
+generation_stats: Counter = Counter()
+# Caps in-flight provider calls and adapts the cap to 429s and latency.
+llm_limiter = AdaptiveConcurrencyLimiter(
+    initial=settings.LLM_CONCURRENCY_INITIAL,
+    minimum=settings.LLM_CONCURRENCY_MIN,
+    maximum=settings.LLM_CONCURRENCY_MAX,
+    latency_target=settings.LLM_CONCURRENCY_LATENCY_TARGET_SECONDS,
+    backoff=settings.LLM_CONCURRENCY_BACKOFF,
+    is_overload=is_rate_limit_error,
+)
+
+# Opens after repeated failed reviews so load shedding can skip the upstream.
+llm_breaker = CircuitBreaker(
+    failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.LLM_BREAKER_RESET_SECONDS,
+)
+
+async def _limited_generate(provider: LLMProvider, prompt: str, model: Optional[str] = None) -> str:
+    async with llm_limiter.slot():
+        return await provider.generate(prompt, model=model)
+
+async def _hedged_generate(provider: LLMProvider, prompt: str, model: Optional[str] = None) -> str:
+    hedge_after = llm_latency.quantile(0.95, settings.LLM_HEDGE_MIN_SAMPLES)
+    primary = asyncio.ensure_future(_limited_generate(provider, prompt, model))
+    paths = {primary: "primary"}
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+            if not done:
+                logger.info(f"No response after p95 of {hedge_after:.2f}s, sending hedged request")
+                paths[asyncio.ensure_future(_limited_generate(provider, prompt, model))] = "hedge"
+
+        pending = set(paths)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    generation_stats[f"{paths[task]}_wins"] += 1
+                    return task.result()
+        raise primary.exception()
+    finally:
+        for task in paths:
+            if not task.done():
+                task.cancel()
+
+async def _timed_generate(provider: LLMProvider, prompt: str, timeout: float, model: Optional[str] = None) -> str:
+    started = time.monotonic()
+    if settings.LLM_HEDGE_ENABLED:
+        result = await asyncio.wait_for(_hedged_generate(provider, prompt, model), timeout)
+    else:
+        result = await asyncio.wait_for(_limited_generate(provider, prompt, model), timeout)
+    llm_latency.record(time.monotonic() - started)
+    return result
+
+async def generate_with_retries(
+    provider: LLMProvider, prompt: str, deadline: Optional[float] = None, model: Optional[str] = None
+) -> Optional[str]:
+    """Run ``prompt`` through ``provider``, retrying rate limits and timeouts.
+
+    Every attempt is capped by ``LLM_ATTEMPT_TIMEOUT_SECONDS`` and all attempts
+    share one ``deadline`` (a ``time.monotonic()`` value, defaulting to
+    ``LLM_TOTAL_DEADLINE_SECONDS`` from now). Returns None when the retries or
+    the deadline are exhausted so callers can fall back to a mock review.
+    The outcome is recorded on the circuit breaker.
+    """
+    try:
+        review_text = await _generate_with_retries(provider, prompt, deadline, model)
+    except Exception:
+        llm_breaker.record_failure()
+        raise
+    if review_text is None:
+        llm_breaker.record_failure()
+    else:
+        llm_breaker.record_success()
+    return review_text
+
+async def _generate_with_retries(
+    provider: LLMProvider, prompt: str, deadline: Optional[float], model: Optional[str]
+) -> Optional[str]:
+    if deadline is None:
+        deadline = time.monotonic() + settings.LLM_TOTAL_DEADLINE_SECONDS
+
+    max_retries = 3
+    retry_count = 0
+    
+    while retry_count < max_retries:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        attempt_timeout = min(settings.LLM_ATTEMPT_TIMEOUT_SECONDS, remaining)
+        try:
+            logger.info(f"Sending request to {provider.name} provider (attempt {retry_count + 1})...")
+            review_text = await _timed_generate(provider, prompt, attempt_timeout, model)
+            logger.info(f"Successfully received response from {provider.name} provider")
+            return review_text
                 
-                if response and response.text:
-                    logger.info("Successfully received response from Gemini")
-                    return response.text, score
-                else:
-                    logger.error("Empty or invalid response from Gemini API")
-                    return generate_mock_review(cv_content), score
-                    
-            except Exception as e:
-                if "429" in str(e) or "ResourceExhausted" in str(e):
-                    retry_count += 1
-                    if retry_count >= max_retries:
-                        logger.warning(f"Rate limit exceeded after {max_retries} attempts. Using mock review.")
-                        return generate_mock_review(cv_content), score
-                    
-                    wait_time = (2 ** retry_count) + (random.random() * 2)
-                    logger.info(f"Rate limit exceeded. Retrying in {wait_time:.2f} seconds (attempt {retry_count}/{max_retries})")
-                    await asyncio.sleep(wait_time)
-                else:
-                    raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                generation_stats["attempt_timeouts"] += 1
+                logger.warning(f"Attempt {retry_count + 1} timed out after {attempt_timeout:.2f} seconds")
+            elif not is_rate_limit_error(e):
+                raise
+
+            retry_count += 1
+            if retry_count >= max_retries:
+                logger.warning(f"No response after {max_retries} attempts. Using mock review.")
+                return None
+            
+            wait_time = (2 ** retry_count) + (random.random() * 2)
+            if time.monotonic() + wait_time >= deadline:
+                break
+            logger.info(f"Retrying in {wait_time:.2f} seconds (attempt {retry_count}/{max_retries})")
+            await asyncio.sleep(wait_time)
+
+    generation_stats["deadline_exceeded"] += 1
+    logger.warning(f"Review deadline of {settings.LLM_TOTAL_DEADLINE_SECONDS} seconds exceeded. Using mock review.")
+    return None
+
+def select_review_tier() -> ReviewTier:
+    """Pick how much upstream work a new review may use under the current load.
+
+    Reviews go rule-based while the breaker is open or the queue for provider
+    slots is very deep, use the reduced prompt and cheaper model while the
+    breaker is probing or the queue is building up, and get the full review
+    otherwise.
+    """
+    breaker_state = llm_breaker.state
+    queue_depth = llm_limiter.queue_depth
+    if breaker_state == CircuitBreaker.OPEN or queue_depth >= settings.REVIEW_RULE_BASED_QUEUE_DEPTH:
+        return ReviewTier.RULE_BASED
+    if breaker_state == CircuitBreaker.HALF_OPEN or queue_depth >= settings.REVIEW_REDUCED_QUEUE_DEPTH:
+        return ReviewTier.REDUCED
+    return ReviewTier.FULL
+
+def build_reduced_review_prompt(cv_content: str) -> str:
+    words = cv_content.split()
+    excerpt = " ".join(words[:settings.REVIEW_REDUCED_MAX_WORDS])
+    return f"""
+        Review this CV briefly. For each of structure, content, skills, experience,
+        education and specific improvements, give a markdown heading and at most
+        two bullet points.
         
-        return generate_mock_review(cv_content), score
+        {excerpt}
+        """
+
+async def generate_tiered_review(cv_content: str, tier: Optional[ReviewTier] = None) -> Tuple[str, float, ReviewTier]:
+    """Generate a review at ``tier`` (chosen by ``select_review_tier`` if omitted).
+
+    Returns the tier that actually produced the text: a review whose upstream
+    calls fail is downgraded to ``RULE_BASED``, and a sectioned review with
+    only some sections generated to ``REDUCED``.
+    """
+    score = score_cv(cv_content)
+    tier = tier or select_review_tier()
+    generation_stats[f"tier_{tier.value}"] += 1
+    
+    if tier == ReviewTier.RULE_BASED:
+        logger.info("Upstream degraded, returning rule-based review")
+        return generate_mock_review(cv_content), score, ReviewTier.RULE_BASED
+
+    try:
+        provider = get_llm_provider()
+        
+        if provider is None:
+            logger.warning("No Gemini API key found in settings. Using mock review data.")
+            return generate_mock_review(cv_content), score, ReviewTier.RULE_BASED
+        
+        if tier == ReviewTier.REDUCED:
+            review_text = await generate_with_retries(
+                provider, build_reduced_review_prompt(cv_content), model=settings.GEMINI_REDUCED_MODEL or None
+            )
+        elif settings.REVIEW_GENERATION_MODE == "sections":
+            review_text, generated = await generate_sectioned_review(provider, cv_content)
+            # One breaker outcome per review, however many sections it asked for.
+            if generated == 0:
+                llm_breaker.record_failure()
+                return review_text, score, ReviewTier.RULE_BASED
+            llm_breaker.record_success()
+            if generated < len(REVIEW_SECTIONS):
+                return review_text, score, ReviewTier.REDUCED
+            return review_text, score, tier
+        else:
+            review_text = await generate_with_retries(provider, build_review_prompt(cv_content))
+
+        if review_text is None:
+            return generate_mock_review(cv_content), score, ReviewTier.RULE_BASED
+        return review_text, score, tier
             
     except Exception as e:
         logger.exception(f"Error generating CV review: {e}")
-        return generate_mock_review(cv_content), score
+        return generate_mock_review(cv_content), score, ReviewTier.RULE_BASED
+
+async def generate_review(cv_content: str) -> Tuple[str, float]:
+    review_text, score, _ = await generate_tiered_review(cv_content)
+    return review_text, score
 
 def generate_mock_review(cv_content: str) -> str:
-    has_education = "education" in cv_content.lower() or "university" in cv_content.lower() or "degree" in cv_content.lower()
-    has_skills = "skills" in cv_content.lower() or "proficient" in cv_content.lower()
-    has_experience = "experience" in cv_content.lower() or "work" in cv_content.lower()
-    
-    sections = [
-        "# CV Review Summary", 
-        "Thank you for submitting your CV for review. Here's my professional feedback to help you improve your CV.",
-        "## Overall Structure and Formatting",
-        "Your CV has a clear structure, but consider using more consistent formatting for section headings. Add more whitespace between sections to improve readability.",
-        "## Content and Relevance",
-        "The content is relevant to your field, but you should tailor specific achievements to match job descriptions. Quantify your achievements with specific metrics where possible."
-    ]
-    
-    if has_skills:
-        sections.append("## Skills and Qualifications")
-        sections.append("Your skills section is comprehensive, but consider organizing technical skills by proficiency level. Add any relevant certifications or training programs.")
-    else:
-        sections.append("## Skills and Qualifications")
-        sections.append("I recommend adding a dedicated Skills section to highlight your technical and soft skills. Organize them by category and proficiency level.")
-    
-    if has_experience:
-        sections.append("## Experience Description")
-        sections.append("Your experience descriptions focus too much on responsibilities rather than achievements. Restructure these to highlight results and impact. Use action verbs at the beginning of each bullet point.")
-    else:
-        sections.append("## Experience Description")
-        sections.append("Your work experience section needs more detail. For each role, include 3-5 bullet points that emphasize achievements and quantifiable results, not just job duties.")
-    
-    if has_education:
-        sections.append("## Education Section")
-        sections.append("Your education section is clear, but consider adding relevant coursework, academic achievements, or projects if you're early in your career.")
-    else:
-        sections.append("## Education Section")
-        sections.append("Make sure your education section is properly structured with dates, institution names, and degrees clearly stated. Add relevant coursework if you're a recent graduate.")
-    
-    sections.append("## Specific Improvements")
-    sections.append("1. Add a professional summary at the top\n2. Include LinkedIn and GitHub profiles\n3. Remove references to outdated technologies\n4. Prioritize most recent and relevant experience")
-    
-    return "\n\n".join(sections)
+    return generate_rule_review(cv_content)
+
+def _mock_section_feedback(cv_content: str) -> Dict[str, str]:
+    blocks = generate_mock_review(cv_content).split("\n\n")
+    return {
+        blocks[index][3:]: blocks[index + 1]
+        for index in range(len(blocks) - 1)
+        if blocks[index].startswith("## ")
+    }
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on how many upstream calls may be in flight at once.
+
+    Every call that finishes within ``latency_target`` grows the limit by
+    ``1 / limit`` (one slot per full window of healthy calls). A call that fails
+    with an overload error, such as a 429, multiplies it by ``backoff``, at most
+    once per window: overloads from calls that started before the last decrease
+    report the load that decrease already answered and are ignored. Slow calls
+    and other errors leave it unchanged.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        latency_target: float,
+        backoff: float = 0.5,
+        is_overload: Callable[[BaseException], bool] = lambda error: False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("Concurrency limits must satisfy 1 <= minimum <= initial <= maximum")
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.is_overload = is_overload
+        self.in_flight = 0
+        self.stats: Counter = Counter()
+        self._clock = clock
+        # Bumped on every decrease; a slot remembers the value it started under.
+        self._epoch = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    async def acquire(self) -> None:
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                # Pass a wake-up we may have consumed on to the next waiter.
+                self._wake()
+                raise
+        self.in_flight += 1
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False, epoch: Optional[int] = None) -> None:
+        self.in_flight -= 1
+        if overloaded and epoch is not None and epoch != self._epoch:
+            self.stats["stale_overloads"] += 1
+        elif overloaded:
+            self._epoch += 1
+            previous = self.limit
+            self.limit = max(float(self.minimum), self.limit * self.backoff)
+            self.stats["decreases"] += 1
+            logger.info(f"Upstream overloaded, concurrency limit {previous:.1f} -> {self.limit:.1f}")
+        elif latency is not None and latency <= self.latency_target:
+            self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            self.stats["increases"] += 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        started = self._clock()
+        epoch = self._epoch
+        try:
+            yield
+        except Exception as e:
+            self.release(overloaded=self.is_overload(e), epoch=epoch)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        else:
+            self.release(latency=self._clock() - started)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queue_depth,
+            "increases": self.stats["increases"],
+            "decreases": self.stats["decreases"],
+        }
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class KeyState:
+    key: str
+    requests_per_minute: int
+    tokens: float
+    updated_at: float
+    cooldown_until: float = 0.0
+    requests: int = 0
+    rate_limited: int = 0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.requests_per_minute <= 0
+
+
+def parse_key_budgets(raw_keys: List[str], default_rpm: int) -> List[Tuple[str, int]]:
+    """Parse ``key`` or ``key:requests_per_minute`` entries into (key, budget) pairs."""
+    budgets = []
+    for entry in raw_keys:
+        key, _, rpm = entry.partition(":")
+        budgets.append((key.strip(), int(rpm) if rpm.strip() else default_rpm))
+    return budgets
+
+
+def mask_key(key: str) -> str:
+    return f"...{key[-4:]}" if len(key) > 4 else "****"
+
+
+class ApiKeyPool:
+    """Token-bucket budget per API key.
+
+    Each key refills at its own requests-per-minute rate; a budget of 0 means
+    no client-side limit, leaving only the upstream's 429s. ``acquire`` hands out
+    the key with the most remaining budget, and a key that returned 429 is
+    passed over until its cooldown expires.
+    """
+
+    def __init__(
+        self,
+        budgets: List[Tuple[str, int]],
+        cooldown_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not budgets:
+            raise ValueError("ApiKeyPool needs at least one key")
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        now = clock()
+        self._keys: Dict[str, KeyState] = {
+            key: KeyState(key=key, requests_per_minute=rpm, tokens=float(rpm) if rpm > 0 else float("inf"), updated_at=now)
+            for key, rpm in budgets
+        }
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _refill(self, state: KeyState, now: float) -> None:
+        if state.unlimited:
+            return
+        elapsed = now - state.updated_at
+        state.tokens = min(float(state.requests_per_minute), state.tokens + elapsed * state.requests_per_minute / 60.0)
+        state.updated_at = now
+
+    def try_acquire(self) -> Optional[str]:
+        """Reserve one request on the key with the most headroom, or return None.
+
+        Keys cooling down after a 429 are skipped while any other key has
+        budget. If every key is cooling down, the one that recovers first is
+        used, so a single-key pool still follows the caller's retry backoff.
+        """
+        now = self._clock()
+        available = []
+        for state in self._keys.values():
+            self._refill(state, now)
+            if state.tokens >= 1.0:
+                available.append(state)
+        if not available:
+            return None
+
+        def preference(state: KeyState) -> Tuple[bool, float, float]:
+            cooling = state.cooldown_until > now
+            return cooling, state.cooldown_until if cooling else 0.0, -state.tokens
+
+        best = min(available, key=preference)
+        best.tokens -= 1.0
+        best.requests += 1
+        return best.key
+
+    def seconds_until_available(self) -> float:
+        now = self._clock()
+        waits = []
+        for state in self._keys.values():
+            self._refill(state, now)
+            waits.append(max(0.0, (1.0 - state.tokens) * 60.0 / max(state.requests_per_minute, 1)))
+        return min(waits)
+
+    async def acquire(self) -> str:
+        """Wait until some key has budget and reserve a request on it."""
+        while True:
+            key = self.try_acquire()
+            if key is not None:
+                return key
+            await asyncio.sleep(max(self.seconds_until_available(), 0.01))
+
+    def report_rate_limited(self, key: str) -> None:
+        state = self._keys.get(key)
+        if state is None:
+            return
+        state.rate_limited += 1
+        state.cooldown_until = self._clock() + self.cooldown_seconds
+        logger.warning(f"Gemini key {mask_key(key)} rate limited, cooling down for {self.cooldown_seconds:.0f} seconds")
+
+    def usage(self) -> List[Dict[str, object]]:
+        now = self._clock()
+        report = []
+        for state in self._keys.values():
+            self._refill(state, now)
+            report.append({
+                "key": mask_key(state.key),
+                "requests_per_minute": state.requests_per_minute,
+                "headroom": None if state.unlimited else round(state.tokens, 2),
+                "requests": state.requests,
+                "rate_limited": state.rate_limited,
+                "cooling_down": state.cooldown_until > now,
+            })
+        return report
@@ -0,0 +1,266 @@
+import asyncio
+import hashlib
+import logging
+import math
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Protocol, Tuple, runtime_checkable
+
+import google.ai.generativelanguage as glm
+import google.generativeai as genai
+
+from api.core.config import settings
+from api.services.key_pool import ApiKeyPool, parse_key_budgets
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """Raised by a provider when the upstream call fails."""
+
+
+class ProviderRateLimitError(ProviderError):
+    """Raised by a provider when the upstream rejects a call for quota reasons (HTTP 429)."""
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Return True for provider errors that should be retried with backoff."""
+    if isinstance(error, ProviderRateLimitError):
+        return True
+    message = str(error)
+    return "429" in message or "ResourceExhausted" in message
+
+
+@runtime_checkable
+class LLMProvider(Protocol):
+    """Interface every review-generation backend implements."""
+
+    name: str
+
+    async def generate(self, prompt: str, model: Optional[str] = None) -> str:
+        """Return the full completion for ``prompt``, optionally on a different model."""
+        ...
+
+    def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the completion for ``prompt`` in chunks as they arrive."""
+        ...
+
+    async def count_tokens(self, prompt: str) -> int:
+        """Return the number of input tokens ``prompt`` would consume."""
+        ...
+
+
+class GeminiProvider:
+    name = "gemini"
+
+    def __init__(
+        self,
+        key_pool: ApiKeyPool,
+        model_name: str,
+        transport: Optional[str] = None,
+        api_endpoint: Optional[str] = None,
+    ):
+        self.key_pool = key_pool
+        self.model_name = model_name
+        self.transport = transport or None
+        self.api_endpoint = api_endpoint or None
+        self._models: Dict[Tuple[str, str], "genai.GenerativeModel"] = {}
+
+    @property
+    def uses_rest(self) -> bool:
+        # The async Gemini client only speaks gRPC, so REST calls run the sync
+        # client on a worker thread instead.
+        return self.transport == "rest"
+
+    def _model(self, api_key: str, model_name: Optional[str] = None) -> "genai.GenerativeModel":
+        # ``genai.configure`` is process-wide, so each key gets its own clients
+        # instead; concurrent calls on different keys must not share one.
+        model_name = model_name or self.model_name
+        model = self._models.get((api_key, model_name))
+        if model is None:
+            client_options = {"api_key": api_key}
+            if self.api_endpoint:
+                client_options["api_endpoint"] = self.api_endpoint
+            model = genai.GenerativeModel(model_name)
+            if self.uses_rest:
+                model._client = glm.GenerativeServiceClient(transport="rest", client_options=client_options)
+            else:
+                model._client = glm.GenerativeServiceClient(client_options=client_options)
+                model._async_client = glm.GenerativeServiceAsyncClient(client_options=client_options)
+            self._models[(api_key, model_name)] = model
+        return model
+
+    @asynccontextmanager
+    async def _key(self) -> AsyncIterator[str]:
+        api_key = await self.key_pool.acquire()
+        try:
+            yield api_key
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.key_pool.report_rate_limited(api_key)
+            raise
+
+    async def generate(self, prompt: str, model: Optional[str] = None) -> str:
+        async with self._key() as api_key:
+            model = self._model(api_key, model)
+            if self.uses_rest:
+                response = await asyncio.to_thread(model.generate_content, prompt)
+            else:
+                response = await model.generate_content_async(prompt)
+        if not response or not response.text:
+            raise ProviderError("Empty or invalid response from Gemini API")
+        return response.text
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        async with self._key() as api_key:
+            model = self._model(api_key)
+            if self.uses_rest:
+                response = await asyncio.to_thread(model.generate_content, prompt, stream=True)
+                chunks = iter(response)
+                while True:
+                    chunk = await asyncio.to_thread(next, chunks, None)
+                    if chunk is None:
+                        return
+                    if chunk.text:
+                        yield chunk.text
+            response = await model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+
+    async def count_tokens(self, prompt: str) -> int:
+        async with self._key() as api_key:
+            model = self._model(api_key)
+            result = await asyncio.to_thread(model.count_tokens, prompt)
+        return result.total_tokens
+
+
+class LocalProvider:
+    """Deterministic offline provider for load tests and local development.
+
+    Latency is drawn from a seeded RNG so a run can be replayed exactly, and a
+    configurable fraction of calls fails with a generic or a rate-limit error.
+    The completion itself depends only on the prompt.
+    """
+
+    name = "local"
+
+    LATENCY_DISTRIBUTIONS = ("constant", "uniform", "lognormal")
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        latency_distribution: str = "uniform",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 0,
+        chunk_size: int = 80,
+    ):
+        if latency_distribution not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.chunk_size = chunk_size
+        self._rng = random.Random(seed)
+
+    def _sample_latency(self) -> float:
+        if self.latency_distribution == "constant" or not self.latency_jitter_ms:
+            latency_ms = self.latency_ms
+        elif self.latency_distribution == "uniform":
+            latency_ms = self._rng.uniform(
+                self.latency_ms - self.latency_jitter_ms,
+                self.latency_ms + self.latency_jitter_ms,
+            )
+        else:
+            # Median of ``latency_ms`` with a long right tail, like real upstreams.
+            sigma = self.latency_jitter_ms / max(self.latency_ms, 1.0)
+            latency_ms = self.latency_ms * math.exp(self._rng.gauss(0.0, sigma))
+        return max(latency_ms, 0.0) / 1000.0
+
+    async def _simulate_call(self) -> None:
+        latency = self._sample_latency()
+        roll = self._rng.random()
+        if latency:
+            await asyncio.sleep(latency)
+        if roll < self.rate_limit_rate:
+            raise ProviderRateLimitError("429 ResourceExhausted: local provider quota exceeded")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise ProviderError("500 Internal: local provider failure")
+
+    def _completion(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        headings = [
+            "Overall Structure and Formatting",
+            "Content and Relevance",
+            "Skills and Qualifications",
+            "Experience Description",
+            "Education Section",
+            "Specific Improvements",
+        ]
+        sections = ["# CV Review Summary", f"Generated locally (prompt {digest})."]
+        for heading in headings:
+            sections.append(f"## {heading}")
+            sections.append(f"- Deterministic feedback on {heading.lower()}.")
+        return "\n\n".join(sections)
+
+    async def generate(self, prompt: str, model: Optional[str] = None) -> str:
+        await self._simulate_call()
+        return self._completion(prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        await self._simulate_call()
+        text = self._completion(prompt)
+        for start in range(0, len(text), self.chunk_size):
+            await asyncio.sleep(0)
+            yield text[start:start + self.chunk_size]
+
+    async def count_tokens(self, prompt: str) -> int:
+        # Roughly four characters per token, the same ratio Gemini documents.
+        return max(1, math.ceil(len(prompt) / 4))
+
+
+_provider: Optional[LLMProvider] = None
+
+
+def get_llm_provider() -> Optional[LLMProvider]:
+    """Return the configured provider, or None when Gemini has no API keys."""
+    global _provider
+    if _provider is None:
+        provider_name = settings.LLM_PROVIDER.lower()
+        if provider_name == "gemini":
+            api_keys = settings.gemini_api_keys
+            if not api_keys:
+                return None
+            key_pool = ApiKeyPool(
+                parse_key_budgets(api_keys, settings.GEMINI_KEY_REQUESTS_PER_MINUTE),
+                cooldown_seconds=settings.GEMINI_KEY_COOLDOWN_SECONDS,
+            )
+            _provider = GeminiProvider(
+                key_pool,
+                settings.GEMINI_MODEL,
+                transport=settings.GEMINI_TRANSPORT,
+                api_endpoint=settings.GEMINI_API_ENDPOINT,
+            )
+        elif provider_name == "local":
+            _provider = LocalProvider(
+                latency_ms=settings.LOCAL_LLM_LATENCY_MS,
+                latency_jitter_ms=settings.LOCAL_LLM_LATENCY_JITTER_MS,
+                latency_distribution=settings.LOCAL_LLM_LATENCY_DISTRIBUTION,
+                error_rate=settings.LOCAL_LLM_ERROR_RATE,
+                rate_limit_rate=settings.LOCAL_LLM_RATE_LIMIT_RATE,
+                seed=settings.LOCAL_LLM_SEED,
+            )
+        else:
+            raise RuntimeError(f"Unknown LLM_PROVIDER: {settings.LLM_PROVIDER}")
+        logger.info(f"Using LLM provider: {_provider.name}")
+    return _provider
+
+
+def reset_llm_provider() -> None:
+    """Drop the cached provider so the next call re-reads settings."""
+    global _provider
+    _provider = None
@@ -0,0 +1,145 @@
+"""Learned alternative to the rule-based CV score.
+
+A ridge-regularised linear model over ``log1p`` feature counts, trained
+offline with NumPy on the feature vectors and scores stored with each review
+(see ``api/train_score_model.py``) and saved as a small JSON weights file.
+Inference is one matrix-vector product, so thousands of rows score at once.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class LinearScoreModel:
+    feature_names: Tuple[str, ...]
+    features_version: str
+    mean: np.ndarray
+    scale: np.ndarray
+    weights: np.ndarray
+    bias: float
+    min_score: float = 1.0
+    max_score: float = 10.0
+    trained_rows: int = 0
+    rmse: float = 0.0
+
+    @property
+    def version(self) -> str:
+        payload = np.concatenate([self.mean, self.scale, self.weights, [self.bias]]).tobytes()
+        return hashlib.sha256(payload).hexdigest()[:12]
+
+    def _standardize(self, features: np.ndarray) -> np.ndarray:
+        return (np.log1p(np.asarray(features, dtype=np.float64)) - self.mean) / self.scale
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Score every row of a feature matrix ordered as ``feature_names``."""
+        raw = self._standardize(features) @ self.weights + self.bias
+        return np.round(np.clip(raw, self.min_score, self.max_score), 1)
+
+    def breakdown(self, features: Dict[str, int]) -> Dict[str, object]:
+        """Per-feature contributions on top of the bias, before clamping."""
+        row = np.array([[features.get(name, 0) for name in self.feature_names]])
+        contributions = self._standardize(row)[0] * self.weights
+        return {
+            "base_score": round(self.bias, 3),
+            "components": [
+                {"name": name, "value": int(row[0, index]), "points": round(float(contributions[index]), 3)}
+                for index, name in enumerate(self.feature_names)
+            ],
+            "score": float(self.predict(row)[0]),
+        }
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "kind": "linear",
+            "feature_names": list(self.feature_names),
+            "features_version": self.features_version,
+            "transform": "log1p",
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "weights": self.weights.tolist(),
+            "bias": self.bias,
+            "min_score": self.min_score,
+            "max_score": self.max_score,
+            "trained_rows": self.trained_rows,
+            "rmse": self.rmse,
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, object]) -> "LinearScoreModel":
+        if raw.get("kind") != "linear" or raw.get("transform") != "log1p":
+            raise ValueError("Only linear models over log1p features are supported")
+        names = tuple(raw["feature_names"])
+        arrays = [np.array(raw[key], dtype=np.float64) for key in ("mean", "scale", "weights")]
+        if any(array.shape != (len(names),) for array in arrays):
+            raise ValueError("Model weights do not match its feature names")
+        mean, scale, weights = arrays
+        return cls(
+            feature_names=names,
+            features_version=str(raw["features_version"]),
+            mean=mean,
+            scale=scale,
+            weights=weights,
+            bias=float(raw["bias"]),
+            min_score=float(raw.get("min_score", 1.0)),
+            max_score=float(raw.get("max_score", 10.0)),
+            trained_rows=int(raw.get("trained_rows", 0)),
+            rmse=float(raw.get("rmse", 0.0)),
+        )
+
+
+def train_linear_model(
+    features: np.ndarray,
+    targets: Sequence[float],
+    feature_names: Sequence[str],
+    features_version: str,
+    ridge: float = 1.0,
+    min_score: float = 1.0,
+    max_score: float = 10.0,
+) -> LinearScoreModel:
+    """Fit ridge regression from feature rows to historical scores."""
+    targets = np.asarray(targets, dtype=np.float64)
+    if len(features) != len(targets) or not len(targets):
+        raise ValueError("Need one target per feature row and at least one row")
+
+    transformed = np.log1p(np.asarray(features, dtype=np.float64))
+    mean = transformed.mean(axis=0)
+    scale = transformed.std(axis=0)
+    # Constant columns carry no signal; a unit scale keeps them at zero.
+    scale[scale == 0] = 1.0
+    standardized = (transformed - mean) / scale
+
+    bias = float(targets.mean())
+    # Ridge as least squares over the data stacked on sqrt(ridge) * I.
+    design = np.vstack([standardized, np.sqrt(ridge) * np.eye(standardized.shape[1])])
+    response = np.concatenate([targets - bias, np.zeros(standardized.shape[1])])
+    weights, *_ = np.linalg.lstsq(design, response, rcond=None)
+
+    model = LinearScoreModel(
+        feature_names=tuple(feature_names),
+        features_version=features_version,
+        mean=mean,
+        scale=scale,
+        weights=weights,
+        bias=bias,
+        min_score=min_score,
+        max_score=max_score,
+        trained_rows=len(targets),
+    )
+    rmse = float(np.sqrt(np.mean((model.predict(features) - targets) ** 2)))
+    return LinearScoreModel(**{**model.__dict__, "rmse": round(rmse, 4)})
+
+
+def save_model(model: LinearScoreModel, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as model_file:
+        json.dump(model.to_dict(), model_file, indent=2)
+
+
+@lru_cache
+def load_model(path: str) -> LinearScoreModel:
+    with open(path, encoding="utf-8") as model_file:
+        return LinearScoreModel.from_dict(json.load(model_file))
@@ -0,0 +1,329 @@
+"""Heuristic CV score.
+
+Keyword classes, thresholds and weights come from a versioned JSON rules file
+(``scoring_rules.json`` unless ``SCORING_RULES_PATH`` points elsewhere). The
+file is compiled once into a single pattern that counts every class in one
+pass over the lowercased text. ``score_cvs`` applies the rules to a whole
+feature matrix at once with NumPy. With ``SCORING_METHOD=model`` the same
+features feed the learned model in ``score_model`` instead.
+"""
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from api.core.config import settings
+from api.services.score_model import LinearScoreModel, load_model
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "scoring_rules.json")
+MATCH_MODES = ("occurrences", "distinct_words")
+SCORING_METHODS = ("rules", "model")
+
+
+@dataclass(frozen=True)
+class ScoreClass:
+    """One counted feature.
+
+    ``occurrences`` counts non-overlapping matches of the class's keywords or
+    pattern, like ``re.findall`` over that class alone. ``distinct_words``
+    counts distinct keywords that appear after a space or newline and before a
+    space.
+    """
+    name: str
+    thresholds: Tuple[Tuple[int, float], ...]
+    keywords: Tuple[str, ...] = ()
+    pattern: Optional[str] = None
+    first_chars: str = ""
+    match: str = "occurrences"
+
+
+@dataclass(frozen=True)
+class WordCountBand:
+    min: Optional[int]
+    max: Optional[int]
+    points: float
+
+
+@dataclass(frozen=True)
+class ScoringRules:
+    version: str
+    base_score: float
+    min_score: float
+    max_score: float
+    word_count_bands: Tuple[WordCountBand, ...]
+    classes: Tuple[ScoreClass, ...]
+    scanner: "re.Pattern[str]"
+    keyword_classes: Dict[str, Tuple[ScoreClass, ...]]
+    # Changes only when what is counted changes, not when thresholds or
+    # weights do, so stored features stay reusable across most rule edits.
+    features_version: str
+
+    @property
+    def feature_names(self) -> Tuple[str, ...]:
+        return ("word_count", *(score_class.name for score_class in self.classes))
+
+
+def _trie_pattern(words) -> str:
+    """Alternation with shared prefixes factored out, one branch per first letter."""
+    branches: Dict[str, list] = {}
+    for word in sorted(words):
+        branches.setdefault(word[0], []).append(word[1:])
+    parts = []
+    for first, rests in branches.items():
+        if len(rests) == 1:
+            parts.append(re.escape(first + rests[0]))
+        else:
+            parts.append(f"{re.escape(first)}(?:{_trie_pattern(rests)})")
+    return "|".join(parts)
+
+
+def _compile_scanner(keywords, pattern_classes: List[ScoreClass]) -> "re.Pattern[str]":
+    # Each position can match at most one keyword or pattern, so the scanner
+    # only sees every occurrence when no keyword is a prefix of another and
+    # patterns start with characters no keyword starts with.
+    for word in keywords:
+        for other in keywords:
+            if word != other and other.startswith(word):
+                raise ValueError(f"Keyword {word!r} is a prefix of {other!r}")
+    claimed = {word[0]: f"keyword {word!r}" for word in keywords}
+    for score_class in pattern_classes:
+        if not score_class.first_chars:
+            raise ValueError(f"Pattern class {score_class.name!r} must list its first_chars")
+        for char in score_class.first_chars:
+            if char in claimed:
+                raise ValueError(f"Pattern class {score_class.name!r} and {claimed[char]} can both start with {char!r}")
+            claimed[char] = f"pattern class {score_class.name!r}"
+
+    alternatives = []
+    if keywords:
+        alternatives.append(f"(?P<keyword>{_trie_pattern(keywords)})")
+    alternatives.extend(f"(?P<pattern_{index}>{score_class.pattern})" for index, score_class in enumerate(pattern_classes))
+    first_chars = re.escape("".join(sorted(claimed)))
+    # Zero-width lookaheads report a match at every position, including ones
+    # that overlap an earlier match from a different class. The leading
+    # character class cheaply skips positions where nothing can start.
+    return re.compile(rf"(?=[{first_chars}])(?=" + "|".join(alternatives) + ")")
+
+
+def _parse_class(raw: dict) -> ScoreClass:
+    name = raw["name"]
+    keywords = tuple(word.lower() for word in raw.get("keywords", ()))
+    pattern = raw.get("pattern")
+    if bool(keywords) == bool(pattern):
+        raise ValueError(f"Class {name!r} needs either keywords or a pattern")
+    match = raw.get("match", "occurrences")
+    if match not in MATCH_MODES:
+        raise ValueError(f"Class {name!r} has unknown match mode {match!r}")
+    if pattern and match != "occurrences":
+        raise ValueError(f"Pattern class {name!r} can only count occurrences")
+    if pattern and re.compile(pattern).groups:
+        raise ValueError(f"Pattern class {name!r} may only use non-capturing groups")
+    thresholds = tuple(sorted(((int(count), float(points)) for count, points in raw["thresholds"]), reverse=True))
+    if not thresholds or any(count < 1 for count, _ in thresholds):
+        raise ValueError(f"Class {name!r} thresholds must be at least 1")
+    return ScoreClass(
+        name=name,
+        thresholds=thresholds,
+        keywords=keywords,
+        pattern=pattern,
+        first_chars=raw.get("first_chars", ""),
+        match=match,
+    )
+
+
+def compile_scoring_rules(raw: dict) -> ScoringRules:
+    """Validate a rules document and compile it into a scanner."""
+    classes = tuple(_parse_class(entry) for entry in raw["classes"])
+    names = [score_class.name for score_class in classes]
+    if len(set(names)) != len(names) or "word_count" in names:
+        raise ValueError("Class names must be unique and may not be 'word_count'")
+
+    keyword_classes: Dict[str, Tuple[ScoreClass, ...]] = {}
+    for score_class in classes:
+        for word in score_class.keywords:
+            keyword_classes[word] = keyword_classes.get(word, ()) + (score_class,)
+    pattern_classes = [score_class for score_class in classes if score_class.pattern]
+    definitions = [(c.name, c.keywords, c.pattern, c.match) for c in classes]
+    features_version = hashlib.sha256(json.dumps(definitions).encode()).hexdigest()[:12]
+
+    return ScoringRules(
+        version=str(raw["version"]),
+        base_score=float(raw["base_score"]),
+        min_score=float(raw["min_score"]),
+        max_score=float(raw["max_score"]),
+        word_count_bands=tuple(
+            WordCountBand(min=band.get("min"), max=band.get("max"), points=float(band["points"]))
+            for band in raw.get("word_count_bands", ())
+        ),
+        classes=classes,
+        scanner=_compile_scanner(keyword_classes, pattern_classes),
+        keyword_classes=keyword_classes,
+        features_version=features_version,
+    )
+
+
+@lru_cache
+def load_scoring_rules(path: str) -> ScoringRules:
+    with open(path, encoding="utf-8") as rules_file:
+        return compile_scoring_rules(json.load(rules_file))
+
+
+def get_scoring_rules() -> ScoringRules:
+    return load_scoring_rules(settings.SCORING_RULES_PATH or DEFAULT_RULES_PATH)
+
+
+def count_keyword_classes(cv_lower: str, rules: Optional[ScoringRules] = None) -> Dict[str, int]:
+    """Count every class in one pass over lowercased CV text."""
+    rules = rules or get_scoring_rules()
+    pattern_classes = [score_class for score_class in rules.classes if score_class.pattern]
+    counts = {score_class.name: 0 for score_class in rules.classes}
+    ends = dict.fromkeys(counts, 0)
+    words: Dict[str, set] = {}
+    for match in rules.scanner.finditer(cv_lower):
+        start = match.start()
+        group = match.lastgroup
+        if group != "keyword":
+            name = pattern_classes[int(group.rpartition("_")[2])].name
+            if start >= ends[name]:
+                counts[name] += 1
+                ends[name] = match.end(group)
+            continue
+        keyword = match.group("keyword")
+        end = start + len(keyword)
+        for score_class in rules.keyword_classes[keyword]:
+            name = score_class.name
+            if score_class.match == "distinct_words":
+                if start and cv_lower[start - 1] in " \n" and cv_lower[end:end + 1] == " ":
+                    words.setdefault(name, set()).add(keyword)
+            elif start >= ends[name]:
+                counts[name] += 1
+                ends[name] = end
+    for name, seen in words.items():
+        counts[name] = len(seen)
+    return counts
+
+
+def extract_features(cv_content: str, rules: Optional[ScoringRules] = None) -> List[int]:
+    """One feature-matrix row, ordered as ``rules.feature_names``."""
+    rules = rules or get_scoring_rules()
+    counts = count_keyword_classes(cv_content.lower(), rules)
+    counts["word_count"] = len(cv_content.split())
+    return [counts[name] for name in rules.feature_names]
+
+
+def get_score_model(rules: ScoringRules) -> Optional[LinearScoreModel]:
+    """The learned model when ``SCORING_METHOD`` is "model", otherwise None."""
+    if settings.SCORING_METHOD not in SCORING_METHODS:
+        raise RuntimeError(f"Unknown SCORING_METHOD {settings.SCORING_METHOD!r}")
+    if settings.SCORING_METHOD == "rules":
+        return None
+    if not settings.SCORING_MODEL_PATH:
+        raise RuntimeError("SCORING_MODEL_PATH must be set when SCORING_METHOD is 'model'")
+    model = load_model(settings.SCORING_MODEL_PATH)
+    if model.features_version != rules.features_version or model.feature_names != rules.feature_names:
+        raise RuntimeError("The scoring model was trained on features the current rules no longer count")
+    return model
+
+
+def scoring_version(rules: Optional[ScoringRules] = None) -> str:
+    """Identifies how scores are computed right now, for score_rules_version."""
+    rules = rules or get_scoring_rules()
+    model = get_score_model(rules)
+    return f"{rules.version}+model.{model.version}" if model else rules.version
+
+
+def score_features(features: np.ndarray, rules: Optional[ScoringRules] = None) -> np.ndarray:
+    """Score every row of a feature matrix with the configured scoring method."""
+    rules = rules or get_scoring_rules()
+    model = get_score_model(rules)
+    if model is not None:
+        return model.predict(features)
+    return apply_rules(features, rules)
+
+
+def apply_rules(features: np.ndarray, rules: ScoringRules) -> np.ndarray:
+    """Apply the heuristic scoring rules to every row of a feature matrix."""
+    word_count = features[:, 0]
+
+    score = np.full(len(features), rules.base_score)
+    if rules.word_count_bands:
+        # Like an if/elif chain, only the first matching band applies.
+        bands = [
+            (word_count >= (band.min if band.min is not None else -np.inf))
+            & (word_count <= (band.max if band.max is not None else np.inf))
+            for band in rules.word_count_bands
+        ]
+        score += np.select(bands, [band.points for band in rules.word_count_bands], 0.0)
+
+    for index, score_class in enumerate(rules.classes, start=1):
+        column = features[:, index]
+        score += np.select(
+            [column >= count for count, _ in score_class.thresholds],
+            [points for _, points in score_class.thresholds],
+            0.0,
+        )
+
+    return np.round(np.clip(score, rules.min_score, rules.max_score), 1)
+
+
+def score_cvs(texts: Iterable[str], rules: Optional[ScoringRules] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Score many CVs at once.
+
+    Returns the per-CV scores and the integer feature matrix they were
+    computed from, one row per text and one column per feature name.
+    """
+    rules = rules or get_scoring_rules()
+    rows = [extract_features(text, rules) for text in texts]
+    features = np.array(rows, dtype=np.int64).reshape(len(rows), len(rules.feature_names))
+    return score_features(features, rules), features
+
+
+def score_cv_features(cv_content: str, rules: Optional[ScoringRules] = None) -> Tuple[float, Dict[str, int]]:
+    """Score one CV and return the named feature counts behind the score."""
+    rules = rules or get_scoring_rules()
+    row = extract_features(cv_content, rules)
+    score = float(score_features(np.array([row], dtype=np.int64), rules)[0])
+    return score, dict(zip(rules.feature_names, row))
+
+
+def score_cv(cv_content: str, rules: Optional[ScoringRules] = None) -> float:
+    return score_cv_features(cv_content, rules)[0]
+
+
+def features_matrix(stored: Iterable[Dict[str, int]], rules: Optional[ScoringRules] = None) -> np.ndarray:
+    """Stack stored feature dicts into a matrix; missing features count as 0."""
+    rules = rules or get_scoring_rules()
+    rows = [[features.get(name, 0) for name in rules.feature_names] for features in stored]
+    return np.array(rows, dtype=np.int64).reshape(len(rows), len(rules.feature_names))
+
+
+def score_breakdown(features: Dict[str, int], rules: Optional[ScoringRules] = None) -> Dict[str, object]:
+    """Points each feature contributed, on top of the base score, before clamping."""
+    rules = rules or get_scoring_rules()
+    model = get_score_model(rules)
+    if model is not None:
+        return {"rules_version": scoring_version(rules), **model.breakdown(features)}
+    word_count = features.get("word_count", 0)
+    band_points = next(
+        (
+            band.points for band in rules.word_count_bands
+            if (band.min is None or word_count >= band.min) and (band.max is None or word_count <= band.max)
+        ),
+        0.0,
+    )
+    components = [{"name": "word_count", "value": word_count, "points": band_points}]
+    for score_class in rules.classes:
+        value = features.get(score_class.name, 0)
+        points = next((points for count, points in score_class.thresholds if value >= count), 0.0)
+        components.append({"name": score_class.name, "value": value, "points": points})
+    return {
+        "rules_version": rules.version,
+        "base_score": rules.base_score,
+        "components": components,
+        "score": float(score_features(features_matrix([features], rules), rules)[0]),
+    }
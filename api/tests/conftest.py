@@ -11,6 +11,13 @@ from api.core.database import Base, get_db
 from api.core.auth import get_current_active_user, get_password_hash
 from api.main import app
 from api.models.models import User, CreditBalance
+from api.core.config import settings
+from api.services import ai_service
+from api.services.circuit_breaker import CircuitBreaker
+from api.services.concurrency import AdaptiveConcurrencyLimiter
+from api.services.llm_providers import is_rate_limit_error, reset_llm_provider
+from api.tests.fake_gemini import FakeGeminiServer
+from api.utils.extraction_cache import ExtractionCache, extraction_cache as cache
 
 TEST_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 test_engine = create_async_engine(
@@ -81,3 +88,47 @@ def client(setup_test_db) -> TestClient:
         yield c
     
     app.dependency_overrides = {}
+
+@pytest.fixture
+def session_factory(setup_test_db, monkeypatch) -> sessionmaker:
+    """Point code that opens its own sessions, such as background jobs, at the test database."""
+    from api import backfill_reviews
+    from api.routers import reviews
+    for module in (reviews, backfill_reviews):
+        monkeypatch.setattr(module, "get_session_factory", lambda: TestingSessionLocal)
+    return TestingSessionLocal
+
+@pytest.fixture(autouse=True)
+def llm_breaker(monkeypatch) -> CircuitBreaker:
+    """Start every test with a closed breaker, whatever earlier tests did."""
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+    monkeypatch.setattr(ai_service, "llm_breaker", breaker)
+    return breaker
+
+@pytest.fixture(autouse=True)
+def extraction_cache() -> Generator[ExtractionCache, None, None]:
+    """Start every test with an empty extraction cache and zeroed hit counts."""
+    cache.clear()
+    yield cache
+    cache.clear()
+
+@pytest.fixture
+def llm_limiter(monkeypatch) -> AdaptiveConcurrencyLimiter:
+    """Give each test its own concurrency limiter so earlier 429s do not shrink it."""
+    limiter = AdaptiveConcurrencyLimiter(
+        initial=8, minimum=1, maximum=32, latency_target=10.0, is_overload=is_rate_limit_error
+    )
+    monkeypatch.setattr(ai_service, "llm_limiter", limiter)
+    return limiter
+
+@pytest.fixture
+def fake_gemini(monkeypatch, llm_limiter) -> Generator[FakeGeminiServer, None, None]:
+    """Point the Gemini provider at a local fake server for the duration of a test."""
+    with FakeGeminiServer() as server:
+        monkeypatch.setattr(settings, "LLM_PROVIDER", "gemini")
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "fake-gemini-key")
+        monkeypatch.setattr(settings, "GEMINI_TRANSPORT", "rest")
+        monkeypatch.setattr(settings, "GEMINI_API_ENDPOINT", server.url)
+        reset_llm_provider()
+        yield server
+    reset_llm_provider()
@@ -0,0 +1,188 @@
+"""Local stand-in for the Gemini REST API used by load and chaos tests.
+
+It serves ``models/*:generateContent`` and ``models/*:streamGenerateContent``
+closely enough for ``google.generativeai`` with ``transport="rest"`` to talk
+to it unchanged. Each request consumes the next scripted ``FakeResponse``;
+once the script is empty the default response is used.
+
+Run it standalone to point a local API process at it::
+
+    python -m api.tests.fake_gemini --port 8765 --latency 0.5 --rate-limit-rate 0.2
+
+and start the API with ``GEMINI_TRANSPORT=rest`` and
+``GEMINI_API_ENDPOINT=http://127.0.0.1:8765``.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, List, Optional
+
+DEFAULT_TEXT = "# CV Review Summary\n\n## Overall Structure and Formatting\n\n- Served by the fake Gemini server."
+
+@dataclass
+class FakeResponse:
+    """One scripted reply.
+
+    ``kind`` is one of ``ok``, ``rate_limit`` (HTTP 429), ``error`` (HTTP 500),
+    ``timeout`` (hold the connection for ``latency`` seconds, then drop it) or
+    ``truncated`` (advertise the full body but close halfway through it).
+    """
+    kind: str = "ok"
+    latency: float = 0.0
+    text: str = DEFAULT_TEXT
+
+KINDS = ("ok", "rate_limit", "error", "timeout", "truncated")
+
+def _candidate(text: str) -> dict:
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": 1,
+            "index": 0,
+        }]
+    }
+
+def _error_body(code: int, status: str, message: str) -> bytes:
+    return json.dumps({"error": {"code": code, "status": status, "message": message}}).encode()
+
+class FakeGeminiServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, default: Optional[FakeResponse] = None,
+                 rate_limit_rate: float = 0.0, seed: int = 0, stream_chunk_size: int = 40):
+        self.default = default or FakeResponse()
+        self.rate_limit_rate = rate_limit_rate
+        self.stream_chunk_size = stream_chunk_size
+        self.requests: List[dict] = []
+        self._script: Deque[FakeResponse] = deque()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._stopped = threading.Event()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def enqueue(self, *responses: FakeResponse) -> None:
+        with self._lock:
+            self._script.extend(responses)
+
+    def rate_limit_burst(self, count: int) -> None:
+        """Answer the next ``count`` requests with HTTP 429."""
+        self.enqueue(*[FakeResponse(kind="rate_limit") for _ in range(count)])
+
+    def next_response(self) -> FakeResponse:
+        with self._lock:
+            if self._script:
+                return self._script.popleft()
+            if self.rate_limit_rate and self._rng.random() < self.rate_limit_rate:
+                return FakeResponse(kind="rate_limit")
+            return self.default
+
+    def start(self) -> "FakeGeminiServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeGeminiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                stream = ":streamGenerateContent" in self.path
+                if not (stream or ":generateContent" in self.path):
+                    self._send(404, _error_body(404, "NOT_FOUND", f"Unknown path {self.path}"))
+                    return
+
+                with server._lock:
+                    server.requests.append({
+                        "path": self.path,
+                        "api_key": self.headers.get("x-goog-api-key"),
+                        "body": body.decode("utf-8", "replace"),
+                    })
+                reply = server.next_response()
+
+                if reply.kind == "timeout":
+                    server._stopped.wait(reply.latency or 3600)
+                    self.close_connection = True
+                    return
+                if reply.latency:
+                    server._stopped.wait(reply.latency)
+                if reply.kind == "rate_limit":
+                    self._send(429, _error_body(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota)."))
+                elif reply.kind == "error":
+                    self._send(500, _error_body(500, "INTERNAL", "An internal error has occurred."))
+                elif reply.kind == "truncated":
+                    payload = json.dumps(_candidate(reply.text)).encode()
+                    self._send(200, payload[: len(payload) // 2], content_length=len(payload))
+                    self.close_connection = True
+                elif stream:
+                    chunks = [
+                        _candidate(reply.text[start:start + server.stream_chunk_size])
+                        for start in range(0, len(reply.text), server.stream_chunk_size)
+                    ]
+                    self._send(200, json.dumps(chunks).encode())
+                else:
+                    self._send(200, json.dumps(_candidate(reply.text)).encode())
+
+            def _send(self, status: int, payload: bytes, content_length: Optional[int] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("Content-Length", str(content_length if content_length is not None else len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                self.wfile.flush()
+
+        return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Gemini REST server for load and chaos testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before every reply")
+    parser.add_argument("--kind", choices=KINDS, default="ok", help="Default reply kind")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fake = FakeGeminiServer(
+        host=args.host,
+        port=args.port,
+        default=FakeResponse(kind=args.kind, latency=args.latency),
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    print(f"Fake Gemini server listening on {fake.url}")
+    fake.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,191 @@
+import asyncio
+import time
+
+import pytest
+
+from api.core.config import settings
+from api.models.models import ReviewTier
+from api.services import ai_service
+from api.services.concurrency import AdaptiveConcurrencyLimiter
+from api.services.llm_providers import (
+    LLMProvider,
+    LocalProvider,
+    ProviderRateLimitError,
+    get_llm_provider,
+    reset_llm_provider,
+)
+
+CV_TEXT = "Jane Doe\nExperience: developed APIs\nSkills: Python\nEducation: BSc"
+
+@pytest.fixture
+def local_provider(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "local")
+    monkeypatch.setattr(settings, "LOCAL_LLM_LATENCY_MS", 0.0)
+    monkeypatch.setattr(settings, "LOCAL_LLM_LATENCY_JITTER_MS", 0.0)
+    reset_llm_provider()
+    yield get_llm_provider()
+    reset_llm_provider()
+
+async def test_local_provider_is_deterministic():
+    first = LocalProvider(seed=7)
+    second = LocalProvider(seed=7)
+
+    assert isinstance(first, LLMProvider)
+    assert await first.generate("prompt") == await second.generate("prompt")
+    assert await first.generate("prompt") != await first.generate("other prompt")
+
+async def test_local_provider_stream_matches_generate():
+    provider = LocalProvider(chunk_size=16)
+
+    chunks = [chunk async for chunk in provider.stream("prompt")]
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == await provider.generate("prompt")
+    assert await provider.count_tokens("x" * 40) == 10
+
+async def test_local_provider_rate_limit_errors():
+    provider = LocalProvider(rate_limit_rate=1.0)
+
+    with pytest.raises(ProviderRateLimitError):
+        await provider.generate("prompt")
+
+async def test_generate_review_uses_configured_provider(local_provider):
+    review, score = await ai_service.generate_review(CV_TEXT)
+
+    assert local_provider.name == "local"
+    assert review == await local_provider.generate(ai_service.build_review_prompt(CV_TEXT))
+    assert score == ai_service.score_cv(CV_TEXT)
+
+async def test_generate_review_falls_back_after_rate_limits(local_provider, monkeypatch):
+    async def no_sleep(_):
+        return None
+
+    monkeypatch.setattr(local_provider, "rate_limit_rate", 1.0)
+    monkeypatch.setattr(ai_service.asyncio, "sleep", no_sleep)
+
+    review, _ = await ai_service.generate_review(CV_TEXT)
+
+    assert review == ai_service.generate_mock_review(CV_TEXT)
+
+SECTIONED_CV = """Jane Doe
+jane@example.com
+
+Summary
+Backend engineer focused on APIs.
+
+Experience:
+Led a team of 5 people at Acme.
+
+Education
+BSc Computer Science, University of Lincoln
+
+Skills: Python, FastAPI, PostgreSQL
+"""
+
+class RecordingProvider:
+    name = "recording"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.prompts = []
+        self.models = []
+
+    async def generate(self, prompt: str, model=None) -> str:
+        self.prompts.append(prompt)
+        self.models.append(model)
+        await asyncio.sleep(self.latency)
+        return f"- feedback {len(self.prompts)}"
+
+def test_split_cv_sections():
+    sections = ai_service.split_cv_sections(SECTIONED_CV)
+
+    assert sections["header"] == "Jane Doe\njane@example.com"
+    assert sections["summary"] == "Backend engineer focused on APIs."
+    assert sections["experience"] == "Led a team of 5 people at Acme."
+    assert sections["education"] == "BSc Computer Science, University of Lincoln"
+    assert sections["skills"] == "Python, FastAPI, PostgreSQL"
+
+async def test_sectioned_review_runs_sections_concurrently(llm_limiter):
+    provider = RecordingProvider(latency=0.2)
+
+    started = time.monotonic()
+    review, generated = await ai_service.generate_sectioned_review(provider, SECTIONED_CV)
+
+    assert time.monotonic() - started < 0.6
+    assert generated == len(ai_service.REVIEW_SECTIONS)
+    assert len(provider.prompts) == len(ai_service.REVIEW_SECTIONS)
+    headings = [line[3:] for line in review.splitlines() if line.startswith("## ")]
+    assert headings == [heading for heading, _ in ai_service.REVIEW_SECTIONS]
+
+    skills_prompt = next(prompt for prompt in provider.prompts if "Skills and Qualifications" in prompt)
+    assert "Python, FastAPI, PostgreSQL" in skills_prompt
+    assert "University of Lincoln" not in skills_prompt
+
+async def test_sectioned_review_falls_back_per_section():
+    class FailingSkillsProvider(RecordingProvider):
+        async def generate(self, prompt: str, model=None) -> str:
+            if "Skills and Qualifications" in prompt:
+                raise RuntimeError("upstream failure")
+            return await super().generate(prompt, model)
+
+    review, generated = await ai_service.generate_sectioned_review(FailingSkillsProvider(), SECTIONED_CV)
+
+    assert generated == len(ai_service.REVIEW_SECTIONS) - 1
+    fallback = ai_service._mock_section_feedback(SECTIONED_CV)
+    assert fallback["Skills and Qualifications"] in review
+    assert "- feedback" in review
+
+@pytest.mark.parametrize("failing, expected_tier, expected_failures", [
+    (("Skills and Qualifications",), ReviewTier.REDUCED, 0),
+    (tuple(heading for heading, _ in ai_service.REVIEW_SECTIONS), ReviewTier.RULE_BASED, 1),
+])
+async def test_sectioned_review_tier_reflects_generated_sections(
+    llm_breaker, llm_limiter, monkeypatch, failing, expected_tier, expected_failures
+):
+    class FailingSectionsProvider(RecordingProvider):
+        async def generate(self, prompt: str, model=None) -> str:
+            if any(heading in prompt for heading in failing):
+                raise RuntimeError("upstream failure")
+            return await super().generate(prompt, model)
+
+    monkeypatch.setattr(ai_service, "get_llm_provider", lambda: FailingSectionsProvider())
+    monkeypatch.setattr(settings, "REVIEW_GENERATION_MODE", "sections")
+
+    _, _, tier = await ai_service.generate_tiered_review(SECTIONED_CV, ReviewTier.FULL)
+
+    assert tier == expected_tier
+    # One outcome for the whole review, not one per section.
+    assert llm_breaker.failures == expected_failures
+
+def test_select_review_tier_follows_breaker_and_queue(llm_breaker, llm_limiter, monkeypatch):
+    assert ai_service.select_review_tier() == ReviewTier.FULL
+
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "queue_depth", settings.REVIEW_REDUCED_QUEUE_DEPTH)
+    assert ai_service.select_review_tier() == ReviewTier.REDUCED
+
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "queue_depth", 0)
+    for _ in range(llm_breaker.failure_threshold):
+        llm_breaker.record_failure()
+    assert ai_service.select_review_tier() == ReviewTier.RULE_BASED
+
+async def test_reduced_tier_uses_short_prompt_and_cheaper_model(llm_limiter, monkeypatch):
+    provider = RecordingProvider()
+    monkeypatch.setattr(ai_service, "get_llm_provider", lambda: provider)
+    monkeypatch.setattr(settings, "REVIEW_REDUCED_MAX_WORDS", 3)
+
+    review, _, tier = await ai_service.generate_tiered_review(SECTIONED_CV, ReviewTier.REDUCED)
+
+    assert tier == ReviewTier.REDUCED
+    assert review == "- feedback 1"
+    assert provider.models == [settings.GEMINI_REDUCED_MODEL]
+    assert "Jane Doe jane@example.com" in provider.prompts[0]
+    assert "Backend engineer" not in provider.prompts[0]
+
+async def test_failed_upstream_is_marked_rule_based(local_provider, monkeypatch):
+    monkeypatch.setattr(local_provider, "error_rate", 1.0)
+
+    review, _, tier = await ai_service.generate_tiered_review(CV_TEXT)
+
+    assert tier == ReviewTier.RULE_BASED
+    assert review == ai_service.generate_mock_review(CV_TEXT)
+    assert ai_service.llm_breaker.failures == 1
@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from api.backfill_reviews import Checkpoint, backfill, extract_chunk, process_chunk
+from api.models.models import Review
+from api.services.scoring import get_scoring_rules, score_cv_features
+from api.utils.document_converter import extract_document
+from api.utils.extraction_pool import ExtractionCrashedError, ExtractionTimeoutError
+
+CV_TEXT = "Experience: led a team of 5 people\nSkills: Python\nEducation: BSc"
+
+def test_process_chunk_reextracts_and_scores():
+    rows = [
+        (1, None, "text/plain", "stale text"),
+        (2, None, None, CV_TEXT),
+    ]
+    extractions = {1: extract_document(CV_TEXT.encode(), "text/plain")}
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        updates = pool.submit(process_chunk, rows, ("extract", "score"), extractions).result()
+
+    score, features = score_cv_features(CV_TEXT)
+    assert [values["id"] for values in updates] == [1, 2]
+    assert updates[0]["content"] == CV_TEXT
+    assert "content" not in updates[1]
+    assert (updates[0]["extraction_mode"], updates[0]["extraction_truncated"]) == ("full", False)
+    assert "extraction_mode" not in updates[1]
+    assert all(values["score"] == score and values["score_features"] == features for values in updates)
+
+async def test_extract_chunk_skips_documents_that_fail_in_the_sandbox():
+    class FlakyPool:
+        async def extract(self, file_content, content_type, mode, limits):
+            if file_content == b"hangs":
+                raise ExtractionTimeoutError("too slow")
+            if file_content == b"balloons":
+                raise ExtractionCrashedError("ran out of memory")
+            return extract_document(file_content, content_type, mode, limits)
+
+    rows = [
+        (1, b"hangs", "application/pdf", "kept"),
+        (2, b"balloons", "application/pdf", "kept"),
+        (3, CV_TEXT.encode(), "text/plain", "stale text"),
+    ]
+
+    extractions = await extract_chunk(FlakyPool(), rows)
+
+    assert list(extractions) == [3]
+    assert extractions[3].text == CV_TEXT
+
+def test_checkpoint_rejects_other_tasks(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path, ["score"])
+    checkpoint.last_id = 42
+    checkpoint.save()
+
+    assert Checkpoint(path, ["score"]).load().last_id == 42
+    with pytest.raises(ValueError, match="--restart"):
+        Checkpoint(path, ["extract", "score"]).load()
+
+async def test_backfill_updates_reviews_and_resumes(session_factory, tmp_path):
+    async with session_factory() as session:
+        reviews = [
+            Review(user_id=1, filename=f"cv{index}.txt", content="", file_content=CV_TEXT.encode(),
+                   content_type="text/plain", score=1.0)
+            for index in range(5)
+        ]
+        session.add_all(reviews)
+        await session.commit()
+    ids = [review.id for review in reviews]
+
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), ["extract", "score"])
+    # Pretend an earlier run already finished the first two reviews.
+    checkpoint.last_id = ids[1]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        processed = await backfill(["extract", "score"], checkpoint, chunk_size=2, workers=2, executor=executor)
+
+    assert processed >= 3
+    assert Checkpoint(checkpoint.path, ["extract", "score"]).load().last_id >= ids[-1]
+    async with session_factory() as session:
+        stored = {review_id: await session.get(Review, review_id) for review_id in ids}
+    assert [stored[review_id].content for review_id in ids] == ["", ""] + [CV_TEXT] * 3
+    assert [stored[review_id].extraction_mode for review_id in ids] == [None, None] + ["full"] * 3
+    assert stored[ids[-1]].extraction_truncated is False
+    assert stored[ids[0]].score == 1.0
+    assert stored[ids[-1]].score == score_cv_features(CV_TEXT)[0]
+    assert stored[ids[-1]].score_features_version == get_scoring_rules().features_version
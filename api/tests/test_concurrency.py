@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from api.services.concurrency import AdaptiveConcurrencyLimiter
+from api.services.llm_providers import ProviderRateLimitError, is_rate_limit_error
+
+def make_limiter(**overrides) -> AdaptiveConcurrencyLimiter:
+    options = dict(initial=2, minimum=1, maximum=8, latency_target=1.0, is_overload=is_rate_limit_error)
+    options.update(overrides)
+    return AdaptiveConcurrencyLimiter(**options)
+
+async def test_limiter_bounds_in_flight_calls():
+    limiter = make_limiter(latency_target=0.0)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(10)))
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth == 0
+
+async def test_limit_grows_additively_on_healthy_calls():
+    limiter = make_limiter()
+
+    for _ in range(6):
+        async with limiter.slot():
+            pass
+
+    assert 3.0 < limiter.limit < 4.5
+    assert limiter.stats["increases"] == 6
+
+async def test_limit_backs_off_multiplicatively_on_rate_limits():
+    limiter = make_limiter(initial=8)
+
+    for expected in (4.0, 2.0, 1.0, 1.0):
+        with pytest.raises(ProviderRateLimitError):
+            async with limiter.slot():
+                raise ProviderRateLimitError("429")
+        assert limiter.limit == expected
+
+async def test_concurrent_rate_limits_back_off_once():
+    limiter = make_limiter(initial=8)
+    in_flight = asyncio.Event()
+
+    async def call():
+        async with limiter.slot():
+            if limiter.in_flight == 8:
+                in_flight.set()
+            await in_flight.wait()
+            raise ProviderRateLimitError("429")
+
+    results = await asyncio.gather(*(call() for _ in range(8)), return_exceptions=True)
+
+    assert all(isinstance(result, ProviderRateLimitError) for result in results)
+    assert limiter.limit == 4.0
+    assert limiter.stats["decreases"] == 1
+    assert limiter.stats["stale_overloads"] == 7
+
+    # A call started after the decrease reports fresh overload.
+    with pytest.raises(ProviderRateLimitError):
+        async with limiter.slot():
+            raise ProviderRateLimitError("429")
+    assert limiter.limit == 2.0
+
+async def test_other_errors_leave_limit_unchanged():
+    limiter = make_limiter()
+
+    with pytest.raises(RuntimeError):
+        async with limiter.slot():
+            raise RuntimeError("boom")
+
+    assert limiter.limit == 2.0
+    assert limiter.in_flight == 0
@@ -0,0 +1,246 @@
+import io
+import os
+import tempfile
+import tracemalloc
+import zipfile
+
+import docx
+import pytest
+from docx.shared import Inches
+from fpdf import FPDF
+
+from api.core.config import settings
+from api.utils.document_converter import (
+    EXTRACTORS,
+    ExtractionLimits,
+    UnsafeDocumentError,
+    UnsupportedDocumentError,
+    convert_to_text,
+    extract_document,
+    extract_text_from_docx,
+    sniff_format,
+)
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+LIMITS = ExtractionLimits(max_pages=20, max_chars=60_000, time_budget=10.0)
+
+def make_pdf(*lines: str, pages: int = 1) -> bytes:
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=12)
+    for page in range(pages):
+        pdf.add_page()
+        for line in lines:
+            pdf.cell(0, 10, line.format(page=page + 1), new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+def make_docx(*paragraphs: str, table=None) -> bytes:
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    if table:
+        grid = document.add_table(rows=len(table), cols=len(table[0]))
+        for row, values in zip(grid.rows, table):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+@pytest.fixture
+def no_temp_files(tmp_path, monkeypatch):
+    """Fail on any temp file API and watch the temp directory for strays."""
+    def forbidden(*args, **kwargs):
+        raise AssertionError("document conversion must not create temp files")
+    for name in ("NamedTemporaryFile", "TemporaryFile", "SpooledTemporaryFile", "mkstemp", "mkdtemp"):
+        monkeypatch.setattr(tempfile, name, forbidden)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    yield tmp_path
+    assert os.listdir(tmp_path) == []
+
+def test_pdf_is_extracted_in_memory(no_temp_files):
+    text = convert_to_text(make_pdf("Jane Doe", "Experience: Python developer"), "application/pdf")
+
+    assert "Jane Doe" in text
+    assert "Experience: Python developer" in text
+
+def test_docx_is_extracted_in_memory(no_temp_files):
+    content = make_docx("Jane Doe", "Skills: Python", table=[["Employer", "Acme"]])
+
+    text = convert_to_text(content, DOCX)
+
+    assert text.splitlines() == ["Jane Doe", "Skills: Python", "Employer", "Acme"]
+
+def test_corrupt_docx_leaves_nothing_behind(no_temp_files):
+    assert extract_text_from_docx(b"PK\x03\x04 not really a docx") is None
+    # Not a zip at all, so content sniffing reads it as plain text.
+    assert convert_to_text(b"plain text sent as docx", DOCX) == "plain text sent as docx"
+
+def test_docx_merged_cells_are_emitted_once():
+    document = docx.Document()
+    document.add_paragraph("Experience")
+    grid = document.add_table(rows=3, cols=3)
+    for row_index, row in enumerate(grid.rows):
+        for column_index, cell in enumerate(row.cells):
+            cell.text = f"r{row_index}c{column_index}"
+    grid.cell(0, 0).merge(grid.cell(2, 0))
+    grid.cell(0, 1).merge(grid.cell(0, 2))
+    document.add_paragraph("Skills")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    lines = extract_text_from_docx(buffer.getvalue()).splitlines()
+
+    assert lines == ["Experience", "r0c0", "r1c0", "r2c0", "r0c1", "r0c2", "r1c1", "r1c2", "r2c1", "r2c2", "Skills"]
+
+def test_docx_keeps_tabs_and_line_breaks():
+    document = docx.Document()
+    run = document.add_paragraph("Python").add_run()
+    run.add_tab()
+    run.add_text("5 years")
+    run.add_break()
+    run.add_text("SQL")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    assert extract_text_from_docx(buffer.getvalue()) == "Python\t5 years\nSQL"
+
+def test_docx_tab_stop_definitions_are_not_text():
+    document = docx.Document()
+    paragraph = document.add_paragraph("Engineer")
+    paragraph.paragraph_format.tab_stops.add_tab_stop(Inches(1))
+    paragraph.paragraph_format.tab_stops.add_tab_stop(Inches(2))
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    assert extract_text_from_docx(buffer.getvalue()) == "Engineer"
+
+@pytest.mark.parametrize("mode", ["full", "fast"])
+def test_pdf_modes_keep_lines(mode):
+    result = extract_document(make_pdf("Jane Doe", "Experience: Python developer"), "application/pdf", mode, LIMITS)
+
+    assert result.mode == mode
+    assert result.pages == 1
+    assert not result.truncated
+    assert ["Jane Doe", "Experience: Python developer"] == [line for line in result.text.splitlines() if line.strip()][:2]
+
+def test_one_page_pdf_keeps_bare_numbers():
+    result = extract_document(make_pdf("Jane Doe", "Years of experience", "10+", "Python developer", "3"), "application/pdf")
+
+    assert [line for line in result.text.splitlines() if line] == ["Jane Doe", "Years of experience", "10+", "Python developer", "3"]
+
+def test_pdf_stops_at_page_limit():
+    limits = ExtractionLimits(max_pages=2, max_chars=60_000, time_budget=10.0)
+
+    result = extract_document(make_pdf("Role {page} of the CV"), "application/pdf", "fast", limits)
+    assert (result.pages, result.truncated) == (1, False)
+
+    result = extract_document(make_pdf("Role {page} of the CV", pages=5), "application/pdf", "fast", limits)
+    assert (result.pages, result.truncated) == (2, True)
+    assert "Role 2 of the CV" in result.text
+    assert "Role 3" not in result.text
+
+def test_pdf_stops_at_character_limit():
+    limits = ExtractionLimits(max_pages=20, max_chars=30, time_budget=10.0)
+
+    result = extract_document(make_pdf("Page {page} of a very long CV", pages=5), "application/pdf", "full", limits)
+
+    assert result.truncated
+    assert result.pages == 2
+    assert result.text.startswith("Page 1 of a very long CV")
+    assert result.raw_chars == 30
+
+def test_pdf_stops_when_time_budget_is_spent():
+    limits = ExtractionLimits(max_pages=20, max_chars=60_000, time_budget=0.0)
+
+    result = extract_document(make_pdf("Page {page}", pages=3), "application/pdf", "full", limits)
+
+    assert result.truncated
+    assert result.text is None
+
+def make_zip(entries) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+def test_docx_zip_bomb_is_rejected_before_parsing():
+    bomb = make_zip([("word/document.xml", b"\0" * (20 * 1024 * 1024))])
+
+    with pytest.raises(UnsafeDocumentError, match="compression ratio"):
+        extract_document(bomb, DOCX)
+
+def test_docx_archive_limits(monkeypatch):
+    content = make_docx("Jane Doe")
+    assert convert_to_text(content, DOCX) == "Jane Doe"
+
+    monkeypatch.setattr(settings, "DOCX_MAX_ENTRIES", 3)
+    with pytest.raises(UnsafeDocumentError, match="entries"):
+        convert_to_text(content, DOCX)
+
+    monkeypatch.setattr(settings, "DOCX_MAX_ENTRIES", 1000)
+    monkeypatch.setattr(settings, "DOCX_MAX_UNCOMPRESSED_BYTES", 1024)
+    with pytest.raises(UnsafeDocumentError, match="expands"):
+        convert_to_text(content, DOCX)
+
+def make_odt(*paragraphs: str) -> bytes:
+    body = "".join(f"<text:p>{paragraph}</text:p>" for paragraph in paragraphs)
+    return make_zip([
+        ("mimetype", b"application/vnd.oasis.opendocument.text"),
+        ("content.xml", (
+            '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+            'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">'
+            f"<office:body><office:text>{body}</office:text></office:body></office:document-content>"
+        ).encode()),
+    ])
+
+RTF = rb"{\rtf1\ansi{\fonttbl{\f0 Arial;}}{\*\generator Word;}\f0 Jane Doe\par Caf\'e9 \u8364? Python\tab SQL\par}"
+HTML = b"<!DOCTYPE html><html><head><style>p {}</style></head><body><h1>Jane Doe</h1><p>Python &amp; SQL</p><script>track()</script></body></html>"
+
+@pytest.mark.parametrize("make_content, expected", [
+    (lambda: make_pdf("Jane Doe"), "pdf"),
+    (lambda: make_docx("Jane Doe"), "docx"),
+    (lambda: make_odt("Jane Doe"), "odt"),
+    (lambda: RTF, "rtf"),
+    (lambda: HTML, "html"),
+    (lambda: "Jane Doe, café".encode("utf-8"), "txt"),
+    (lambda: "Jane Doe, café".encode("cp1252"), "txt"),
+    (lambda: "Jane Doe".encode("utf-16"), "txt"),
+    (lambda: bytes(range(256)) * 4, None),
+    (lambda: b"\x89PNG\r\n\x1a\n" + bytes(64), None),
+    (lambda: make_zip([("photo.jpg", b"jpeg")]), None),
+])
+def test_sniff_format(make_content, expected):
+    assert sniff_format(make_content()) == expected
+
+def test_sniff_format_does_not_inflate_oversized_relationships():
+    bomb = make_zip([("_rels/.rels", b"<" + b" " * (200 * 1024 * 1024))])
+
+    tracemalloc.start()
+    try:
+        assert sniff_format(bomb) is None
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 5 * 1024 * 1024
+
+@pytest.mark.parametrize("content, expected", [
+    (make_odt("Jane Doe", "Skills: Python"), "Jane Doe\nSkills: Python"),
+    (RTF, "Jane Doe\nCaf\u00e9 \u20ac Python SQL"),
+    (HTML, "Jane Doe\nPython & SQL"),
+])
+def test_extracts_every_registered_format(content, expected):
+    assert convert_to_text(content, "application/octet-stream").strip() == expected
+
+def test_declared_content_type_is_not_trusted():
+    assert "Jane Doe" in convert_to_text(make_pdf("Jane Doe"), "text/plain")
+
+    with pytest.raises(UnsupportedDocumentError):
+        convert_to_text(bytes(range(256)) * 4, "text/plain")
+
+def test_per_format_size_limit():
+    oversized = b"Jane Doe " * (EXTRACTORS["txt"].max_bytes // 9 + 1)
+
+    with pytest.raises(UnsupportedDocumentError, match="TXT"):
+        extract_document(oversized, "text/plain")
@@ -0,0 +1,51 @@
+from dataclasses import replace
+
+from api.utils.document_converter import EXTRACTORS, ExtractionLimits, ExtractionResult
+from api.utils.extraction_cache import ExtractionCache, convert_to_text_cached
+
+LIMITS = ExtractionLimits(max_pages=20, max_chars=60_000, time_budget=10.0)
+
+def test_key_covers_content_extractor_version_mode_and_limits():
+    key = ExtractionCache.key(b"CV", EXTRACTORS["pdf"], "full", LIMITS)
+    other_version = replace(EXTRACTORS["pdf"], version="2")
+
+    assert key == ExtractionCache.key(b"CV", EXTRACTORS["pdf"], "full", LIMITS)
+    assert key != ExtractionCache.key(b"CV!", EXTRACTORS["pdf"], "full", LIMITS)
+    assert key != ExtractionCache.key(b"CV", other_version, "full", LIMITS)
+    assert key != ExtractionCache.key(b"CV", EXTRACTORS["pdf"], "fast", LIMITS)
+    assert key != ExtractionCache.key(b"CV", EXTRACTORS["pdf"], "full", ExtractionLimits(5, 60_000, 10.0))
+
+def test_evicts_least_recently_used_by_total_text_size():
+    cache = ExtractionCache(max_chars=10)
+    cache.put("a", ExtractionResult(text="aaaa"))
+    cache.put("b", ExtractionResult(text="bbbb"))
+    assert cache.get("a").text == "aaaa"
+
+    cache.put("c", ExtractionResult(text="cccc"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").text == "aaaa"
+    assert cache.get("c").text == "cccc"
+    assert cache.stats() == {"entries": 2, "chars": 8, "max_chars": 10, "hits": 3, "misses": 1, "hit_rate": 0.75}
+
+def test_skips_timed_out_and_oversized_results():
+    cache = ExtractionCache(max_chars=10)
+    cache.put("slow", ExtractionResult(text="partial", truncated=True, timed_out=True))
+    cache.put("huge", ExtractionResult(text="x" * 11))
+
+    assert cache.get("slow") is None
+    assert cache.get("huge") is None
+
+def test_cached_results_are_copies():
+    cache = ExtractionCache(max_chars=100)
+    cache.put("a", ExtractionResult(text="Jane Doe"))
+
+    cache.get("a").text = None
+
+    assert cache.get("a").text == "Jane Doe"
+
+def test_convert_to_text_cached_hits_on_duplicates(extraction_cache):
+    assert convert_to_text_cached(b"Jane Doe", "text/plain") == "Jane Doe"
+    assert convert_to_text_cached(b"Jane Doe", "text/plain") == "Jane Doe"
+
+    assert (extraction_cache.hits, extraction_cache.misses) == (1, 1)
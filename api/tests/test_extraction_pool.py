@@ -0,0 +1,219 @@
+import asyncio
+import io
+import os
+import threading
+import time
+import zipfile
+
+import pytest
+from fpdf import FPDF
+
+from api.core.config import settings
+from api.utils.document_converter import ExtractionLimits, UnsafeDocumentError, convert_to_text, extract_document
+from api.utils.extraction_pool import (
+    ExtractionCrashedError,
+    ExtractionOverloadedError,
+    ExtractionPool,
+    ExtractionTimeoutError,
+    SandboxWorker,
+)
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+@pytest.fixture
+def pool():
+    pool = ExtractionPool(workers=1, queue_limit=1, timeout=5.0)
+    yield pool
+    pool.shutdown()
+
+async def test_runs_jobs_in_worker_process(pool):
+    assert await pool.run(convert_to_text, b"Plain CV", "text/plain") == "Plain CV"
+    assert pool.pending == 0
+
+async def test_rejects_jobs_beyond_queue_limit(pool):
+    running = [asyncio.ensure_future(pool.run(time.sleep, 0.5)) for _ in range(pool.capacity)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(ExtractionOverloadedError):
+        await pool.run(time.sleep, 0)
+    await asyncio.gather(*running)
+
+async def test_timed_out_job_has_its_worker_killed():
+    pool = ExtractionPool(workers=1, queue_limit=0, timeout=0.5)
+    try:
+        assert await pool.run(convert_to_text, b"CV", "text/plain") == "CV"
+        worker = pool._idle[0]
+
+        with pytest.raises(ExtractionTimeoutError):
+            await pool.run(time.sleep, 30)
+
+        # The thread that was waiting on the job sees EOF and closes the pipe.
+        for _ in range(50):
+            if worker.conn.closed:
+                break
+            await asyncio.sleep(0.05)
+        assert worker.conn.closed
+        assert not worker.alive
+        assert pool.pending == 0
+        assert await pool.run(convert_to_text, b"CV", "text/plain") == "CV"
+    finally:
+        pool.shutdown()
+
+async def test_workers_start_off_the_event_loop(pool, monkeypatch):
+    started_in = []
+    original = SandboxWorker.__init__
+    def spy(self, *args):
+        started_in.append(threading.current_thread())
+        original(self, *args)
+    monkeypatch.setattr(SandboxWorker, "__init__", spy)
+
+    await pool.run(os.getpid)
+
+    assert started_in and threading.main_thread() not in started_in
+
+async def test_workers_are_reused_across_jobs(pool):
+    first = await pool.run(os.getpid)
+    second = await pool.run(os.getpid)
+
+    assert first == second != os.getpid()
+
+async def test_worker_is_replaced_after_max_jobs():
+    pool = ExtractionPool(workers=1, queue_limit=0, timeout=5.0, max_jobs_per_worker=2)
+    try:
+        pids = [await pool.run(os.getpid) for _ in range(3)]
+    finally:
+        pool.shutdown()
+
+    assert pids[0] == pids[1] != pids[2]
+
+async def test_memory_limit_fails_only_that_job():
+    pool = ExtractionPool(workers=1, queue_limit=0, timeout=10.0, memory_limit_mb=256)
+    try:
+        with pytest.raises(ExtractionCrashedError, match="memory"):
+            await pool.run(bytearray, 2 * 1024 ** 3)
+
+        assert pool.crashes == 1
+        assert await pool.run(convert_to_text, b"CV", "text/plain") == "CV"
+    finally:
+        pool.shutdown()
+
+async def test_cpu_limit_kills_the_worker():
+    pool = ExtractionPool(workers=1, queue_limit=0, timeout=30.0, cpu_limit_seconds=1)
+    try:
+        with pytest.raises(ExtractionCrashedError, match="exited"):
+            await pool.run(sum, range(10 ** 12))
+
+        assert await pool.run(convert_to_text, b"CV", "text/plain") == "CV"
+    finally:
+        pool.shutdown()
+
+async def test_job_exceptions_are_raised_and_keep_the_worker(pool):
+    pid = await pool.run(os.getpid)
+
+    with pytest.raises(ValueError):
+        await pool.run(int, "not a number")
+
+    assert await pool.run(os.getpid) == pid
+
+async def test_zero_workers_runs_in_a_thread():
+    pool = ExtractionPool(workers=0, queue_limit=0, timeout=5.0)
+
+    assert await pool.run(convert_to_text, b"CV", "text/plain") == "CV"
+
+def make_long_pdf(pages: int) -> bytes:
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=12)
+    for page in range(pages):
+        pdf.add_page()
+        pdf.cell(0, 10, f"Role {page + 1}: Python developer", new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+@pytest.fixture
+def range_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(settings, "EXTRACTION_PAGES_PER_RANGE", 2)
+    monkeypatch.setattr(settings, "EXTRACTION_PARALLEL_MIN_BYTES", 0)
+    calls = []
+    original = ExtractionPool._extract_pdf_ranges
+    async def spy(self, *args):
+        calls.append(args[-1])
+        return await original(self, *args)
+    monkeypatch.setattr(ExtractionPool, "_extract_pdf_ranges", spy)
+    return calls
+
+async def test_long_pdf_is_split_across_workers_in_page_order(range_jobs):
+    pool = ExtractionPool(workers=3, queue_limit=3, timeout=30.0)
+    limits = ExtractionLimits(max_pages=20, max_chars=60_000, time_budget=10.0)
+    content = make_long_pdf(7)
+    try:
+        result = await pool.extract(content, "application/pdf", "full", limits)
+    finally:
+        pool.shutdown()
+
+    assert range_jobs == [3]
+    assert result.text == extract_document(content, "application/pdf", "full", limits).text
+    assert (result.pages, result.truncated) == (7, False)
+
+async def test_page_limit_applies_before_splitting(range_jobs):
+    pool = ExtractionPool(workers=2, queue_limit=2, timeout=30.0)
+    limits = ExtractionLimits(max_pages=5, max_chars=60_000, time_budget=10.0)
+    try:
+        result = await pool.extract(make_long_pdf(9), "application/pdf", "fast", limits)
+    finally:
+        pool.shutdown()
+
+    assert range_jobs == [2]
+    assert (result.pages, result.truncated) == (5, True)
+    assert "Role 5:" in result.text and "Role 6:" not in result.text
+
+async def test_short_pdf_stays_on_one_worker(range_jobs):
+    pool = ExtractionPool(workers=2, queue_limit=2, timeout=30.0)
+    limits = ExtractionLimits(max_pages=20, max_chars=60_000, time_budget=10.0)
+    try:
+        result = await pool.extract(make_long_pdf(3), "application/pdf", "full", limits)
+    finally:
+        pool.shutdown()
+
+    assert range_jobs == []
+    assert result.pages == 3
+
+async def test_small_pdf_skips_the_page_count(range_jobs, monkeypatch):
+    content = make_long_pdf(9)
+    monkeypatch.setattr(settings, "EXTRACTION_PARALLEL_MIN_BYTES", len(content) + 1)
+    pool = ExtractionPool(workers=2, queue_limit=2, timeout=30.0)
+    limits = ExtractionLimits(max_pages=20, max_chars=60_000, time_budget=10.0)
+    jobs = []
+    original = pool.run
+    async def spy(fn, *args):
+        jobs.append(fn.__name__)
+        return await original(fn, *args)
+    monkeypatch.setattr(pool, "run", spy)
+    try:
+        result = await pool.extract(content, "application/pdf", "full", limits)
+    finally:
+        pool.shutdown()
+
+    assert jobs == ["extract_document"]
+    assert range_jobs == []
+    assert result.pages == 9
+
+async def test_unsafe_document_error_reaches_the_caller(pool):
+    bomb = io.BytesIO()
+    with zipfile.ZipFile(bomb, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", b"\0" * (20 * 1024 * 1024))
+
+    with pytest.raises(UnsafeDocumentError):
+        await pool.run(convert_to_text, bomb.getvalue(), DOCX)
+    assert pool.pending == 0
+
+async def test_repeat_uploads_are_served_from_the_cache(pool, extraction_cache, monkeypatch):
+    limits = ExtractionLimits(max_pages=20, max_chars=60_000, time_budget=10.0)
+    content = make_long_pdf(2)
+
+    first = await pool.extract(content, "application/pdf", "full", limits)
+    monkeypatch.setattr(pool, "run", None)
+    again = await pool.extract(content, "application/pdf", "full", limits)
+
+    assert again == first
+    assert extraction_cache.stats()["hits"] == 1
+    assert extraction_cache.stats()["hit_rate"] == 0.5
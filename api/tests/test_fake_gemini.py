@@ -0,0 +1,96 @@
+import time
+
+from api.services import ai_service
+from api.services.llm_providers import get_llm_provider, reset_llm_provider
+from api.tests.fake_gemini import FakeResponse
+
+CV_TEXT = "Jane Doe\nExperience: developed APIs\nSkills: Python\nEducation: BSc"
+
+async def no_sleep(_):
+    return None
+
+async def test_generate_review_against_fake_gemini(fake_gemini):
+    fake_gemini.enqueue(FakeResponse(text="## Review from fake server"))
+
+    review, score = await ai_service.generate_review(CV_TEXT)
+
+    assert review == "## Review from fake server"
+    assert score == ai_service.score_cv(CV_TEXT)
+    assert len(fake_gemini.requests) == 1
+    assert "gemini-1.5-flash:generateContent" in fake_gemini.requests[0]["path"]
+    assert "Jane Doe" in fake_gemini.requests[0]["body"]
+
+async def test_rate_limit_burst_is_retried(fake_gemini, monkeypatch):
+    monkeypatch.setattr(ai_service.asyncio, "sleep", no_sleep)
+    fake_gemini.rate_limit_burst(2)
+    fake_gemini.enqueue(FakeResponse(text="## Recovered"))
+
+    review, _ = await ai_service.generate_review(CV_TEXT)
+
+    assert review == "## Recovered"
+    assert len(fake_gemini.requests) == 3
+
+async def test_rate_limit_storm_falls_back_to_mock(fake_gemini, monkeypatch):
+    monkeypatch.setattr(ai_service.asyncio, "sleep", no_sleep)
+    fake_gemini.rate_limit_burst(3)
+
+    review, _ = await ai_service.generate_review(CV_TEXT)
+
+    assert review == ai_service.generate_mock_review(CV_TEXT)
+    assert len(fake_gemini.requests) == 3
+
+async def test_truncated_response_falls_back_to_mock(fake_gemini):
+    fake_gemini.enqueue(FakeResponse(kind="truncated"))
+
+    review, _ = await ai_service.generate_review(CV_TEXT)
+
+    assert review == ai_service.generate_mock_review(CV_TEXT)
+
+async def test_stream_against_fake_gemini(fake_gemini):
+    fake_gemini.stream_chunk_size = 10
+    fake_gemini.enqueue(FakeResponse(text="streamed review text from fake"))
+
+    chunks = [chunk async for chunk in get_llm_provider().stream("prompt")]
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == "streamed review text from fake"
+
+async def test_hung_attempt_is_bounded_by_deadline(fake_gemini, monkeypatch):
+    monkeypatch.setattr(ai_service.settings, "LLM_ATTEMPT_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(ai_service.settings, "LLM_TOTAL_DEADLINE_SECONDS", 0.5)
+    fake_gemini.enqueue(FakeResponse(kind="timeout", latency=5))
+
+    started = time.monotonic()
+    review, _ = await ai_service.generate_review(CV_TEXT)
+
+    assert time.monotonic() - started < 1.5
+    assert review == ai_service.generate_mock_review(CV_TEXT)
+    assert ai_service.generation_stats["attempt_timeouts"] >= 1
+
+async def test_hedged_request_wins_over_slow_primary(fake_gemini, monkeypatch):
+    monkeypatch.setattr(ai_service.settings, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(ai_service.settings, "LLM_HEDGE_MIN_SAMPLES", 1)
+    monkeypatch.setattr(ai_service, "llm_latency", ai_service.LatencyTracker())
+    ai_service.llm_latency.record(0.05)
+    fake_gemini.enqueue(FakeResponse(latency=2, text="slow"), FakeResponse(text="## Hedged"))
+    hedge_wins = ai_service.generation_stats["hedge_wins"]
+
+    review, _ = await ai_service.generate_review(CV_TEXT)
+
+    assert review == "## Hedged"
+    assert ai_service.generation_stats["hedge_wins"] == hedge_wins + 1
+
+async def test_rate_limited_key_is_rotated_out(fake_gemini, monkeypatch):
+    monkeypatch.setattr(ai_service.asyncio, "sleep", no_sleep)
+    monkeypatch.setattr(ai_service.settings, "GEMINI_API_KEYS", "backup-key-0002:30")
+    reset_llm_provider()
+    fake_gemini.rate_limit_burst(1)
+    fake_gemini.enqueue(FakeResponse(text="## From second key"))
+
+    review, _ = await ai_service.generate_review(CV_TEXT)
+
+    assert review == "## From second key"
+    first_key, second_key = (request["api_key"] for request in fake_gemini.requests)
+    assert first_key != second_key
+    usage = {entry["key"]: entry for entry in get_llm_provider().key_pool.usage()}
+    assert usage[f"...{first_key[-4:]}"]["rate_limited"] == 1
@@ -0,0 +1,74 @@
+from api.services.key_pool import ApiKeyPool, parse_key_budgets
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_parse_key_budgets():
+    assert parse_key_budgets(["key-a:60", "key-b"], 15) == [("key-a", 60), ("key-b", 15)]
+
+def test_acquire_prefers_key_with_most_headroom():
+    pool = ApiKeyPool([("key-a", 2), ("key-b", 4)], clock=FakeClock())
+
+    keys = [pool.try_acquire() for _ in range(6)]
+
+    assert keys.count("key-a") == 2
+    assert keys.count("key-b") == 4
+    assert pool.try_acquire() is None
+
+def test_budget_refills_over_time():
+    clock = FakeClock()
+    pool = ApiKeyPool([("key-a", 60)], clock=clock)
+    for _ in range(60):
+        pool.try_acquire()
+
+    assert pool.try_acquire() is None
+    clock.now += 1.0
+    assert pool.try_acquire() == "key-a"
+    assert pool.seconds_until_available() > 0
+
+async def test_zero_budget_means_no_client_side_limit():
+    clock = FakeClock()
+    pool = ApiKeyPool(parse_key_budgets(["key-a:0"], 15), clock=clock)
+
+    keys = [await pool.acquire() for _ in range(1000)]
+
+    assert keys == ["key-a"] * 1000
+    assert pool.seconds_until_available() == 0.0
+    assert pool.usage()[0]["headroom"] is None
+
+def test_default_budget_is_unlimited():
+    from api.core.config import Settings
+    assert Settings.model_fields["GEMINI_KEY_REQUESTS_PER_MINUTE"].default == 0
+
+def test_rate_limited_key_cools_down():
+    clock = FakeClock()
+    pool = ApiKeyPool([("key-a", 10), ("key-b", 5)], cooldown_seconds=30, clock=clock)
+
+    pool.report_rate_limited("key-a")
+
+    assert pool.try_acquire() == "key-b"
+    clock.now += 31
+    assert pool.try_acquire() == "key-a"
+
+def test_single_cooling_key_is_still_used():
+    pool = ApiKeyPool([("key-a", 10)], cooldown_seconds=30, clock=FakeClock())
+
+    pool.report_rate_limited("key-a")
+
+    assert pool.try_acquire() == "key-a"
+
+def test_usage_masks_keys():
+    pool = ApiKeyPool([("secret-key-1234", 10)], clock=FakeClock())
+    pool.try_acquire()
+    pool.report_rate_limited("secret-key-1234")
+
+    [usage] = pool.usage()
+
+    assert usage["key"] == "...1234"
+    assert usage["requests"] == 1
+    assert usage["rate_limited"] == 1
+    assert usage["cooling_down"] is True
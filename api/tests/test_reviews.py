@@ -1,6 +1,11 @@
+import asyncio
 import io
 from fastapi.testclient import TestClient
 
+from api.models.models import Review, ReviewStatus, ReviewTier
+from api.routers import reviews
+from api.services.scoring import get_scoring_rules, score_cv, score_cv_features
+
 def test_upload_cv(client: TestClient):
     file_content = "Test CV Content\nSkills: Python, FastAPI\nExperience: 5 years"
     file = io.BytesIO(file_content.encode())
@@ -91,4 +96,94 @@ def test_upload_cv_insufficient_credits(client: TestClient, monkeypatch):
     )
     
     assert response.status_code == 402
-    assert "detail" in response.json()
\ No newline at end of file
+    assert "detail" in response.json()
+
+async def test_rescore_stale_reviews(session_factory):
+    content = "Experience: led a team of 5 people\nSkills: Python\nEducation: BSc"
+    async with session_factory() as session:
+        stale = Review(user_id=1, filename="stale.txt", content=content, score=1.0, score_rules_version="0")
+        current = Review(user_id=1, filename="current.txt", content=content, score=1.0,
+                         score_rules_version=get_scoring_rules().version)
+        session.add_all([stale, current])
+        await session.commit()
+
+    assert await reviews.rescore_stale_reviews(batch_size=1) >= 1
+
+    async with session_factory() as session:
+        stale = await session.get(Review, stale.id)
+        current = await session.get(Review, current.id)
+    assert stale.score == score_cv(content)
+    assert stale.score_rules_version == get_scoring_rules().version
+    assert stale.score_features == score_cv_features(content)[1]
+    assert current.score == 1.0
+
+async def test_rescore_stops_at_limit(session_factory):
+    async with session_factory() as session:
+        session.add_all([
+            Review(user_id=1, filename=f"limited-{index}.txt", content="Skills: Python", score=1.0, score_rules_version="0")
+            for index in range(3)
+        ])
+        await session.commit()
+
+    assert await reviews.rescore_stale_reviews(batch_size=2, limit=2) == 2
+    assert await reviews.rescore_stale_reviews(batch_size=2) >= 1
+    assert await reviews.rescore_stale_reviews(batch_size=2, limit=2) == 0
+
+async def test_rescore_reuses_stored_features(session_factory):
+    rules = get_scoring_rules()
+    _, features = score_cv_features("Experience: led a team of 5 people\nSkills: Python\nEducation: BSc")
+    async with session_factory() as session:
+        # The text no longer matches the features, so a re-read would show.
+        review = Review(user_id=1, filename="reused.txt", content="", score=1.0, score_rules_version="0",
+                        score_features=features, score_features_version=rules.features_version)
+        session.add(review)
+        await session.commit()
+
+    await reviews.rescore_stale_reviews()
+
+    async with session_factory() as session:
+        review = await session.get(Review, review.id)
+    assert review.score == score_cv("Experience: led a team of 5 people\nSkills: Python\nEducation: BSc")
+    assert review.score_features == features
+
+async def test_get_review_score_breakdown(client: TestClient, session_factory):
+    content = "Experience: led a team of 5 people\nSkills: Python\nEducation: BSc"
+    score, features = score_cv_features(content)
+    async with session_factory() as session:
+        review = Review(user_id=1, filename="breakdown.txt", content=content, score=score,
+                        score_rules_version=get_scoring_rules().version, score_features=features,
+                        score_features_version=get_scoring_rules().features_version)
+        session.add(review)
+        await session.commit()
+
+    response = client.get(f"/api/py/reviews/{review.id}/score")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["score"] == score
+    assert body["rules_version"] == get_scoring_rules().version
+    components = {component["name"]: component for component in body["components"]}
+    assert components["metrics"] == {"name": "metrics", "value": 1, "points": 0.5}
+    assert components["word_count"]["points"] == -1.0
+
+async def test_process_review_runs_once_per_pending_review(session_factory, monkeypatch):
+    calls = []
+
+    async def generate(content):
+        calls.append(content)
+        return "Full review", 7.0, ReviewTier.FULL
+
+    monkeypatch.setattr(reviews, "generate_tiered_review", generate)
+    async with session_factory() as session:
+        review = Review(user_id=1, filename="pending.txt", content="Skills: Python", status=ReviewStatus.PENDING,
+                        review_result="Preliminary review", tier=ReviewTier.PRELIMINARY)
+        session.add(review)
+        await session.commit()
+
+    await asyncio.gather(reviews.process_review(review.id), reviews.process_review(review.id))
+    await reviews.process_review(review.id)
+
+    async with session_factory() as session:
+        review = await session.get(Review, review.id)
+    assert calls == ["Skills: Python"]
+    assert (review.status, review.tier, review.review_result) == (ReviewStatus.COMPLETED, ReviewTier.FULL, "Full review")
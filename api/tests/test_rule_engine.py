@@ -0,0 +1,69 @@
+import pytest
+
+from api.services.rule_engine import analyze_cv, generate_preliminary_review, generate_rule_review
+
+STRONG_CV = """Jane Doe
+jane.doe@example.com | +44 7700 900123 | linkedin.com/in/janedoe | github.com/janedoe
+
+Professional Summary
+Backend engineer with 6 years of experience building APIs.
+
+Experience
+- Led a team of 5 engineers delivering a payments platform.
+- Reduced API latency by 40% through caching.
+- Improved deployment frequency from monthly to daily.
+- Designed an event pipeline handling $2m in daily transactions.
+
+Education
+BSc Computer Science, University of Lincoln
+
+Skills
+Python, FastAPI, PostgreSQL, Docker, Kubernetes, AWS, Terraform, Redis, Kafka, React
+"""
+
+WEAK_CV = "John Smith\nI was responsible for stuff and worked on things."
+
+def test_analyze_cv_detects_sections_metrics_and_contacts():
+    analysis = analyze_cv(STRONG_CV)
+
+    assert {"summary", "experience", "education", "skills"} <= set(analysis.sections)
+    assert analysis.metrics >= 3
+    assert {"led", "reduced", "improved", "designed"} <= set(analysis.action_verbs)
+    assert analysis.action_led_lines == 4
+    assert analysis.has_email and analysis.has_phone and analysis.has_linkedin and analysis.has_github
+    assert analysis.weak_phrases == 0
+
+def test_analyze_cv_flags_weak_cv():
+    analysis = analyze_cv(WEAK_CV)
+
+    assert analysis.sections == {}
+    assert analysis.metrics == 0
+    assert analysis.weak_phrases == 2
+    assert not analysis.has_email
+
+@pytest.mark.parametrize("contact, has_phone", [
+    ("Acme Ltd 2019 - 2021", False),
+    ("Acme Ltd 03.2019 - 12.2021, Globex 2015 - 2019", False),
+    ("(555) 123-4567", True),
+    ("07700 900123", True),
+])
+def test_analyze_cv_phone_numbers_are_not_dates(contact, has_phone):
+    assert analyze_cv(f"Jane Doe\nExperience\n{contact}\n").has_phone is has_phone
+
+def test_rule_review_has_every_feedback_area():
+    review = generate_rule_review(WEAK_CV)
+
+    headings = [line[3:] for line in review.splitlines() if line.startswith("## ")]
+    assert headings == [
+        "Overall Structure and Formatting",
+        "Content and Relevance",
+        "Skills and Qualifications",
+        "Experience Description",
+        "Education Section",
+        "Specific Improvements",
+    ]
+    assert "Add a dedicated Skills section" in review
+    assert "Add a professional email address." in review
+
+def test_preliminary_review_is_titled():
+    assert generate_preliminary_review(STRONG_CV).startswith("# Preliminary CV Review")
@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+import pytest
+
+from api import train_score_model
+from api.core.config import settings
+from api.models.models import Review
+from api.services.score_model import LinearScoreModel, load_model, save_model, train_linear_model
+from api.services.scoring import get_scoring_rules, score_breakdown, score_cv, score_cv_features, score_cvs, scoring_version
+
+def training_data(rows=2000, seed=0):
+    rules = get_scoring_rules()
+    rng = np.random.default_rng(seed)
+    features = rng.integers(0, 40, size=(rows, len(rules.feature_names)))
+    features[:, 0] = rng.integers(50, 1500, size=rows)
+    targets = np.clip(2.0 + 0.8 * np.log1p(features[:, 1:]).sum(axis=1) / 3, 1.0, 10.0)
+    return features, targets
+
+@pytest.fixture
+def trained_model(tmp_path, monkeypatch):
+    rules = get_scoring_rules()
+    features, targets = training_data()
+    model = train_linear_model(features, targets, rules.feature_names, rules.features_version)
+    path = tmp_path / "model.json"
+    save_model(model, str(path))
+    monkeypatch.setattr(settings, "SCORING_METHOD", "model")
+    monkeypatch.setattr(settings, "SCORING_MODEL_PATH", str(path))
+    return load_model(str(path))
+
+def test_training_fits_linear_targets():
+    rules = get_scoring_rules()
+    features, targets = training_data()
+
+    model = train_linear_model(features, targets, rules.feature_names, rules.features_version, ridge=0.1)
+
+    assert model.trained_rows == len(targets)
+    assert model.rmse < 0.2
+
+def test_weights_file_round_trips(tmp_path):
+    rules = get_scoring_rules()
+    features, targets = training_data(rows=200)
+    model = train_linear_model(features, targets, rules.feature_names, rules.features_version)
+    path = tmp_path / "model.json"
+
+    save_model(model, str(path))
+    loaded = LinearScoreModel.from_dict(model.to_dict())
+
+    assert loaded.version == model.version
+    np.testing.assert_array_equal(loaded.predict(features), model.predict(features))
+
+def test_batched_inference_is_fast(trained_model):
+    features, _ = training_data(rows=10_000, seed=1)
+
+    started = time.perf_counter()
+    scores = trained_model.predict(features)
+    elapsed = time.perf_counter() - started
+
+    assert scores.shape == (10_000,)
+    assert ((scores >= 1.0) & (scores <= 10.0)).all()
+    assert elapsed / len(scores) < 0.001
+
+def test_model_method_scores_through_model(trained_model):
+    text = "Experience: led a team of 5 people and increased revenue by 40%\nSkills: Python\nEducation: BSc"
+    scores, features = score_cvs([text])
+
+    assert score_cv(text) == float(trained_model.predict(features)[0])
+    assert scores[0] == score_cv(text)
+    assert scoring_version().endswith(f"+model.{trained_model.version}")
+    breakdown = score_breakdown(dict(zip(get_scoring_rules().feature_names, features[0].tolist())))
+    assert breakdown["score"] == score_cv(text)
+
+def test_model_for_other_features_is_rejected(tmp_path, monkeypatch):
+    rules = get_scoring_rules()
+    features, targets = training_data(rows=100)
+    path = tmp_path / "stale.json"
+    save_model(train_linear_model(features, targets, rules.feature_names, "older-features"), str(path))
+    monkeypatch.setattr(settings, "SCORING_METHOD", "model")
+    monkeypatch.setattr(settings, "SCORING_MODEL_PATH", str(path))
+
+    with pytest.raises(RuntimeError, match="no longer count"):
+        score_cv("Experience")
+
+async def test_training_rows_exclude_model_scores(session_factory, monkeypatch):
+    rules = get_scoring_rules()
+    monkeypatch.setattr(train_score_model, "get_session_factory", lambda: session_factory)
+    _, features = score_cv_features("Experience: led a team of 5 people\nSkills: Python")
+    async with session_factory() as session:
+        session.add_all([
+            Review(user_id=1, filename="rules.txt", score=3.21, score_rules_version=rules.version,
+                   score_features=features, score_features_version=rules.features_version),
+            Review(user_id=1, filename="model.txt", score=9.87, score_rules_version=f"{rules.version}+model.1",
+                   score_features=features, score_features_version=rules.features_version),
+        ])
+        await session.commit()
+
+    _, scores = await train_score_model.load_training_rows()
+
+    assert 3.21 in scores
+    assert 9.87 not in scores
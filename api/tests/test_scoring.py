@@ -0,0 +1,150 @@
+import json
+import random
+import re
+
+import numpy as np
+import pytest
+
+from api.core.config import settings
+from api.services.scoring import (
+    compile_scoring_rules,
+    count_keyword_classes,
+    get_scoring_rules,
+    score_breakdown,
+    score_cv,
+    score_cv_features,
+    score_cvs,
+    score_features,
+)
+
+FEATURE_NAMES = get_scoring_rules().feature_names
+SEPARATE_PATTERNS = {
+    "education": r"education|degree|university|college",
+    "experience": r"experience|work|employment|job",
+    "skills": r"skills|abilities|proficiency|competencies",
+    "projects": r"projects|portfolio|achievements",
+    "contact": r"email|phone|contact|linkedin|github",
+    "achievements": r"increased|decreased|improved|achieved|won|created|developed|led|managed|reduced",
+    "metrics": r"\d+%|\$\d+|\d+ years|\d+ months|\d+ people|\d+ team",
+}
+ACTION_VERBS = ["implemented", "developed", "created", "designed", "managed", "led", "coordinated", "achieved", "improved"]
+
+def separate_scans(cv_lower):
+    """Counts as the original one-regex-per-class implementation produced them."""
+    counts = {name: len(re.findall(pattern, cv_lower)) for name, pattern in SEPARATE_PATTERNS.items()}
+    counts["action_verbs"] = sum(1 for verb in ACTION_VERBS if f" {verb} " in cv_lower or f"\n{verb} " in cv_lower)
+    return counts
+
+@pytest.mark.parametrize("text", [
+    "",
+    "led the team of 12 people for 5 years, increased revenue by 40% and saved $300",
+    # Matches that overlap across classes are all counted.
+    "developeducation wonwork 5 yearskills 3 teamanaged",
+    # Overlaps within one class are not, matching re.findall.
+    "ledecreased $12% 123 years 1234%",
+    "led\nled managed developed created designed achieved improved ",
+    "\nimplemented coordinated designed led\n",
+])
+def test_counts_match_separate_scans(text):
+    assert count_keyword_classes(text) == separate_scans(text)
+
+def test_counts_match_separate_scans_on_random_text():
+    rng = random.Random(0)
+    alphabet = "abcdeilmnoprstuvwy $%\n0123456789"
+    fragments = ["led", "developed", "education", "work", "won", "5 years", "$3", "12%", " team", "skills"]
+    for _ in range(200):
+        text = "".join(rng.choice(fragments) if rng.random() < 0.3 else rng.choice(alphabet) for _ in range(120))
+        assert count_keyword_classes(text) == separate_scans(text)
+
+def test_score_cv_bands():
+    assert score_cv("short") == 4.0
+    rich = ("Experience Education Skills Projects email "
+            "increased 40% improved 5 years achieved 3 team developed led managed created designed implemented ") * 25
+    assert score_cv(rich) == 10.0
+
+def test_score_cvs_matches_score_cv():
+    texts = [
+        "short",
+        "Experience\nled a team of 5 people and increased sales by 40%\n" * 40,
+        "Education: university degree. Skills: python. email me " * 60,
+        "developed created designed managed " * 400,
+    ]
+    scores, features = score_cvs(texts)
+
+    assert features.shape == (len(texts), len(FEATURE_NAMES))
+    assert scores.tolist() == [score_cv(text) for text in texts]
+    assert features[1, FEATURE_NAMES.index("metrics")] == 80
+
+def test_score_cvs_accepts_empty_batch():
+    scores, features = score_cvs([])
+
+    assert scores.shape == (0,)
+    assert features.shape == (0, len(FEATURE_NAMES))
+
+def test_score_features_clamps_to_range():
+    rows = np.zeros((2, len(FEATURE_NAMES)), dtype=np.int64)
+    rows[1] = 500
+
+    assert score_features(rows).tolist() == [4.0, 10.0]
+
+def rules_document(**overrides):
+    document = {
+        "version": "test",
+        "base_score": 5.0,
+        "min_score": 1.0,
+        "max_score": 10.0,
+        "classes": [
+            {"name": "python", "keywords": ["python"], "thresholds": [[1, 2.0], [3, 4.0]]},
+            {"name": "numbers", "pattern": "\\d+", "first_chars": "0123456789", "thresholds": [[1, 1.0]]},
+        ],
+    }
+    document.update(overrides)
+    return document
+
+def test_custom_rules_change_scores():
+    rules = compile_scoring_rules(rules_document())
+
+    assert rules.feature_names == ("word_count", "python", "numbers")
+    assert score_cv("python python python 42", rules) == 10.0
+    assert score_cv("python", rules) == 7.0
+    assert score_cv("java", rules) == 5.0
+
+def test_rules_file_is_selected_by_setting(tmp_path, monkeypatch):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(rules_document(version="2024-tuned")))
+    monkeypatch.setattr(settings, "SCORING_RULES_PATH", str(path))
+
+    assert get_scoring_rules().version == "2024-tuned"
+    assert score_cv("python") == 7.0
+
+@pytest.mark.parametrize("classes, message", [
+    ([{"name": "a", "keywords": ["lead", "leader"], "thresholds": [[1, 1.0]]}], "prefix"),
+    ([{"name": "a", "keywords": ["one"], "thresholds": [[1, 1.0]]},
+      {"name": "b", "pattern": "o+", "first_chars": "o", "thresholds": [[1, 1.0]]}], "can both start"),
+    ([{"name": "a", "pattern": "(x)", "first_chars": "x", "thresholds": [[1, 1.0]]}], "non-capturing"),
+    ([{"name": "a", "keywords": ["x"], "thresholds": [[0, 1.0]]}], "at least 1"),
+    ([{"name": "a", "keywords": ["x"], "thresholds": [[1, 1.0]]},
+      {"name": "a", "keywords": ["y"], "thresholds": [[1, 1.0]]}], "unique"),
+])
+def test_invalid_rules_are_rejected(classes, message):
+    with pytest.raises(ValueError, match=message):
+        compile_scoring_rules(rules_document(classes=classes))
+
+def test_breakdown_adds_up_to_score():
+    text = "Experience Education Skills email increased 40% improved 5 years achieved led developed " * 30
+    score, features = score_cv_features(text)
+    breakdown = score_breakdown(features)
+
+    assert breakdown["score"] == score
+    total = breakdown["base_score"] + sum(component["points"] for component in breakdown["components"])
+    assert min(max(total, 1.0), 10.0) == score
+
+def test_features_version_ignores_weights():
+    base = compile_scoring_rules(rules_document())
+    reweighted = compile_scoring_rules(rules_document(version="2", base_score=3.0))
+    recounted = compile_scoring_rules(rules_document(classes=[
+        {"name": "python", "keywords": ["python", "django"], "thresholds": [[1, 2.0]]},
+    ]))
+
+    assert reweighted.features_version == base.features_version
+    assert recounted.features_version != base.features_version
@@ -0,0 +1,39 @@
+from api.utils.text_normalizer import normalize_text
+
+def test_dehyphenates_and_collapses_whitespace():
+    raw = "Led  the   migra-\n  tion of\tpayment services.\n\n\n\nSkills:\x00 Python,  SQL  \n"
+
+    assert normalize_text(raw) == "Led the migration of payment services.\n\nSkills: Python, SQL"
+
+def test_keeps_hyphenated_names_and_ligatures_are_folded():
+    assert normalize_text("Jean-\nPierre, eﬃcient") == "Jean-\nPierre, efficient"
+
+def test_strips_repeated_headers_footers_and_page_numbers():
+    pages = [
+        f"Jane Doe | Curriculum Vitae\nSection {index} {body}\n2019 - 202{index}\nPage {index} of 3"
+        for index, body in enumerate(["Experience", "Education", "Skills"], start=1)
+    ]
+
+    assert normalize_text("\f".join(pages)).splitlines() == [
+        "Jane Doe | Curriculum Vitae",
+        "Section 1 Experience",
+        "2019 - 2021",
+        "",
+        "Section 2 Education",
+        "2019 - 2022",
+        "",
+        "Section 3 Skills",
+        "2019 - 2023",
+    ]
+
+def test_single_page_keeps_bare_numbers():
+    text = "Jane Doe\nYears of experience\n10+\nPython developer\n3"
+
+    assert normalize_text(text) == text
+
+def test_keeps_hyphen_in_compounds_broken_across_lines():
+    raw = "Senior full-\nstack engineer, Java-\nbased services, self-\nmotivated, end-to-\nend testing, co-\nordinated"
+
+    assert normalize_text(raw) == (
+        "Senior full-stack engineer, Java-based services, self-motivated, end-to-end testing, coordinated"
+    )
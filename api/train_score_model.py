@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import logging
+
+import numpy as np
+from sqlalchemy import select
+
+from api.core.database import get_session_factory
+from api.models.models import Review
+from api.services.score_model import save_model, train_linear_model
+from api.services.scoring import features_matrix, get_scoring_rules
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def load_training_rows(limit: int = 0):
+    """Stored feature vectors and scores counted by the current scoring rules.
+
+    Only scores the current rules produced are targets; a review scored by a
+    model would otherwise teach the next model its own predictions.
+    """
+    rules = get_scoring_rules()
+    query = (
+        select(Review.score_features, Review.score)
+        .where(
+            Review.score.is_not(None),
+            Review.score_rules_version == rules.version,
+            Review.score_features.is_not(None),
+            Review.score_features_version == rules.features_version,
+        )
+        .order_by(Review.id)
+    )
+    if limit:
+        query = query.limit(limit)
+    async with get_session_factory()() as session:
+        result = await session.execute(query)
+        rows = result.all()
+    features = features_matrix([features for features, _ in rows], rules)
+    return features, np.array([score for _, score in rows], dtype=np.float64)
+
+def train(features: np.ndarray, scores: np.ndarray, output: str, ridge: float) -> None:
+    rules = get_scoring_rules()
+    model = train_linear_model(
+        features,
+        scores,
+        rules.feature_names,
+        rules.features_version,
+        ridge=ridge,
+        min_score=rules.min_score,
+        max_score=rules.max_score,
+    )
+    save_model(model, output)
+    logger.info(f"Trained on {model.trained_rows} reviews, RMSE {model.rmse:.3f}, saved model {model.version} to {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the linear CV scoring model on stored review features")
+    parser.add_argument("--output", required=True, help="Where to write the JSON weights file")
+    parser.add_argument("--ridge", type=float, default=1.0, help="L2 regularisation strength")
+    parser.add_argument("--limit", type=int, default=0, help="Use at most this many reviews (0 for all)")
+    parser.add_argument("--min-rows", type=int, default=50, help="Refuse to train on fewer reviews than this")
+    args = parser.parse_args()
+
+    features, scores = asyncio.run(load_training_rows(args.limit))
+    if len(scores) < args.min_rows:
+        parser.error(f"Only {len(scores)} reviews have features from the current scoring rules; need {args.min_rows}")
+    train(features, scores, args.output, args.ridge)
@@ -1,103 +1,561 @@
-import os
-import tempfile
-from typing import Optional
+import codecs
+import io
+import re
+import time
+import zipfile
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+from xml.etree import ElementTree
 import logging
 
+from api.core.config import settings
+from api.utils.text_normalizer import normalize_text
+
 try:
-    from pdfminer.high_level import extract_text as extract_text_from_pdf
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams, LTChar, LTContainer
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
     has_pdfminer = True
 except ImportError:
     has_pdfminer = False
 
-try:
-    import docx
-    has_docx = True
-except ImportError:
-    has_docx = False
-
 logger = logging.getLogger(__name__)
 
+EXTRACTION_MODES = ("full", "fast")
+
+class UnsafeDocumentError(Exception):
+    """The upload is built to exhaust the worker, e.g. a zip bomb posing as a DOCX."""
+
+class UnsupportedDocumentError(Exception):
+    """The upload is not a document format we read, or is too big for its format."""
+
+@dataclass(frozen=True)
+class ExtractionLimits:
+    """Where PDF parsing stops early. Checked between pages."""
+    max_pages: int
+    max_chars: int
+    time_budget: float
+
+    @classmethod
+    def from_settings(cls) -> "ExtractionLimits":
+        return cls(
+            max_pages=settings.EXTRACTION_MAX_PAGES,
+            max_chars=settings.EXTRACTION_MAX_CHARS,
+            time_budget=settings.EXTRACTION_TIME_BUDGET_SECONDS,
+        )
+
+@dataclass
+class ExtractionResult:
+    text: Optional[str]
+    mode: str = "full"
+    pages: int = 0
+    truncated: bool = False
+    # Stopped by the time budget, so a rerun on a quieter worker may read more.
+    timed_out: bool = False
+    # Length of the extracted text before normalize_text.
+    raw_chars: int = 0
+
+    def normalize(self) -> "ExtractionResult":
+        """Replace ``text`` with its normalized form, None if nothing is left."""
+        self.raw_chars = len(self.text or "")
+        self.text = (normalize_text(self.text) if self.text else "") or None
+        return self
+
+if has_pdfminer:
+    class FastTextConverter(TextConverter):
+        """Writes characters in content-stream order instead of running layout analysis.
+
+        A new line starts when the baseline moves by more than half a character
+        height, and a space is added for horizontal gaps wider than a third of a
+        character.
+        """
+
+        def receive_layout(self, ltpage) -> None:
+            parts = []
+            previous = None
+            stack = [iter(ltpage)]
+            while stack:
+                item = next(stack[-1], None)
+                if item is None:
+                    stack.pop()
+                elif isinstance(item, LTChar):
+                    if previous is not None:
+                        if abs(item.y0 - previous.y0) > previous.height * 0.5:
+                            parts.append("\n")
+                        elif item.x0 - previous.x1 > previous.width * 0.3:
+                            parts.append(" ")
+                    parts.append(item.get_text())
+                    previous = item
+                elif isinstance(item, LTContainer):
+                    stack.append(iter(item))
+            parts.append("\n\f")
+            self.write_text("".join(parts))
+
+def count_pdf_pages(pdf_bytes: bytes) -> int:
+    """Pages in the document, or 0 if it cannot be parsed."""
+    if not has_pdfminer:
+        return 0
+    try:
+        return sum(1 for _ in PDFPage.get_pages(io.BytesIO(pdf_bytes)))
+    except MemoryError:
+        raise
+    except Exception as e:
+        logger.warning(f"Could not count PDF pages: {str(e)}")
+        return 0
+
+def extract_text_from_pdf(
+    pdf_bytes: bytes,
+    mode: str = "full",
+    limits: Optional[ExtractionLimits] = None,
+    first_page: int = 0,
+    last_page: Optional[int] = None,
+) -> ExtractionResult:
+    """Extract PDF text page by page, stopping at the page, character or time limit.
+
+    "full" runs pdfminer's layout analysis; "fast" skips it (see
+    ``FastTextConverter``), which roughly halves the time per page. Pages are
+    laid out independently, so a ``first_page``/``last_page`` range extracts
+    exactly that slice of the whole-document text.
+    """
+    limits = limits or ExtractionLimits.from_settings()
+    deadline = time.monotonic() + limits.time_budget
+    output = io.StringIO()
+    resource_manager = PDFResourceManager(caching=True)
+    if mode == "fast":
+        device = FastTextConverter(resource_manager, output, laparams=None)
+    else:
+        device = TextConverter(resource_manager, output, laparams=LAParams())
+    interpreter = PDFPageInterpreter(resource_manager, device)
+
+    pages = 0
+    truncated = timed_out = False
+    try:
+        for index, page in enumerate(PDFPage.get_pages(io.BytesIO(pdf_bytes))):
+            if index < first_page:
+                continue
+            if last_page is not None and index >= last_page:
+                break
+            timed_out = time.monotonic() >= deadline
+            if pages >= limits.max_pages or output.tell() >= limits.max_chars or timed_out:
+                truncated = True
+                break
+            interpreter.process_page(page)
+            pages += 1
+    finally:
+        device.close()
+
+    text = output.getvalue()
+    if len(text) > limits.max_chars:
+        text, truncated = text[:limits.max_chars], True
+    if truncated:
+        logger.info(f"PDF extraction stopped early after {pages} pages and {len(text)} characters")
+    return ExtractionResult(text=text, mode=mode, pages=pages, truncated=truncated, timed_out=timed_out)
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+DOCX_MAIN_PART = "word/document.xml"
+# Package relationships are a few hundred bytes; anything much larger is not
+# a real document and is never decompressed.
+DOCX_MAX_RELS_BYTES = 64 * 1024
+
+def _docx_main_part(archive: zipfile.ZipFile) -> str:
+    """Path of the main document part, as named in the package relationships.
+
+    Safe to call before ``check_zip_archive``: the relationships part is only
+    read when its declared size is under DOCX_MAX_RELS_BYTES.
+    """
+    try:
+        info = archive.getinfo("_rels/.rels")
+        if info.file_size > DOCX_MAX_RELS_BYTES:
+            return DOCX_MAIN_PART
+        rels = ElementTree.fromstring(archive.read(info))
+    except (KeyError, ElementTree.ParseError):
+        return DOCX_MAIN_PART
+    for rel in rels:
+        if rel.get("Type", "").endswith("/officeDocument"):
+            return rel.get("Target", DOCX_MAIN_PART).lstrip("/")
+    return DOCX_MAIN_PART
+
+def check_zip_archive(archive: zipfile.ZipFile) -> None:
+    """Reject archives whose central directory promises too much data.
+
+    Runs before any entry is decompressed. ``zipfile`` stops reading an
+    entry at its declared size, so understated sizes cannot get past this.
+    """
+    entries = archive.infolist()
+    if len(entries) > settings.DOCX_MAX_ENTRIES:
+        raise UnsafeDocumentError(f"Archive has {len(entries)} entries; the limit is {settings.DOCX_MAX_ENTRIES}")
+    uncompressed = sum(entry.file_size for entry in entries)
+    if uncompressed > settings.DOCX_MAX_UNCOMPRESSED_BYTES:
+        raise UnsafeDocumentError(f"Archive expands to {uncompressed} bytes; the limit is {settings.DOCX_MAX_UNCOMPRESSED_BYTES}")
+    compressed = sum(entry.compress_size for entry in entries)
+    ratio = uncompressed / max(compressed, 1)
+    if ratio > settings.DOCX_MAX_COMPRESSION_RATIO:
+        raise UnsafeDocumentError(f"Archive compression ratio {ratio:.0f} exceeds {settings.DOCX_MAX_COMPRESSION_RATIO:.0f}")
+
 def extract_text_from_docx(docx_bytes):
-    """Extract text from a .docx file content"""
-    if not has_docx:
-        logger.error("python-docx library not installed. Cannot extract text from DOCX files.")
-        return None
-        
+    """Extract text from a .docx file content
+
+    Streams the main document part with ``iterparse`` rather than building
+    the python-docx object model: body paragraphs and table cells come out
+    once each, in document order, and every element is cleared once read.
+    Vertically merged cells are emitted only at the cell that starts the
+    merge, and the VML fallback copy of a text box is skipped.
+
+    Raises ``UnsafeDocumentError`` for archives over the DOCX_MAX_* limits.
+    """
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as temp_file:
-            temp_file.write(docx_bytes)
-            temp_file_path = temp_file.name
-        
-        doc = docx.Document(temp_file_path)
-        full_text = []
-
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    full_text.append(cell.text)
-
-        os.unlink(temp_file_path)
-        
-        return '\n'.join(full_text)
+        with zipfile.ZipFile(io.BytesIO(docx_bytes)) as archive:
+            check_zip_archive(archive)
+            with archive.open(_docx_main_part(archive)) as part:
+                return '\n'.join(_iter_docx_lines(part))
+    except (UnsafeDocumentError, MemoryError):
+        raise
     except Exception as e:
         logger.error(f"Error extracting text from DOCX: {e}")
-        if 'temp_file_path' in locals():
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
         return None
 
-def convert_to_text(file_content: bytes, content_type: str) -> Optional[str]:
+def _iter_docx_lines(part):
+    paragraphs: List[List[str]] = []
+    cells: List[Optional[List[str]]] = []
+    body = None
+    skip_depth = 0
+    # w:tab also defines tab stops under w:pPr/w:tabs; only tabs in runs are text.
+    run_depth = 0
+    for event, elem in ElementTree.iterparse(part, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if skip_depth or tag == MC_FALLBACK:
+                skip_depth += 1
+            elif tag == W_NS + "p":
+                paragraphs.append([])
+            elif tag == W_NS + "r":
+                run_depth += 1
+            elif tag == W_NS + "tc":
+                cells.append([])
+            elif tag == W_NS + "body":
+                body = elem
+            continue
+
+        if skip_depth:
+            skip_depth -= 1
+            if not skip_depth:
+                elem.clear()
+            continue
+        if tag == W_NS + "t":
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == W_NS + "tab":
+            if paragraphs and run_depth:
+                paragraphs[-1].append("\t")
+        elif tag in (W_NS + "br", W_NS + "cr"):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag in (W_NS + "vMerge", W_NS + "hMerge"):
+            # A continuation cell repeats the text above it in python-docx.
+            if cells and elem.get(W_NS + "val", "continue") == "continue":
+                cells[-1] = None
+        elif tag == W_NS + "p":
+            text = "".join(paragraphs.pop())
+            if cells:
+                if cells[-1] is not None:
+                    cells[-1].append(text)
+            else:
+                yield text
+            elem.clear()
+        elif tag == W_NS + "tc":
+            cell = cells.pop()
+            if cell is not None:
+                text = "\n".join(cell)
+                if cells:
+                    if cells[-1] is not None:
+                        cells[-1].append(text)
+                else:
+                    yield text
+            elem.clear()
+        elif tag == W_NS + "r":
+            run_depth -= 1
+            elem.clear()
+        if body is not None and not paragraphs and not cells and tag in (W_NS + "p", W_NS + "tbl", W_NS + "sdt"):
+            # Drop finished top-level blocks so memory stays flat.
+            body.clear()
+
+ODF_TEXT = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+
+def extract_text_from_odt(odt_bytes: bytes) -> Optional[str]:
+    """Extract paragraph and heading text from an OpenDocument text file.
+
+    Streams ``content.xml`` like the DOCX extractor and is subject to the same
+    archive limits.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(odt_bytes)) as archive:
+            check_zip_archive(archive)
+            with archive.open("content.xml") as part:
+                lines = []
+                for _, elem in ElementTree.iterparse(part):
+                    if elem.tag in (ODF_TEXT + "p", ODF_TEXT + "h"):
+                        lines.append(_odf_text(elem))
+                        elem.clear()
+                return '\n'.join(lines)
+    except (UnsafeDocumentError, MemoryError):
+        raise
+    except Exception as e:
+        logger.error(f"Error extracting text from ODT: {e}")
+        return None
+
+def _odf_text(elem) -> str:
+    parts = [elem.text or ""]
+    for child in elem:
+        if child.tag == ODF_TEXT + "s":
+            parts.append(" " * int(child.get(ODF_TEXT + "c", "1")))
+        elif child.tag == ODF_TEXT + "tab":
+            parts.append("\t")
+        elif child.tag == ODF_TEXT + "line-break":
+            parts.append("\n")
+        else:
+            parts.append(_odf_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+RTF_TOKEN = re.compile(r"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-fA-F]{2})|\\([^a-zA-Z])|([{}])|[\r\n]+|([^\\{}\r\n]+)")
+RTF_SKIPPED_GROUPS = {
+    "fonttbl", "colortbl", "stylesheet", "info", "pict", "object", "header", "footer",
+    "headerl", "headerr", "footerl", "footerr", "listtable", "listoverridetable",
+    "rsidtbl", "themedata", "colorschememapping", "datastore", "latentstyles", "xmlnstbl",
+}
+RTF_BREAKS = {"par": "\n", "line": "\n", "row": "\n", "page": "\n", "sect": "\n", "tab": "\t", "cell": "\t"}
+RTF_SYMBOLS = {"\\": "\\", "{": "{", "}": "}", "~": " ", "_": "-", "-": "", "\n": "\n", "\r": "\n"}
+
+def extract_text_from_rtf(rtf_bytes: bytes) -> Optional[str]:
+    """Extract the visible text of an RTF document.
+
+    Drops control words and non-text groups (fonts, styles, pictures,
+    headers, ``\\*`` destinations) and decodes ``\\'hh`` and ``\\u`` escapes.
+    """
+    source = rtf_bytes.decode("latin-1")
+    output = []
+    stack = []
+    skipping = False
+    unicode_skip = 1
+    pending_skip = 0
+    for match in RTF_TOKEN.finditer(source):
+        word, argument, hex_code, symbol, brace, plain = match.groups()
+        if brace == "{":
+            stack.append((skipping, unicode_skip))
+        elif brace == "}":
+            if stack:
+                skipping, unicode_skip = stack.pop()
+        elif hex_code is not None:
+            if pending_skip:
+                pending_skip -= 1
+            elif not skipping:
+                output.append(bytes([int(hex_code, 16)]).decode("cp1252", errors="replace"))
+        elif plain is not None:
+            if pending_skip:
+                plain, pending_skip = plain[pending_skip:], max(pending_skip - len(plain), 0)
+            if not skipping:
+                output.append(plain)
+        elif symbol is not None:
+            if symbol == "*":
+                skipping = True
+            elif not skipping:
+                output.append(RTF_SYMBOLS.get(symbol, ""))
+        elif word is not None:
+            pending_skip = 0
+            if word in RTF_SKIPPED_GROUPS:
+                skipping = True
+            elif word == "uc":
+                unicode_skip = int(argument or 1)
+            elif word == "u":
+                code = int(argument or 0)
+                if not skipping:
+                    output.append(chr(code + 65536 if code < 0 else code))
+                pending_skip = unicode_skip
+            elif not skipping:
+                output.append(RTF_BREAKS.get(word, ""))
+    return "".join(output)
+
+class HTMLTextParser(HTMLParser):
+    """Collects the visible text of an HTML page, one line per block element."""
+
+    SKIPPED = {"script", "style", "template", "noscript", "svg"}
+    BLOCKS = {
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "footer",
+        "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p",
+        "pre", "section", "table", "title", "tr", "ul",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self.skipping += 1
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+        elif tag in ("td", "th"):
+            self.parts.append("\t")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED:
+            self.skipping = max(self.skipping - 1, 0)
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+def extract_text_from_html(html_bytes: bytes) -> str:
+    parser = HTMLTextParser()
+    parser.feed(decode_text(html_bytes))
+    parser.close()
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    return '\n'.join(line for line in lines if line)
+
+def decode_text(content: bytes) -> str:
+    """UTF-8 or UTF-16 when the bytes say so, otherwise Windows-1252."""
+    if content.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return content.decode("utf-16", errors="replace")
+    try:
+        return content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return content.decode("cp1252", errors="replace")
+
+TEXT_CONTROL_BYTES = bytes(set(range(32)) - {9, 10, 12, 13} | {127})
+
+def _looks_like_text(sample: bytes) -> bool:
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return True
+    if b"\0" in sample:
+        return False
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return True
+    except UnicodeDecodeError:
+        # Legacy 8-bit text has next to no control characters; binaries have plenty.
+        control = len(sample) - len(sample.translate(None, TEXT_CONTROL_BYTES))
+        return control <= len(sample) * 0.01
+
+HTML_START = re.compile(r"\s*(<!--.*?-->\s*)*<(!doctype\s+html|html|head|body)[\s>]", re.IGNORECASE | re.DOTALL)
+
+def sniff_format(file_content: bytes) -> Optional[str]:
+    """Name of the document format the bytes actually hold, or None.
+
+    Looks only at magic bytes, the zip directory and a text sample, so it is
+    cheap enough to run before any extraction work is scheduled.
+    """
+    head = file_content[:1024]
+    if b"%PDF-" in head:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(io.BytesIO(file_content)) as archive:
+                names = set(archive.namelist())
+                if "mimetype" in names and archive.getinfo("mimetype").file_size < 100:
+                    if archive.read("mimetype").strip() == b"application/vnd.oasis.opendocument.text":
+                        return "odt"
+                if "word/document.xml" in names or _docx_main_part(archive) in names:
+                    return "docx"
+        except (zipfile.BadZipFile, KeyError, ValueError):
+            pass
+        return None
+    if head.startswith(b"{\\rtf"):
+        return "rtf"
+    sample = file_content[:4096]
+    if not _looks_like_text(sample):
+        return None
+    if HTML_START.match(decode_text(sample)):
+        return "html"
+    return "txt"
+
+def _limited(text: Optional[str], limits: ExtractionLimits, mode: str = "full") -> ExtractionResult:
+    if text is not None and len(text) > limits.max_chars:
+        return ExtractionResult(text=text[:limits.max_chars], mode=mode, truncated=True)
+    return ExtractionResult(text=text, mode=mode)
+
+def _extract_pdf(content: bytes, mode: str, limits: ExtractionLimits) -> ExtractionResult:
+    if not has_pdfminer:
+        logger.warning("pdfminer.six library not installed. Cannot extract text from PDF files.")
+        return ExtractionResult(text=None, mode=mode)
+    return extract_text_from_pdf(content, mode, limits)
+
+@dataclass(frozen=True)
+class Extractor:
+    name: str
+    extract: Callable[[bytes, str, ExtractionLimits], ExtractionResult]
+    # Larger uploads of this format are refused outright.
+    max_bytes: int
+    # "cheap" formats are extracted in the request; "expensive" ones go to the
+    # extraction pool.
+    cost: str = "expensive"
+    # Bump when the extractor's output changes, so cached text is not reused.
+    version: str = "1"
+
+EXTRACTORS: Dict[str, Extractor] = {
+    extractor.name: extractor
+    for extractor in (
+        Extractor("pdf", _extract_pdf, max_bytes=10 * 1024 * 1024),
+        Extractor("docx", lambda content, mode, limits: _limited(extract_text_from_docx(content), limits), max_bytes=10 * 1024 * 1024, version="2"),
+        Extractor("odt", lambda content, mode, limits: _limited(extract_text_from_odt(content), limits), max_bytes=10 * 1024 * 1024),
+        Extractor("rtf", lambda content, mode, limits: _limited(extract_text_from_rtf(content), limits), max_bytes=5 * 1024 * 1024),
+        Extractor("html", lambda content, mode, limits: _limited(extract_text_from_html(content), limits), max_bytes=2 * 1024 * 1024),
+        Extractor("txt", lambda content, mode, limits: _limited(decode_text(content), limits), max_bytes=1024 * 1024, cost="cheap"),
+    )
+}
+
+def get_extractor(file_content: bytes, content_type: Optional[str] = None) -> Extractor:
+    """The extractor for what the bytes really are; the declared type is only logged.
+
+    Raises:
+        UnsupportedDocumentError: Unknown binary data, or too large for its format
+    """
+    name = sniff_format(file_content)
+    if name is None:
+        raise UnsupportedDocumentError(f"Unrecognised binary content (declared as {content_type})")
+    extractor = EXTRACTORS[name]
+    if len(file_content) > extractor.max_bytes:
+        raise UnsupportedDocumentError(f"{name.upper()} files are limited to {extractor.max_bytes // 1024 // 1024} MB")
+    return extractor
+
+def extract_document(
+    file_content: bytes,
+    content_type: str,
+    mode: str = "full",
+    limits: Optional[ExtractionLimits] = None,
+) -> ExtractionResult:
     """
     Convert various document formats to plain text
-    
+
     Args:
         file_content: The binary content of the file
-        content_type: The MIME type of the file
-    
+        content_type: The declared MIME type; the format is sniffed from the bytes
+        mode: "full" or "fast" PDF extraction; other formats have one mode
+        limits: Early-stopping limits, from settings when omitted
+
     Returns:
-        Extracted text content or None if conversion failed
+        The normalized text (None if conversion failed) and how it was produced
+
+    Raises:
+        UnsupportedDocumentError: The bytes are not a format in ``EXTRACTORS``
+        UnsafeDocumentError: The file is a zip bomb or otherwise too large to open
     """
+    limits = limits or ExtractionLimits.from_settings()
+    extractor = get_extractor(file_content, content_type)
     try:
-        if content_type == 'application/pdf':
-            if not has_pdfminer:
-                logger.warning("pdfminer.six library not installed. Cannot extract text from PDF files.")
-                return file_content.decode('utf-8', errors='replace')
-                
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                temp_file.write(file_content)
-                temp_file_path = temp_file.name
-            
-            try:
-                extracted_text = extract_text_from_pdf(temp_file_path)
-                return extracted_text if extracted_text.strip() else None
-            finally:
-                os.unlink(temp_file_path)
-            
-        elif content_type in [
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'application/msword'
-        ]:
-            extracted_text = extract_text_from_docx(file_content) 
-            if extracted_text:
-                return extracted_text
-            
-            return file_content.decode('utf-8', errors='replace')
-            
-        elif content_type == 'text/plain':
-            return file_content.decode('utf-8', errors='replace')
-            
-        else:
-            logger.warning(f"Unsupported file type for text extraction: {content_type}")
-            return file_content.decode('utf-8', errors='replace')
-            
+        result = extractor.extract(file_content, mode, limits)
+    except (UnsafeDocumentError, MemoryError):
+        raise
     except Exception as e:
-        logger.error(f"Document conversion error: {str(e)}")
-        try:
-            return file_content.decode('utf-8', errors='replace')
-        except:
-            return None
\ No newline at end of file
+        logger.error(f"Document conversion error ({extractor.name}): {str(e)}")
+        return ExtractionResult(text=None, mode=mode)
+    return result.normalize()
+
+def convert_to_text(file_content: bytes, content_type: str) -> Optional[str]:
+    """Extracted text only, with the configured mode and limits."""
+    return extract_document(file_content, content_type, settings.EXTRACTION_MODE).text
@@ -0,0 +1,90 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, Optional
+
+from api.core.config import settings
+from api.utils.document_converter import (
+    Extractor,
+    ExtractionLimits,
+    ExtractionResult,
+    extract_document,
+    get_extractor,
+)
+
+
+class ExtractionCache:
+    """Process-local LRU of extraction results keyed by file hash.
+
+    The key also covers the extractor's name and version, the PDF mode and the
+    limits, since all of them change the output. Size is bounded by the total
+    length of the cached text rather than the entry count, so a few long
+    documents cannot crowd out memory.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.chars = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, ExtractionResult]" = OrderedDict()
+
+    @staticmethod
+    def key(file_content: bytes, extractor: Extractor, mode: str, limits: ExtractionLimits) -> str:
+        digest = hashlib.sha256(file_content).hexdigest()
+        return f"{extractor.name}:{extractor.version}:{mode}:{limits.max_pages}:{limits.max_chars}:{digest}"
+
+    def get(self, key: str) -> Optional[ExtractionResult]:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return replace(result)
+
+    def put(self, key: str, result: ExtractionResult) -> None:
+        # Results cut short by the time budget depend on machine load, not on
+        # the file, so they are not kept.
+        size = len(result.text or "")
+        if not self.max_chars or result.timed_out or size > self.max_chars or key in self._entries:
+            return
+        self._entries[key] = replace(result)
+        self.chars += size
+        while self.chars > self.max_chars:
+            _, evicted = self._entries.popitem(last=False)
+            self.chars -= len(evicted.text or "")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.chars = self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "chars": self.chars,
+            "max_chars": self.max_chars,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+extraction_cache = ExtractionCache(settings.EXTRACTION_CACHE_MAX_CHARS)
+
+
+def extract_document_cached(file_content: bytes, content_type: str) -> ExtractionResult:
+    """``extract_document`` through this process's extraction cache."""
+    extractor = get_extractor(file_content, content_type)
+    limits = ExtractionLimits.from_settings()
+    key = ExtractionCache.key(file_content, extractor, settings.EXTRACTION_MODE, limits)
+    result = extraction_cache.get(key)
+    if result is None:
+        result = extract_document(file_content, content_type, settings.EXTRACTION_MODE, limits)
+        extraction_cache.put(key, result)
+    return result
+
+def convert_to_text_cached(file_content: bytes, content_type: str) -> Optional[str]:
+    """``convert_to_text`` through this process's extraction cache."""
+    return extract_document_cached(file_content, content_type).text
@@ -0,0 +1,374 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from typing import Any, Callable, List, Optional
+
+from api.core.config import settings
+from api.utils.document_converter import (
+    Extractor,
+    ExtractionLimits,
+    ExtractionResult,
+    count_pdf_pages,
+    extract_document,
+    extract_text_from_pdf,
+    get_extractor,
+)
+from api.utils.extraction_cache import ExtractionCache, extraction_cache
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionOverloadedError(Exception):
+    """Every worker is busy and the queue is full."""
+
+
+class ExtractionTimeoutError(Exception):
+    """A job ran past its timeout."""
+
+
+class ExtractionCrashedError(Exception):
+    """The worker died mid-job, e.g. on its memory or CPU limit."""
+
+
+def _address_space_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _limit_cpu(seconds: float) -> None:
+    # RLIMIT_CPU counts the whole life of the process, so each job gets its
+    # budget on top of what earlier jobs used. Only the soft limit moves; it
+    # delivers SIGXCPU, which kills the worker.
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, memory_limit_mb: int, cpu_limit_seconds: float) -> None:
+    """Serve jobs from ``conn`` until it closes, under the sandbox limits."""
+    if resource is not None and memory_limit_mb:
+        # Headroom on top of the interpreter and preloaded modules.
+        limit = _address_space_bytes() + memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        fn, args = job
+        if resource is not None and cpu_limit_seconds:
+            _limit_cpu(cpu_limit_seconds)
+        try:
+            reply = ("ok", fn(*args))
+        except MemoryError:
+            # The heap may be in any state now; report and let the pool replace us.
+            try:
+                conn.send(("crashed", "ran out of memory"))
+            finally:
+                return
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send(("error", RuntimeError(f"Could not return the job result: {e!r}")))
+
+
+def _context():
+    # forkserver children start from a clean single-threaded process, not a
+    # fork of the API with its threads and open sockets.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["api.utils.document_converter"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class SandboxWorker:
+    """One extraction subprocess, fed one job at a time over a pipe.
+
+    Starting one may boot the forkserver, and ``call`` blocks, so the pool
+    does both from a thread.
+    """
+
+    def __init__(self, memory_limit_mb: int, cpu_limit_seconds: float):
+        context = _context()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_mb, cpu_limit_seconds),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        # Held by the thread in ``call`` for as long as it uses the pipe.
+        self._calling = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def call(self, fn: Callable[..., Any], args: tuple) -> Any:
+        """Run one job; blocks, so the pool calls it from a thread.
+
+        If the worker dies, including by ``kill``, ``recv`` returns EOF and
+        this thread reaps the process and closes the pipe.
+        """
+        self.jobs += 1
+        with self._calling:
+            try:
+                self.conn.send((fn, args))
+                kind, value = self.conn.recv()
+            except (EOFError, OSError):
+                self._reap()
+                raise ExtractionCrashedError(f"Extraction worker exited with code {self.process.exitcode}")
+            if kind == "crashed":
+                self._reap()
+                raise ExtractionCrashedError(f"Extraction worker {value}")
+        if kind == "error":
+            raise value
+        return value
+
+    def _reap(self) -> None:
+        self.process.join(1)
+        self.conn.close()
+
+    def kill(self) -> None:
+        """Stop the process without blocking; the thread in ``call`` cleans up.
+
+        The pipe is closed here only when no call is using it.
+        """
+        self.process.kill()
+        if self._calling.acquire(blocking=False):
+            try:
+                self.conn.close()
+            finally:
+                self._calling.release()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class ExtractionPool:
+    """Runs CPU-heavy document extraction outside the event loop.
+
+    At most ``workers`` jobs run at once and ``queue_limit`` more may wait;
+    beyond that ``run`` fails fast instead of queueing unboundedly. Each job
+    runs in a sandboxed subprocess with an address-space and CPU-time limit;
+    workers are reused across jobs and replaced after ``max_jobs_per_worker``.
+    A job that runs past ``timeout`` has its worker killed, and a worker that
+    dies on a limit only fails its own job. With ``workers=0`` jobs run
+    unsandboxed in a thread, keeping their slot until they finish.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_limit: int,
+        timeout: float,
+        memory_limit_mb: int = 0,
+        cpu_limit_seconds: float = 0.0,
+        max_jobs_per_worker: int = 0,
+    ):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.cpu_limit_seconds = cpu_limit_seconds
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.pending = 0
+        self.crashes = 0
+        self._idle: List[SandboxWorker] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def capacity(self) -> int:
+        return max(self.workers, 1) + self.queue_limit
+
+    @property
+    def free_slots(self) -> int:
+        return max(self.capacity - self.pending, 0)
+
+    def _release(self, _future: Any = None) -> None:
+        self.pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.capacity:
+            raise ExtractionOverloadedError(f"{self.pending} extraction jobs already running or queued")
+        if not self.workers:
+            return await self._run_in_thread(fn, *args)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        self.pending += 1
+        try:
+            async with self._slots:
+                return await self._run_in_worker(fn, args)
+        finally:
+            self.pending -= 1
+
+    async def _run_in_thread(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(None, fn, *args)
+        future.add_done_callback(self._release)
+        try:
+            # A thread cannot be killed; shield so the job keeps its slot.
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise ExtractionTimeoutError(f"Extraction took longer than {self.timeout:.0f} seconds")
+
+    async def _run_in_worker(self, fn: Callable[..., Any], args: tuple) -> Any:
+        loop = asyncio.get_running_loop()
+        worker = self._idle.pop() if self._idle else None
+        if worker is None or not worker.alive:
+            starting = loop.run_in_executor(None, SandboxWorker, self.memory_limit_mb, self.cpu_limit_seconds)
+            try:
+                worker = await asyncio.shield(starting)
+            except asyncio.CancelledError:
+                starting.add_done_callback(self._discard_started)
+                raise
+        call = loop.run_in_executor(None, worker.call, fn, args)
+        try:
+            result = await asyncio.wait_for(call, self.timeout)
+        except asyncio.TimeoutError:
+            worker.kill()
+            logger.warning(f"Extraction job {getattr(fn, '__name__', fn)} killed after {self.timeout:.0f} seconds")
+            raise ExtractionTimeoutError(f"Extraction took longer than {self.timeout:.0f} seconds")
+        except ExtractionCrashedError as e:
+            worker.kill()
+            self.crashes += 1
+            logger.warning(f"Extraction job {getattr(fn, '__name__', fn)} crashed its worker: {str(e)}")
+            raise
+        except asyncio.CancelledError:
+            # The job may still be running, so the worker cannot take another.
+            worker.kill()
+            raise
+        except Exception:
+            self._keep(worker)
+            raise
+        self._keep(worker)
+        return result
+
+    @staticmethod
+    def _discard_started(future: asyncio.Future) -> None:
+        # The request went away while its worker was starting.
+        if future.exception() is None:
+            future.result().kill()
+
+    def _keep(self, worker: SandboxWorker) -> None:
+        if self.max_jobs_per_worker and worker.jobs >= self.max_jobs_per_worker:
+            worker.close()
+        elif worker.alive:
+            self._idle.append(worker)
+
+    async def extract(self, file_content: bytes, content_type: str, mode: str, limits: ExtractionLimits) -> ExtractionResult:
+        """``extract_document`` on the pool, splitting long PDFs across workers.
+
+        The format is sniffed first, so unreadable binaries are rejected with
+        ``UnsupportedDocumentError`` before taking a slot. Results already in
+        the extraction cache are returned straight away, and "cheap" formats
+        such as plain text skip the pool altogether. A PDF of at least
+        EXTRACTION_PARALLEL_MIN_BYTES has its pages counted, and one of at least
+        EXTRACTION_PARALLEL_MIN_PAGES pages (after the page limit) is cut into
+        contiguous page ranges, one job each, and the texts are joined in page
+        order. Ranges never exceed the free slots, so a long document cannot
+        overload the pool by itself.
+        """
+        extractor = get_extractor(file_content, content_type)
+        key = ExtractionCache.key(file_content, extractor, mode, limits)
+        result = extraction_cache.get(key)
+        if result is None:
+            result = await self._extract(file_content, content_type, mode, limits, extractor)
+            extraction_cache.put(key, result)
+        return result
+
+    async def _extract(
+        self, file_content: bytes, content_type: str, mode: str, limits: ExtractionLimits, extractor: Extractor
+    ) -> ExtractionResult:
+        if extractor.cost == "cheap":
+            return extract_document(file_content, content_type, mode, limits)
+        if extractor.name == "pdf" and self.workers > 1 and len(file_content) >= settings.EXTRACTION_PARALLEL_MIN_BYTES:
+            page_count = await self.run(count_pdf_pages, file_content)
+            pages = min(page_count, limits.max_pages)
+            ranges = min(self.workers, self.free_slots, pages // max(settings.EXTRACTION_PAGES_PER_RANGE, 1))
+            if pages >= settings.EXTRACTION_PARALLEL_MIN_PAGES and ranges > 1:
+                try:
+                    return await self._extract_pdf_ranges(file_content, mode, limits, page_count, ranges)
+                except (ExtractionOverloadedError, ExtractionTimeoutError, ExtractionCrashedError):
+                    raise
+                except Exception as e:
+                    # Fall back to the single-job path and its decoding fallbacks.
+                    logger.warning(f"Parallel PDF extraction failed, retrying in one job: {str(e)}")
+        return await self.run(extract_document, file_content, content_type, mode, limits)
+
+    async def _extract_pdf_ranges(
+        self, pdf_bytes: bytes, mode: str, limits: ExtractionLimits, page_count: int, ranges: int
+    ) -> ExtractionResult:
+        pages = min(page_count, limits.max_pages)
+        bounds = [pages * index // ranges for index in range(ranges + 1)]
+        results = await asyncio.gather(*(
+            self.run(extract_text_from_pdf, pdf_bytes, mode, limits, start, end)
+            for start, end in zip(bounds, bounds[1:])
+        ))
+        text = "".join(result.text for result in results)
+        truncated = page_count > pages or any(result.truncated for result in results)
+        if len(text) > limits.max_chars:
+            text, truncated = text[:limits.max_chars], True
+        # Normalized only once merged, so headers repeated across ranges are found.
+        return ExtractionResult(
+            text=text,
+            mode=mode,
+            pages=sum(result.pages for result in results),
+            truncated=truncated,
+            timed_out=any(result.timed_out for result in results),
+        ).normalize()
+
+    def shutdown(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
+
+
+_pool: Optional[ExtractionPool] = None
+
+
+def get_extraction_pool() -> ExtractionPool:
+    global _pool
+    if _pool is None:
+        _pool = ExtractionPool(
+            workers=settings.EXTRACTION_WORKERS,
+            queue_limit=settings.EXTRACTION_QUEUE_LIMIT,
+            timeout=settings.EXTRACTION_TIMEOUT_SECONDS,
+            memory_limit_mb=settings.EXTRACTION_MEMORY_LIMIT_MB,
+            cpu_limit_seconds=settings.EXTRACTION_CPU_LIMIT_SECONDS,
+            max_jobs_per_worker=settings.EXTRACTION_WORKER_MAX_JOBS,
+        )
+    return _pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
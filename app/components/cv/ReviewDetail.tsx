@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useRouter } from 'next/navigation';
 import { useAuth } from '@/app/components/AuthProvider';
 import ReactMarkdown from 'react-markdown';
@@ -28,6 +28,7 @@ interface Review {
   updated_at: string;
   review_result: string | null;
   score: number | null;
+  tier: string | null;
 }
 
 export default function ReviewDetail({ reviewId }: ReviewDetailProps) {
@@ -36,6 +37,7 @@ export default function ReviewDetail({ reviewId }: ReviewDetailProps) {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [review, setReview] = useState<Review | null>(null);
+  const processRequested = useRef(false);
 
   const fetchReviewData = useCallback(async () => {
     try {
@@ -59,10 +61,20 @@ export default function ReviewDetail({ reviewId }: ReviewDetailProps) {
     }
   }, [reviewId, isLoading, isAuthenticated, router, fetchReviewData]);
 
+  // Uploads return with the preliminary review; ask for the full review once
+  // and keep showing the preliminary one while it is generated.
+  useEffect(() => {
+    if (review?.status !== 'pending' || processRequested.current) return;
+    processRequested.current = true;
+    apiClient.post(`reviews/${reviewId}/process`, {})
+      .then(data => setReview(data))
+      .catch(err => console.error('Review processing error:', err));
+  }, [review, reviewId]);
+
   useEffect(() => {
     let intervalId: NodeJS.Timeout | undefined;
     
-    if (review?.status === 'processing') {
+    if (review?.status === 'pending' || review?.status === 'processing') {
       intervalId = setInterval(() => {
         apiClient.get(`reviews/${reviewId}`)
           .then(data => {
@@ -137,7 +149,7 @@ export default function ReviewDetail({ reviewId }: ReviewDetailProps) {
           <Alert severity="error" sx={{ mt: 2 }}>There was an error processing your CV review. Please try uploading again.</Alert>
         )}
       </Paper>
-      {review.status === 'completed' && review.review_result && (
+      {(review.status === 'completed' || review.tier === 'preliminary') && review.review_result && (
         <Grid container spacing={3}>
           {review.score !== null && (
             <Grid item xs={12} md={4}>
@@ -153,7 +165,7 @@ export default function ReviewDetail({ reviewId }: ReviewDetailProps) {
           )}
           <Grid item xs={12} md={review.score !== null ? 8 : 12}>
             <Paper sx={{ p: 3 }}>
-              <Typography variant="h6">Review Feedback</Typography>
+              <Typography variant="h6">{review.tier === 'preliminary' ? 'Preliminary Feedback' : 'Review Feedback'}</Typography>
               <Divider sx={{ mb: 2 }} />
               <Box sx={{ '& a': { color: 'primary.main' }, '& h1, & h2, & h3, & h4, & h5, & h6': { mt: 2, mb: 1, fontWeight: 'fontWeightMedium' }, '& ul, & ol': { pl: 3 } }}>
                 <ReactMarkdown>{review.review_result}</ReactMarkdown>
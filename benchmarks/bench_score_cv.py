@@ -0,0 +1,105 @@
+"""Compare the single-pass ``score_cv`` scanner with the previous multi-pass version.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_score_cv
+"""
+import argparse
+import random
+import re
+import timeit
+
+import numpy as np
+
+from api.services.scoring import get_scoring_rules, score_cv, score_features
+
+FILLER = (
+    "the and with for our new to of in a on at by from this that as their within across using through "
+    "backend frontend services customers platform data python java cloud aws pipeline users analytics "
+    "dashboard migration release testing quality stakeholders requirements architecture reporting support "
+    "product business company limited london manchester engineer senior junior including various multiple"
+).split()
+KEYWORDS = (
+    "experience education university skills portfolio projects email github linkedin developed led managed "
+    "improved reduced created designed implemented coordinated achieved increased won 40% $300"
+).split() + ["5 years", "6 months", "12 people", "3 team"]
+
+
+def multi_pass_score_cv(cv_content: str) -> float:
+    """``score_cv`` as it was before the single-pass scanner, kept as the baseline."""
+    score = 5.0
+    cv_lower = cv_content.lower()
+
+    word_count = len(cv_content.split())
+    if word_count < 100:
+        score -= 1.0
+    elif 300 <= word_count <= 700:
+        score += 1.0
+    elif word_count > 1000:
+        score -= 0.5
+
+    if re.search(r'education|degree|university|college', cv_lower):
+        score += 0.5
+    if re.search(r'experience|work|employment|job', cv_lower):
+        score += 0.5
+    if re.search(r'skills|abilities|proficiency|competencies', cv_lower):
+        score += 0.5
+    if re.search(r'projects|portfolio|achievements', cv_lower):
+        score += 0.5
+    if re.search(r'email|phone|contact|linkedin|github', cv_lower):
+        score += 0.5
+
+    achievement_count = len(re.findall(r'increased|decreased|improved|achieved|won|created|developed|led|managed|reduced', cv_lower))
+    if achievement_count >= 5:
+        score += 1.0
+    elif achievement_count >= 3:
+        score += 0.5
+
+    metrics_count = len(re.findall(r'\d+%|\$\d+|\d+ years|\d+ months|\d+ people|\d+ team', cv_lower))
+    if metrics_count >= 3:
+        score += 1.0
+    elif metrics_count >= 1:
+        score += 0.5
+
+    action_verbs = ['implemented', 'developed', 'created', 'designed', 'managed', 'led', 'coordinated', 'achieved', 'improved']
+    action_verb_count = sum(1 for verb in action_verbs if f" {verb} " in cv_lower or f"\n{verb} " in cv_lower)
+    if action_verb_count >= 5:
+        score += 1.0
+    elif action_verb_count >= 3:
+        score += 0.5
+
+    score = max(1.0, min(score, 10.0))
+    return round(score, 1)
+
+
+def make_cv(words: int, keyword_rate: float = 0.05, seed: int = 0) -> str:
+    """Twelve-word lines of filler with roughly ``keyword_rate`` scored keywords."""
+    rng = random.Random(seed)
+    tokens = [rng.choice(KEYWORDS) if rng.random() < keyword_rate else rng.choice(FILLER) for _ in range(words)]
+    return "\n".join(" ".join(tokens[start:start + 12]).capitalize() for start in range(0, words, 12))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000, 50_000])
+    parser.add_argument("--keyword-rate", type=float, default=0.05, help="Fraction of words that are scored keywords")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch-rows", type=int, default=1_000_000, help="Feature rows rescored by score_features")
+    args = parser.parse_args()
+
+    print(f"{'words':>8} {'multi-pass ms':>14} {'single-pass ms':>15} {'speedup':>8}")
+    for size in args.sizes:
+        cv = make_cv(size, args.keyword_rate)
+        assert score_cv(cv) == multi_pass_score_cv(cv)
+        number = max(1, 20_000 // size)
+        before = min(timeit.repeat(lambda: multi_pass_score_cv(cv), number=number, repeat=args.repeat)) / number
+        after = min(timeit.repeat(lambda: score_cv(cv), number=number, repeat=args.repeat)) / number
+        print(f"{size:>8} {before * 1000:>14.2f} {after * 1000:>15.2f} {before / after:>7.1f}x")
+
+    features = np.random.default_rng(0).integers(0, 1200, size=(args.batch_rows, len(get_scoring_rules().feature_names)))
+    elapsed = min(timeit.repeat(lambda: score_features(features), number=1, repeat=args.repeat))
+    print(f"score_features on {args.batch_rows:,} stored feature rows: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import os
+
+from benchmarks.corpus import PAGE_COUNTS, build_corpus
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("extraction corpus")
+    group.addoption("--corpus-dir", default=DEFAULT_CORPUS_DIR, help="Where the generated corpus is cached")
+    group.addoption("--corpus-max-pages", type=int, default=max(PAGE_COUNTS), help="Skip documents longer than this")
+
+
+def pytest_generate_tests(metafunc):
+    """One case per corpus document and extraction mode its format supports."""
+    if "document" in metafunc.fixturenames:
+        max_pages = metafunc.config.getoption("corpus_max_pages")
+        documents = build_corpus(
+            metafunc.config.getoption("corpus_dir"),
+            page_counts=[pages for pages in PAGE_COUNTS if pages <= max_pages],
+        )
+        cases = [(document, mode) for document in documents for mode in metafunc.module.MODES[document.format]]
+        metafunc.parametrize("document, mode", cases, ids=[f"{document.name}-{mode}" for document, mode in cases])
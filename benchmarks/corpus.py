@@ -0,0 +1,191 @@
+"""Generate the document corpus used by the extraction benchmarks.
+
+PDF and DOCX CVs from 1 to 200 pages in four variants: plain text, tables,
+text with embedded photos, and scanned-like pages that are only an image of
+text with no text layer. Output is deterministic for a given seed, so runs on
+different branches extract the same bytes.
+
+Run from the repository root::
+
+    python -m benchmarks.corpus --output benchmarks/corpus
+"""
+import argparse
+import io
+import os
+import random
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import docx
+from docx.enum.text import WD_BREAK
+from docx.shared import Inches
+from fpdf import FPDF
+from PIL import Image, ImageDraw, ImageFilter
+
+FORMATS = ("pdf", "docx")
+VARIANTS = ("text", "tables", "images", "scanned")
+PAGE_COUNTS = (1, 10, 50, 200)
+LINES_PER_PAGE = 40
+
+WORDS = (
+    "led managed developed designed improved reduced delivered migrated launched automated "
+    "python java sql aws kubernetes terraform react analytics platform pipeline services "
+    "customers stakeholders team engineers product reliability latency revenue onboarding "
+    "quarterly roadmap architecture testing release mentoring hiring budget vendors"
+).split()
+HEADINGS = ("Experience", "Education", "Skills", "Projects", "Achievements")
+COMPANIES = ("Acme Ltd", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay Industries")
+
+
+@dataclass(frozen=True)
+class CorpusDocument:
+    name: str
+    format: str
+    variant: str
+    pages: int
+    path: str
+
+    @property
+    def content_type(self) -> str:
+        if self.format == "pdf":
+            return "application/pdf"
+        return "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as document_file:
+            return document_file.read()
+
+
+def cv_line(rng: random.Random) -> str:
+    words = rng.sample(WORDS, rng.randint(8, 14))
+    return f"{words[0].capitalize()} {' '.join(words[1:])}, {rng.randint(5, 60)}% in {rng.randint(2, 9)} months."
+
+
+def table_rows(rng: random.Random, rows: int) -> List[Sequence[str]]:
+    return [
+        (rng.choice(COMPANIES), rng.choice(WORDS).capitalize(), f"{rng.randint(2005, 2020)} - {rng.randint(2021, 2025)}", cv_line(rng)[:40])
+        for _ in range(rows)
+    ]
+
+
+def photo(rng: random.Random, size: int = 240) -> bytes:
+    """A noisy, blurred image that compresses about as badly as a photo."""
+    image = Image.frombytes("RGB", (size, size), rng.randbytes(size * size * 3)).filter(ImageFilter.GaussianBlur(2))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def scanned_page(rng: random.Random, width: int = 1240, height: int = 1754) -> bytes:
+    """An A4 page at 150 dpi of grey text on a speckled background, as a scanner would produce."""
+    image = Image.new("L", (width, height), 250)
+    draw = ImageDraw.Draw(image)
+    for line in range(LINES_PER_PAGE):
+        draw.text((90 + rng.randint(-3, 3), 90 + line * 40), cv_line(rng), fill=rng.randint(20, 60))
+    for _ in range(4000):
+        draw.point((rng.randrange(width), rng.randrange(height)), fill=rng.randint(120, 200))
+    buffer = io.BytesIO()
+    image.rotate(rng.uniform(-0.6, 0.6), fillcolor=250).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def make_pdf(variant: str, pages: int, rng: random.Random) -> bytes:
+    pdf = FPDF()
+    pdf.set_auto_page_break(False)
+    pdf.set_font("Helvetica", size=10)
+    # A handful of distinct images, reused, keeps generation time down.
+    images = [scanned_page(rng) if variant == "scanned" else photo(rng) for _ in range(3)] if variant in ("images", "scanned") else []
+    for page in range(pages):
+        pdf.add_page()
+        if variant == "scanned":
+            pdf.image(io.BytesIO(images[page % len(images)]), x=0, y=0, w=pdf.w, h=pdf.h)
+            continue
+        pdf.set_font("Helvetica", style="B", size=12)
+        pdf.cell(0, 8, f"Jane Doe | Senior Engineer | {HEADINGS[page % len(HEADINGS)]}", new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", size=10)
+        lines = LINES_PER_PAGE
+        if variant == "images":
+            pdf.image(io.BytesIO(images[page % len(images)]), x=150, y=20, w=45)
+            lines -= 10
+        if variant == "tables":
+            with pdf.table(col_widths=(35, 30, 30, 95), line_height=5) as table:
+                for row in [("Company", "Role", "Dates", "Summary"), *table_rows(rng, 15)]:
+                    table.row(row)
+            lines -= 25
+        for _ in range(lines):
+            pdf.cell(0, 5, cv_line(rng), new_x="LMARGIN", new_y="NEXT")
+        pdf.set_y(-15)
+        pdf.cell(0, 5, f"Page {page + 1} of {pages}", align="C")
+    return bytes(pdf.output())
+
+
+def make_docx(variant: str, pages: int, rng: random.Random) -> bytes:
+    document = docx.Document()
+    images = [scanned_page(rng) if variant == "scanned" else photo(rng) for _ in range(3)] if variant in ("images", "scanned") else []
+    for page in range(pages):
+        if page:
+            document.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+        if variant == "scanned":
+            document.add_picture(io.BytesIO(images[page % len(images)]), width=Inches(6.2))
+            continue
+        document.add_heading(HEADINGS[page % len(HEADINGS)], level=1)
+        lines = LINES_PER_PAGE
+        if variant == "images":
+            document.add_picture(io.BytesIO(images[page % len(images)]), width=Inches(1.5))
+            lines -= 10
+        if variant == "tables":
+            rows = [("Company", "Role", "Dates", "Summary"), *table_rows(rng, 15)]
+            table = document.add_table(rows=len(rows), cols=4)
+            for cells, values in zip(table.rows, rows):
+                for cell, value in zip(cells.cells, values):
+                    cell.text = value
+            # Merged cells, which python-docx used to report once per grid cell.
+            table.cell(1, 0).merge(table.cell(3, 0))
+            table.cell(4, 2).merge(table.cell(4, 3))
+            lines -= 25
+        for _ in range(lines):
+            document.add_paragraph(cv_line(rng))
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+BUILDERS = {"pdf": make_pdf, "docx": make_docx}
+
+
+def build_corpus(
+    output: str,
+    formats: Sequence[str] = FORMATS,
+    variants: Sequence[str] = VARIANTS,
+    page_counts: Sequence[int] = PAGE_COUNTS,
+    seed: int = 7,
+) -> List[CorpusDocument]:
+    """Write the corpus to ``output``, reusing files already there, and list it."""
+    os.makedirs(output, exist_ok=True)
+    documents = []
+    for document_format in formats:
+        for variant in variants:
+            for pages in page_counts:
+                name = f"{document_format}-{variant}-{pages:03d}p"
+                path = os.path.join(output, f"{name}.{document_format}")
+                if not os.path.exists(path):
+                    rng = random.Random(f"{seed}:{name}")
+                    content = BUILDERS[document_format](variant, pages, rng)
+                    with open(f"{path}.tmp", "wb") as document_file:
+                        document_file.write(content)
+                    os.replace(f"{path}.tmp", path)
+                documents.append(CorpusDocument(name, document_format, variant, pages, path))
+    return documents
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the document extraction benchmark corpus")
+    parser.add_argument("--output", default="benchmarks/corpus", help="Directory to write documents to")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--pages", nargs="+", type=int, default=list(PAGE_COUNTS), help="Page counts to generate")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for document in build_corpus(args.output, args.formats, args.variants, args.pages, args.seed):
+        print(f"{document.path}\t{os.path.getsize(document.path)} bytes")
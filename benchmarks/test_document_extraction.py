@@ -0,0 +1,62 @@
+"""Throughput, peak memory and output size of document extraction.
+
+Every corpus document (see ``benchmarks.corpus``) goes through
+``extract_document`` in each mode its extractor supports, without page or
+character limits. Besides the timings, each result records pages and
+megabytes per second, peak traced memory and the raw and normalized output
+size in ``extra_info``.
+
+Run from the repository root, saving JSON to compare branches::
+
+    pytest benchmarks --benchmark-json=benchmarks/results/$(git branch --show-current).json
+    pytest benchmarks --benchmark-autosave --corpus-max-pages 50
+    pytest-benchmark compare --group-by=group --columns=mean,max,rounds
+    pytest benchmarks --benchmark-disable --corpus-max-pages 1  # smoke test
+
+The corpus is generated into ``benchmarks/corpus`` on first use and reused.
+"""
+import tracemalloc
+
+from api.utils.document_converter import ExtractionLimits, extract_document
+
+UNBOUNDED = ExtractionLimits(max_pages=10_000, max_chars=100_000_000, time_budget=3600.0)
+# Modes run per format; the corpus conftest parametrizes from this.
+MODES = {"pdf": ("full", "fast"), "docx": ("full",)}
+
+
+def peak_memory(*args) -> int:
+    """Peak Python heap use of one extraction, as seen by tracemalloc."""
+    tracemalloc.start()
+    try:
+        extract_document(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_extraction(benchmark, document, mode):
+    content = document.read()
+    args = (content, document.content_type, mode, UNBOUNDED)
+
+    benchmark.group = f"{document.format}-{mode}"
+    result = benchmark.pedantic(extract_document, args=args, rounds=max(1, min(5, 50 // document.pages)), iterations=1)
+
+    benchmark.extra_info.update(
+        format=document.format,
+        variant=document.variant,
+        mode=mode,
+        pages=document.pages,
+        input_bytes=len(content),
+        raw_chars=result.raw_chars,
+        output_chars=len(result.text or ""),
+        peak_memory_bytes=peak_memory(*args),
+    )
+    # No stats when run with --benchmark-disable as a quick smoke test.
+    if benchmark.stats:
+        mean = benchmark.stats.stats.mean
+        benchmark.extra_info.update(
+            pages_per_second=round(document.pages / mean, 2),
+            megabytes_per_second=round(len(content) / mean / 1_000_000, 3),
+        )
+    if document.variant != "scanned":
+        assert result.text
@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Deque, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import null, select, update
+
+from api.core.config import settings
+from api.core.database import get_session_factory
+from api.models.models import Review
+from api.services.scoring import get_scoring_rules, score_cvs, scoring_version
+from api.utils.document_converter import (
+    ExtractionLimits,
+    ExtractionResult,
+    UnsafeDocumentError,
+    UnsupportedDocumentError,
+)
+from api.utils.extraction_pool import ExtractionCrashedError, ExtractionPool, ExtractionTimeoutError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TASKS = ("extract", "score")
+
+Row = Tuple[int, Optional[bytes], Optional[str], Optional[str]]
+
+async def extract_chunk(pool: ExtractionPool, rows: Sequence[Row]) -> Dict[int, ExtractionResult]:
+    """Re-extract one chunk's files in the sandboxed pool, one at a time.
+
+    A document that is unsafe or unsupported, runs past the timeout or kills
+    its worker is logged and skipped, so it keeps its stored text and the run
+    carries on.
+    """
+    extractions = {}
+    for review_id, file_content, content_type, _ in rows:
+        if not file_content:
+            continue
+        try:
+            extractions[review_id] = await pool.extract(
+                file_content, content_type or "text/plain", settings.EXTRACTION_MODE, ExtractionLimits.from_settings()
+            )
+        except (UnsafeDocumentError, UnsupportedDocumentError, ExtractionTimeoutError, ExtractionCrashedError) as e:
+            logger.warning(f"Keeping stored text for review {review_id}: {str(e)}")
+    return extractions
+
+def process_chunk(
+    rows: Sequence[Row], tasks: Sequence[str], extractions: Optional[Dict[int, ExtractionResult]] = None
+) -> List[Dict[str, object]]:
+    """Apply re-extracted text and/or re-score one chunk of reviews; runs in a worker process.
+
+    ``extractions`` holds ``extract_chunk`` results by review id; reviews
+    without one keep their stored text. Returns one bulk UPDATE parameter set
+    per review that changed.
+    """
+    updates = []
+    texts = []
+    for review_id, _, _, content in rows:
+        values: Dict[str, object] = {"id": review_id}
+        extraction = (extractions or {}).get(review_id)
+        if extraction and extraction.text and extraction.text.strip():
+            values["extraction_mode"] = extraction.mode
+            values["extraction_truncated"] = extraction.truncated
+            if extraction.text != content:
+                content = values["content"] = extraction.text
+        texts.append(content or "")
+        updates.append(values)
+
+    if "score" in tasks:
+        rules = get_scoring_rules()
+        version = scoring_version(rules)
+        scores, features = score_cvs(texts, rules)
+        for values, score, row in zip(updates, scores, features):
+            values.update(
+                score=float(score),
+                score_rules_version=version,
+                score_features=dict(zip(rules.feature_names, row.tolist())),
+                score_features_version=rules.features_version,
+            )
+    return [values for values in updates if len(values) > 1]
+
+class Checkpoint:
+    """Highest review id whose results are committed, stored as JSON."""
+
+    def __init__(self, path: str, tasks: Sequence[str]):
+        self.path = path
+        self.tasks = sorted(tasks)
+        self.last_id = 0
+        self.processed = 0
+
+    def load(self) -> "Checkpoint":
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as checkpoint_file:
+                saved = json.load(checkpoint_file)
+            if saved.get("tasks") != self.tasks:
+                raise ValueError(f"Checkpoint {self.path} was written for tasks {saved.get('tasks')}; pass --restart to discard it")
+            self.last_id = saved["last_id"]
+            self.processed = saved["processed"]
+        return self
+
+    def save(self) -> None:
+        # Write then rename, so a crash never leaves a half-written checkpoint.
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump({"tasks": self.tasks, "last_id": self.last_id, "processed": self.processed}, checkpoint_file)
+        os.replace(temp_path, self.path)
+
+async def stream_chunks(after_id: int, chunk_size: int, cursor_rows: int, with_files: bool) -> AsyncIterator[List[Row]]:
+    """Yield id-ordered chunks of reviews with ids above ``after_id``.
+
+    Rows come from a server-side cursor. The cursor is reopened every
+    ``cursor_rows`` rows so no read transaction stays open for the whole run.
+    """
+    columns = (
+        Review.id,
+        Review.file_content if with_files else null(),
+        Review.content_type,
+        Review.content,
+    )
+    while True:
+        seen = 0
+        async with get_session_factory()() as session:
+            result = await session.stream(
+                select(*columns)
+                .where(Review.id > after_id)
+                .order_by(Review.id)
+                .limit(cursor_rows)
+                .execution_options(yield_per=chunk_size)
+            )
+            async for partition in result.partitions(chunk_size):
+                rows = [tuple(row) for row in partition]
+                seen += len(rows)
+                after_id = rows[-1][0]
+                yield rows
+        if seen < cursor_rows:
+            return
+
+async def write_updates(updates: List[Dict[str, object]]) -> None:
+    if not updates:
+        return
+    async with get_session_factory()() as session:
+        await session.execute(update(Review), updates)
+        await session.commit()
+
+async def backfill(
+    tasks: Sequence[str],
+    checkpoint: Checkpoint,
+    chunk_size: int = 200,
+    workers: int = 2,
+    max_rows_per_second: float = 0.0,
+    cursor_rows: int = 10_000,
+    executor: Optional[Executor] = None,
+    pool: Optional[ExtractionPool] = None,
+) -> int:
+    """Run ``tasks`` over every review after the checkpoint and return the rows processed.
+
+    Up to two chunks per worker are in flight at once. Files are re-extracted
+    in the sandboxed extraction pool, scoring runs on ``executor``. Results
+    are written in id order, so the checkpoint only ever covers committed rows.
+    """
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    executor = executor or ProcessPoolExecutor(max_workers=workers)
+    own_pool = pool is None
+    pool = pool or ExtractionPool(
+        workers=max(workers, 1),
+        # Room for every in-flight chunk to split one PDF across all workers,
+        # so the backfill never sees ExtractionOverloadedError.
+        queue_limit=2 * max(workers, 1) ** 2,
+        timeout=settings.EXTRACTION_TIMEOUT_SECONDS,
+        memory_limit_mb=settings.EXTRACTION_MEMORY_LIMIT_MB,
+        cpu_limit_seconds=settings.EXTRACTION_CPU_LIMIT_SECONDS,
+        max_jobs_per_worker=settings.EXTRACTION_WORKER_MAX_JOBS,
+    )
+    pending: Deque[Tuple[int, int, asyncio.Future]] = deque()
+    started = time.monotonic()
+    processed = chunks = 0
+
+    async def write_oldest() -> None:
+        nonlocal processed, chunks
+        last_id, count, future = pending.popleft()
+        await write_updates(await future)
+        processed += count
+        chunks += 1
+        checkpoint.last_id = last_id
+        checkpoint.processed += count
+        checkpoint.save()
+        if chunks % 50 == 0:
+            logger.info(f"Backfilled {checkpoint.processed} reviews, up to id {last_id}")
+        if max_rows_per_second:
+            ahead = processed / max_rows_per_second - (time.monotonic() - started)
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+    async def run_chunk(rows: List[Row]) -> List[Dict[str, object]]:
+        extractions = await extract_chunk(pool, rows) if "extract" in tasks else None
+        # The files have been read; only ids and text go to the scoring workers.
+        rows = [(review_id, None, content_type, content) for review_id, _, content_type, content in rows]
+        return await loop.run_in_executor(executor, process_chunk, rows, tuple(tasks), extractions)
+
+    try:
+        async for rows in stream_chunks(checkpoint.last_id, chunk_size, cursor_rows, "extract" in tasks):
+            pending.append((rows[-1][0], len(rows), asyncio.ensure_future(run_chunk(rows))))
+            if len(pending) >= max(workers, 1) * 2:
+                await write_oldest()
+        while pending:
+            await write_oldest()
+    finally:
+        for _, _, future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+        if own_pool:
+            pool.shutdown()
+    return processed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-extract and re-score stored reviews in resumable batches")
+    parser.add_argument("--tasks", nargs="+", choices=TASKS, default=list(TASKS), help="Work to run on every review")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Reviews per worker job and per bulk UPDATE")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    parser.add_argument("--max-rows-per-second", type=float, default=0.0, help="Throttle to protect the database (0 for no limit)")
+    parser.add_argument("--cursor-rows", type=int, default=10_000, help="Rows read before the server-side cursor is reopened")
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json", help="Progress file used to resume")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint and start from the first review")
+    args = parser.parse_args()
+
+    checkpoint = Checkpoint(args.checkpoint, args.tasks)
+    if not args.restart:
+        checkpoint.load()
+    if checkpoint.last_id:
+        logger.info(f"Resuming after review id {checkpoint.last_id} ({checkpoint.processed} already processed)")
+
+    processed = asyncio.run(backfill(
+        args.tasks,
+        checkpoint,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        max_rows_per_second=args.max_rows_per_second,
+        cursor_rows=args.cursor_rows,
+    ))
+    logger.info(f"Backfill finished: {processed} reviews this run, {checkpoint.processed} in total")
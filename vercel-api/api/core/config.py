@@ -54,7 +54,68 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7 
     
     GEMINI_API_KEY: str = ""
-    
+    # Comma-separated pool of keys, each optionally suffixed with its own
+    # budget as "key:requests_per_minute". GEMINI_API_KEY joins the pool.
+    # A budget of 0, the default, means no client-side limit.
+    GEMINI_API_KEYS: str = ""
+    GEMINI_KEY_REQUESTS_PER_MINUTE: int = 0
+    GEMINI_KEY_COOLDOWN_SECONDS: float = 60.0
+
+    @property
+    def gemini_api_keys(self) -> List[str]:
+        keys = [key.strip() for key in self.GEMINI_API_KEYS.split(",") if key.strip()]
+        if self.GEMINI_API_KEY and not any(key.split(":")[0] == self.GEMINI_API_KEY for key in keys):
+            keys.insert(0, self.GEMINI_API_KEY)
+        return keys
+
+    GEMINI_MODEL: str = "gemini-1.5-flash"
+    # Leave empty for the default gRPC client; "rest" plus an endpoint such as
+    # "http://127.0.0.1:8765" points the client at the fake Gemini server.
+    GEMINI_TRANSPORT: str = ""
+    GEMINI_API_ENDPOINT: str = ""
+
+    # Per-attempt cap and the overall budget shared by every retry of one review.
+    # Hedging sends a second request once an attempt outlives the observed p95.
+    LLM_ATTEMPT_TIMEOUT_SECONDS: float = 20.0
+    LLM_TOTAL_DEADLINE_SECONDS: float = 45.0
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    # Adaptive (AIMD) cap on concurrent provider calls: grows while calls finish
+    # under the latency target, shrinks by the backoff factor on every 429.
+    LLM_CONCURRENCY_INITIAL: int = 4
+    LLM_CONCURRENCY_MIN: int = 1
+    LLM_CONCURRENCY_MAX: int = 32
+    LLM_CONCURRENCY_LATENCY_TARGET_SECONDS: float = 10.0
+    LLM_CONCURRENCY_BACKOFF: float = 0.5
+    # Load shedding: the breaker opens after this many failed reviews in a row,
+    # and queue depth is the number of calls waiting for a concurrency slot.
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    REVIEW_REDUCED_QUEUE_DEPTH: int = 8
+    REVIEW_RULE_BASED_QUEUE_DEPTH: int = 32
+    REVIEW_REDUCED_MAX_WORDS: int = 600
+    GEMINI_REDUCED_MODEL: str = "gemini-1.5-flash-8b"
+    # "single" sends one prompt per review; "sections" requests each feedback
+    # area concurrently with only the relevant part of the CV.
+    REVIEW_GENERATION_MODE: str = "single"
+
+    # "gemini" for production, "local" for the deterministic offline provider.
+    LLM_PROVIDER: str = "gemini"
+    LOCAL_LLM_LATENCY_MS: float = 800.0
+    LOCAL_LLM_LATENCY_JITTER_MS: float = 200.0
+    LOCAL_LLM_LATENCY_DISTRIBUTION: str = "uniform"
+    LOCAL_LLM_ERROR_RATE: float = 0.0
+    LOCAL_LLM_RATE_LIMIT_RATE: float = 0.0
+    LOCAL_LLM_SEED: int = 0
+
+    # Versioned keyword classes, thresholds and weights for score_cv. Empty uses
+    # the rules file bundled with api/services/scoring.py.
+    SCORING_RULES_PATH: str = ""
+    # "rules" for the heuristic above, "model" for the learned linear model in
+    # SCORING_MODEL_PATH (trained with `python -m api.train_score_model`).
+    SCORING_METHOD: str = "rules"
+    SCORING_MODEL_PATH: str = ""
+
     DEFAULT_CREDITS: int = 5
     REVIEW_CREDIT_COST: int = 1 
     PRICING_TIERS: Dict[str, Dict[str, Any]] = {
@@ -64,6 +125,38 @@ class Settings(BaseSettings):
     }
     
     BACKGROUND_WORKERS: int = 2
+    # Processes that extract text from uploads off the event loop (0 runs
+    # extraction in a thread instead). Uploads beyond workers + queue limit
+    # are turned away with 503.
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_QUEUE_LIMIT: int = 8
+    EXTRACTION_TIMEOUT_SECONDS: float = 30.0
+    # Sandbox for each worker: memory on top of its startup footprint, CPU
+    # seconds per job (0 disables either), and jobs before it is replaced.
+    EXTRACTION_MEMORY_LIMIT_MB: int = 1024
+    EXTRACTION_CPU_LIMIT_SECONDS: float = 20.0
+    EXTRACTION_WORKER_MAX_JOBS: int = 500
+    # PDF parsing stops after this many pages or characters, or once the time
+    # budget is spent, keeping what it has. "fast" skips layout analysis.
+    EXTRACTION_MODE: str = "full"
+    EXTRACTION_MAX_PAGES: int = 20
+    EXTRACTION_MAX_CHARS: int = 60_000
+    EXTRACTION_TIME_BUDGET_SECONDS: float = 10.0
+    # PDFs with at least this many pages are split into page ranges extracted
+    # on several workers at once, each range at least EXTRACTION_PAGES_PER_RANGE.
+    EXTRACTION_PARALLEL_MIN_PAGES: int = 8
+    EXTRACTION_PAGES_PER_RANGE: int = 4
+    # Smaller PDFs are taken to be short and go straight to one job, without
+    # a job to count their pages first.
+    EXTRACTION_PARALLEL_MIN_BYTES: int = 128 * 1024
+    # DOCX uploads are zip archives; anything past these limits is refused
+    # before decompression.
+    DOCX_MAX_UNCOMPRESSED_BYTES: int = 50 * 1024 * 1024
+    DOCX_MAX_COMPRESSION_RATIO: float = 100.0
+    DOCX_MAX_ENTRIES: int = 1000
+    # Extracted text is cached per process by file hash, up to this many
+    # characters in total (0 disables the cache).
+    EXTRACTION_CACHE_MAX_CHARS: int = 20_000_000
 
     CORS_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
 
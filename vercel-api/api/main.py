@@ -5,7 +5,9 @@ from contextlib import asynccontextmanager
 import os
 from api.core.config import settings
 from api.core.database import create_tables
-from api.routers import reviews, credits, notifications
+from api.routers import reviews, credits, notifications, metrics
+from api.services.scoring import scoring_version
+from api.utils.extraction_pool import shutdown_extraction_pool
 from api.core.auth import router as auth_router
 from alembic.config import Config
 from alembic import command
@@ -48,6 +50,9 @@ async def lifespan(app: FastAPI):
         raise RuntimeError("SECRET_KEY must be configured before the API can start.")
     await apply_migrations()
     await initialize_database()
+    # Compile the scoring rules and load any scoring model now, so a broken
+    # rules or weights file fails the deploy.
+    logger.info(f"Scoring version {scoring_version()} loaded")
 
     logger.info(f"JWT Authentication enabled with algorithm: {settings.ALGORITHM}")
     logger.info(f"Token expiration: {settings.ACCESS_TOKEN_EXPIRE_MINUTES} minutes")
@@ -61,6 +66,8 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    shutdown_extraction_pool()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API for AI-powered CV review application with credit system",
@@ -80,6 +87,7 @@ app.add_middleware(
 app.include_router(reviews.router, prefix=settings.API_V1_STR)
 app.include_router(credits.router, prefix=settings.API_V1_STR)
 app.include_router(notifications.router, prefix=settings.API_V1_STR)
+app.include_router(metrics.router, prefix=settings.API_V1_STR)
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth")
 
 @app.get(f"{settings.API_V1_STR}/health")
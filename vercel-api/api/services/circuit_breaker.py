@@ -0,0 +1,47 @@
+import logging
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Tracks consecutive upstream failures.
+
+    After ``failure_threshold`` failures in a row the breaker opens. Once
+    ``reset_timeout`` seconds have passed it reports ``half_open`` so callers can
+    send trial traffic. A success closes it again; a failure while half open
+    reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._clock = clock
+        self._opened_at = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Upstream recovered, closing circuit breaker")
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Opening circuit breaker after {self.failures} consecutive failures")
+            self._opened_at = self._clock()
@@ -0,0 +1,220 @@
+"""Rule-based CV feedback.
+
+Runs in microseconds, so it backs the preliminary review stored at upload
+time, the rule-based degradation tier and every fallback when the LLM is
+unavailable.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+CV_SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "personal profile", "objective", "about me"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history", "work history"),
+    "education": ("education", "academic background", "qualifications", "education and qualifications"),
+    "skills": ("skills", "key skills", "technical skills", "core competencies", "competencies", "abilities"),
+    "projects": ("projects", "portfolio", "achievements", "key achievements"),
+}
+
+_HEADING_PATTERN = re.compile(
+    r"^[ \t#*]*(?P<heading>"
+    + "|".join(sorted((re.escape(alias) for aliases in CV_SECTION_HEADINGS.values() for alias in aliases), key=len, reverse=True))
+    + r")[ \t*]*(?::[ \t]*(?P<rest>.*))?$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_HEADING_SECTION = {alias: section for section, aliases in CV_SECTION_HEADINGS.items() for alias in aliases}
+
+ACTION_VERBS = (
+    "achieved", "built", "coordinated", "created", "delivered", "designed", "developed", "implemented",
+    "improved", "increased", "launched", "led", "managed", "optimised", "optimized", "reduced",
+    "streamlined", "trained",
+)
+WEAK_PHRASES = ("responsible for", "duties included", "helped with", "worked on", "involved in")
+
+_WORD = re.compile(r"[a-z]+")
+_BULLET_START = re.compile(r"^[ \t]*(?:[-*•▪●]|\d+[.)])?[ \t]*([A-Za-z]+)", re.MULTILINE)
+_METRIC = re.compile(r"\d+(?:\.\d+)?\s*%|[$£€]\s?\d[\d,.]*[kmb]?|\b\d+\+?\s+(?:years?|months?|people|engineers|staff|team|users|customers|clients|projects)\b", re.IGNORECASE)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE = re.compile(r"\+?\(?\d[\d ().-]{6,}\d")
+_YEAR = re.compile(r"(?:19|20)\d\d")
+_LINKEDIN = re.compile(r"linkedin\.com/|linkedin", re.IGNORECASE)
+_GITHUB = re.compile(r"github\.com/|github", re.IGNORECASE)
+
+
+def split_cv_sections(cv_content: str) -> Dict[str, str]:
+    """Split CV text on recognised headings such as "Experience" or "Skills:".
+
+    Text before the first heading is returned under ``header``. Repeated
+    headings are concatenated, so every key maps to one block of text.
+    """
+    sections: Dict[str, List[str]] = {}
+    current, position = "header", 0
+    for match in _HEADING_PATTERN.finditer(cv_content):
+        sections.setdefault(current, []).append(cv_content[position:match.start()])
+        current = _HEADING_SECTION[match.group("heading").lower()]
+        position = match.start("rest") if match.group("rest") else match.end()
+    sections.setdefault(current, []).append(cv_content[position:])
+    return {name: "\n".join(part.strip() for part in parts if part.strip()) for name, parts in sections.items()}
+
+
+@dataclass
+class CVAnalysis:
+    word_count: int
+    sections: Dict[str, int] = field(default_factory=dict)
+    metrics: int = 0
+    action_verbs: Dict[str, int] = field(default_factory=dict)
+    action_led_lines: int = 0
+    weak_phrases: int = 0
+    has_email: bool = False
+    has_phone: bool = False
+    has_linkedin: bool = False
+    has_github: bool = False
+
+    @property
+    def metrics_per_100_words(self) -> float:
+        return 100.0 * self.metrics / self.word_count if self.word_count else 0.0
+
+    def has_section(self, name: str) -> bool:
+        return self.sections.get(name, 0) > 0
+
+
+def _has_phone(cv_content: str) -> bool:
+    """A run of 9 to 15 digits, at least 7 of them outside year-like groups.
+
+    Date ranges such as "2019 - 2021" or "03.2019 - 12.2021" do not count.
+    """
+    for match in _PHONE.finditer(cv_content):
+        groups = re.findall(r"\d+", match.group())
+        digits = sum(len(group) for group in groups)
+        non_year = sum(len(group) for group in groups if not _YEAR.fullmatch(group))
+        if 9 <= digits <= 15 and non_year >= 7:
+            return True
+    return False
+
+def analyze_cv(cv_content: str) -> CVAnalysis:
+    sections = split_cv_sections(cv_content)
+    lower = cv_content.lower()
+    verb_set = set(ACTION_VERBS)
+
+    action_verbs: Dict[str, int] = {}
+    for word in _WORD.findall(lower):
+        if word in verb_set:
+            action_verbs[word] = action_verbs.get(word, 0) + 1
+
+    return CVAnalysis(
+        word_count=len(cv_content.split()),
+        sections={name: len(text.split()) for name, text in sections.items() if name != "header"},
+        metrics=len(_METRIC.findall(cv_content)),
+        action_verbs=action_verbs,
+        action_led_lines=sum(1 for first in _BULLET_START.findall(cv_content) if first.lower() in verb_set),
+        weak_phrases=sum(lower.count(phrase) for phrase in WEAK_PHRASES),
+        has_email=bool(_EMAIL.search(cv_content)),
+        has_phone=_has_phone(cv_content),
+        has_linkedin=bool(_LINKEDIN.search(cv_content)),
+        has_github=bool(_GITHUB.search(cv_content)),
+    )
+
+
+def _structure_feedback(analysis: CVAnalysis) -> List[str]:
+    found = [name for name in CV_SECTION_HEADINGS if analysis.has_section(name)]
+    missing = [name for name in ("summary", "experience", "education", "skills") if name not in found]
+    points = []
+    if found:
+        points.append(f"- Detected sections: {', '.join(found)}.")
+    if missing:
+        points.append(f"- Add clearly headed sections for: {', '.join(missing)}.")
+    if analysis.word_count < 300:
+        points.append(f"- At {analysis.word_count} words the CV is thin; most strong CVs run to 300-700 words.")
+    elif analysis.word_count > 1000:
+        points.append(f"- At {analysis.word_count} words the CV is long; trim it towards two pages.")
+    else:
+        points.append(f"- Length of {analysis.word_count} words is in the recommended range.")
+    return points
+
+
+def _content_feedback(analysis: CVAnalysis) -> List[str]:
+    points = []
+    if analysis.metrics == 0:
+        points.append("- No quantified results found. Add numbers: percentages, money saved, team sizes or timeframes.")
+    elif analysis.metrics_per_100_words < 1.0:
+        points.append(f"- Found {analysis.metrics} quantified results; aim for at least one per role or project.")
+    else:
+        points.append(f"- Good use of metrics ({analysis.metrics} quantified results).")
+    if analysis.weak_phrases:
+        points.append(f"- Replace {analysis.weak_phrases} passive phrase(s) such as \"responsible for\" with what you achieved.")
+    if not analysis.has_section("summary"):
+        points.append("- Open with a two or three line professional summary tailored to the role.")
+    return points
+
+
+def _skills_feedback(analysis: CVAnalysis) -> List[str]:
+    if not analysis.has_section("skills"):
+        return ["- Add a dedicated Skills section, grouped by category (languages, frameworks, tools)."]
+    if analysis.sections["skills"] < 10:
+        return ["- The Skills section is brief; list the specific technologies and tools you use."]
+    return ["- Skills section present; order it by relevance to the roles you target and drop outdated items."]
+
+
+def _experience_feedback(analysis: CVAnalysis) -> List[str]:
+    if not analysis.has_section("experience"):
+        return ["- Add a work experience section with 3-5 achievement-focused bullet points per role."]
+    points = []
+    distinct = len(analysis.action_verbs)
+    if distinct < 3:
+        points.append("- Start bullet points with strong action verbs such as led, delivered, improved or reduced.")
+    else:
+        points.append(f"- Uses {distinct} different action verbs; keep leading every bullet with one.")
+    if analysis.action_led_lines == 0:
+        points.append("- None of the lines begin with an action verb; restructure bullets as verb + task + result.")
+    return points
+
+
+def _education_feedback(analysis: CVAnalysis) -> List[str]:
+    if not analysis.has_section("education"):
+        return ["- Add an education section with institution, degree and dates."]
+    return ["- Education section present; include relevant coursework or honours if you are early in your career."]
+
+
+def _improvement_feedback(analysis: CVAnalysis) -> List[str]:
+    points = []
+    if not analysis.has_email:
+        points.append("- Add a professional email address.")
+    if not analysis.has_phone:
+        points.append("- Add a phone number.")
+    if not analysis.has_linkedin:
+        points.append("- Include a LinkedIn profile URL.")
+    if not analysis.has_github:
+        points.append("- Link a GitHub or portfolio profile if you have public work.")
+    if not points:
+        points.append("- Contact details are complete.")
+    return points
+
+
+RULE_SECTIONS = [
+    ("Overall Structure and Formatting", _structure_feedback),
+    ("Content and Relevance", _content_feedback),
+    ("Skills and Qualifications", _skills_feedback),
+    ("Experience Description", _experience_feedback),
+    ("Education Section", _education_feedback),
+    ("Specific Improvements", _improvement_feedback),
+]
+
+
+def render_rule_review(analysis: CVAnalysis, title: str = "CV Review Summary") -> str:
+    parts = [
+        f"# {title}",
+        "This feedback was generated automatically from the structure and wording of your CV.",
+    ]
+    for heading, rule in RULE_SECTIONS:
+        parts.append(f"## {heading}")
+        parts.append("\n".join(rule(analysis)))
+    return "\n\n".join(parts)
+
+
+def generate_rule_review(cv_content: str) -> str:
+    return render_rule_review(analyze_cv(cv_content))
+
+
+def generate_preliminary_review(cv_content: str) -> str:
+    """Rule-based review shown while the full review is still being generated."""
+    return render_rule_review(analyze_cv(cv_content), title="Preliminary CV Review")
@@ -0,0 +1,116 @@
+"""Canonical form for extracted CV text.
+
+Extractors, pdfminer especially, emit runs of spaces, words hyphenated across
+line breaks, form feeds and the same header or footer on every page. All of it
+would be stored in ``reviews.content``, scored and sent to the LLM, so it is
+removed once, right after extraction.
+"""
+import re
+import unicodedata
+from collections import Counter
+from typing import List
+
+HYPHENATED_BREAK = re.compile(r"((?:\w+-)*(\w{2,}))([-\u00ad])\n[ \t]*([a-z]\w*)")
+HORIZONTAL_SPACE = re.compile(r"[^\S\n]+")
+BLANK_LINES = re.compile(r"\n{3,}")
+CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f\u00ad\u200b-\u200d\ufeff]")
+PAGE_NUMBER = re.compile(r"^[\W_]*(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?[\W_]*$", re.IGNORECASE)
+DIGITS = re.compile(r"\d+")
+PAGE_LABEL = re.compile(r"\bpage\s*\d+(\s*(of|/)\s*\d+)?", re.IGNORECASE)
+
+# Lines this close to the top or bottom of a page count as page furniture.
+PAGE_EDGE_LINES = 3
+
+# Compounds that keep their hyphen when broken across lines, and first parts
+# that are always followed by one.
+HYPHENATED_COMPOUNDS = {
+    "back-end", "client-facing", "cross-functional", "customer-facing", "cutting-edge", "data-driven",
+    "decision-making", "detail-oriented", "e-commerce", "end-to-end", "fast-paced", "front-end",
+    "full-stack", "full-time", "hands-on", "high-level", "long-term", "low-level", "on-call", "on-site",
+    "open-source", "part-time", "problem-solving", "real-time", "results-driven", "short-term",
+    "state-of-the-art", "user-facing",
+}
+HYPHENATED_PREFIXES = {"cross", "self", "well"}
+
+# Counters of characters before and after normalization, for /metrics/extraction.
+normalization_stats: Counter = Counter()
+
+
+def _join_hyphenated(match: re.Match) -> str:
+    """Rejoin a word broken across lines, dropping the hyphen only if it was a break.
+
+    Soft hyphens always go. A hard hyphen goes only after an all-lowercase
+    fragment that does not make a known compound ("migra-" + "tion"); "full-"
+    + "stack" and "Java-" + "based" keep it.
+    """
+    word, fragment, hyphen, rest = match.groups()
+    compound = f"{word}-{rest}".lower()
+    if hyphen == "\u00ad" or (
+        fragment.isalpha() and fragment.islower()
+        and compound not in HYPHENATED_COMPOUNDS and fragment not in HYPHENATED_PREFIXES
+    ):
+        return f"{word}{rest}"
+    return f"{word}-{rest}"
+
+def _signature(line: str) -> str:
+    """What a header or footer line has in common across pages.
+
+    Page labels and a lone number at either end ("Jane Doe | CV | 3") are
+    masked; other digits are kept, so date lines on different pages differ.
+    """
+    line = PAGE_LABEL.sub("page #", line.lower())
+    numbers = DIGITS.findall(line)
+    if len(numbers) == 1 and (line[0].isdigit() or line[-1].isdigit()):
+        line = DIGITS.sub("#", line)
+    return line
+
+
+def _page_furniture(pages: List[List[str]]) -> set:
+    """Signatures of edge lines repeated on more than half the pages."""
+    seen: Counter = Counter()
+    for lines in pages:
+        content = [line for line in lines if line]
+        edges = content[:PAGE_EDGE_LINES] + content[-PAGE_EDGE_LINES:]
+        seen.update({_signature(line) for line in edges})
+    return {signature for signature, count in seen.items() if count >= 2 and count * 2 > len(pages)}
+
+
+def normalize_text(text: str) -> str:
+    """Dehyphenate, collapse whitespace and drop repeated page furniture.
+
+    Line structure is kept, since section detection works on lines: spaces
+    collapse within a line and blank runs collapse to one blank line. Of a
+    header or footer repeated across pages only the first copy stays, and bare
+    page numbers go entirely; text with a single page keeps every line.
+    """
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = HYPHENATED_BREAK.sub(_join_hyphenated, text)
+    text = CONTROL_CHARS.sub("", text)
+
+    pages = [
+        [HORIZONTAL_SPACE.sub(" ", line).strip() for line in page.split("\n")]
+        for page in text.split("\f")
+    ]
+    # pdfminer ends every page with a form feed, so a one-page PDF splits into
+    # its page and an empty one; only pages with text count.
+    pages = [page for page in pages if any(page)]
+    multipage = len(pages) > 1
+    furniture = _page_furniture(pages) if multipage else set()
+    kept = set()
+    lines = []
+    for page in pages:
+        content = [index for index, line in enumerate(page) if line]
+        edges = set(content[:PAGE_EDGE_LINES] + content[-PAGE_EDGE_LINES:])
+        for index, line in enumerate(page):
+            if index in edges:
+                if multipage and PAGE_NUMBER.match(line):
+                    continue
+                signature = _signature(line)
+                if signature in furniture:
+                    if signature in kept:
+                        continue
+                    kept.add(signature)
+            lines.append(line)
+        lines.append("")
+
+    return BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()